@@ -0,0 +1,315 @@
+import sys
+from typing import Dict, List, Tuple
+
+sys.path.append('../../')
+from Trains.Admin.referee_game_state import RefereeGameState
+from Trains.Common.map import Color, Connection, Destination, Map
+from Trains.Common.player_game_state import PlayerGameState
+from Trains.Other.Util.constants import MIN_RAILS_TO_NOT_TRIGGER_LAST_TURN
+
+COLORS: Tuple[Color, ...] = tuple(Color)
+"""The colors in the order of their slots in a compact hand"""
+COLOR_INDICES: Dict[Color, int] = {color: index for index, color in enumerate(COLORS)}
+"""Each color's slot in a compact hand"""
+CONNECTION_LENGTHS: Tuple[int, ...] = (3, 4, 5)
+"""The possible lengths of a connection"""
+
+
+class CompactGameState:
+    """
+    A compact alternative to RefereeGameState for running large numbers of simulated turns. Everything is
+    stored in terms of the map's connection and city ids (see Map):
+        - each player's acquisitions are an int bitmask over connection ids, and the free connections are one
+          bitmask, so ownership, legality checks and scoring are bit operations
+        - the cities connected by a player's acquisitions are grouped into int bitmasks over city ids, so a
+          destination is complete if one of them contains both of its cities
+        - each player's hand is a 4 slot list of card counts indexed by color (see COLORS)
+        - the deck is a bytearray of color slots, drawn from the end like the deque of a RefereeGameState
+    Players are still given PlayerGameStates, converted with `get_player_game_state`, and a compact state can be
+    built from the PlayerGameStates of all players with `from_player_game_states`.
+    """
+
+    game_map: Map
+    turn: int
+    _ownership: List[int]
+    _free_connections: int
+    _hands: List[List[int]]
+    _rails: List[int]
+    _destinations: List[Tuple[Destination, ...]]
+    _deck: bytearray
+    _connection_colors: Tuple[int, ...]
+    _connection_lengths: Tuple[int, ...]
+    _connection_city_masks: Tuple[int, ...]
+    _bucket_masks: Dict[Tuple[int, int], int]
+    _length_masks: Dict[int, int]
+
+    def __init__(self, game_map: Map, hands: List[Dict[Color, int]], rails: List[int],
+                 destinations: List[Tuple[Destination, ...]], deck: List[Color]) -> None:
+        """
+        Constructor for a CompactGameState at the start of a game, before any connection is acquired.
+            Parameters:
+                game_map (Map): The game map
+                hands (list(dict)): Each player's hand of colored cards, in turn order
+                rails (list(int)): Each player's number of rails, in turn order
+                destinations (list(tuple(Destination))): Each player's destinations, in turn order
+                deck (list(Color)): The deck of colored cards, drawn from the end
+            Throws:
+                TypeError: The given map must be of type Map
+                ValueError: The given hands, rails and destinations must have an entry for every player
+        """
+        if type(game_map) != Map:
+            raise TypeError("The given map must be a Map")
+        if not len(hands) == len(rails) == len(destinations):
+            raise ValueError("Hands, rails and destinations must be given for every player")
+
+        self.game_map = game_map
+        self.turn = 0
+        self._ownership = [0] * len(hands)
+        self._free_connections = (1 << game_map.get_number_of_connections()) - 1
+        self._hands = [[hand.get(color, 0) for color in COLORS] for hand in hands]
+        self._rails = list(rails)
+        self._destinations = [tuple(player_destinations) for player_destinations in destinations]
+        self._deck = bytearray(COLOR_INDICES[card] for card in deck)
+
+        connections = [game_map.get_connection_by_id(connection_id)
+                       for connection_id in range(game_map.get_number_of_connections())]
+        self._connection_colors = tuple(COLOR_INDICES[connection.color] for connection in connections)
+        self._connection_lengths = tuple(connection.length for connection in connections)
+        self._connection_city_masks = tuple((1 << city_id1) | (1 << city_id2) for city_id1, city_id2 in (
+            game_map.get_connection_endpoint_ids(connection_id) for connection_id in range(len(connections))))
+        self._bucket_masks = {(color, length): 0 for color in range(len(COLORS)) for length in CONNECTION_LENGTHS}
+        self._length_masks = {length: 0 for length in CONNECTION_LENGTHS}
+        for connection_id, connection in enumerate(connections):
+            self._bucket_masks[(COLOR_INDICES[connection.color], connection.length)] |= 1 << connection_id
+            self._length_masks[connection.length] |= 1 << connection_id
+
+    @classmethod
+    def from_player_game_states(cls, game_map: Map, player_game_states: List[PlayerGameState], deck: List[Color],
+                                turn: int = 0) -> 'CompactGameState':
+        """
+        Converts the PlayerGameStates of all players into a CompactGameState, including any acquisitions made so
+        far. Only each player's own resources are read, since the others' acquisitions follow from them.
+            Parameters:
+                game_map (Map): The game map
+                player_game_states (list(PlayerGameState)): Each player's game state, in turn order
+                deck (list(Color)): The deck of colored cards, drawn from the end
+                turn (int): The index of the player whose turn it is
+            Returns:
+                The equivalent CompactGameState
+        """
+        compact_game_state = cls(game_map,
+                                 [dict(pgs.colored_cards) for pgs in player_game_states],
+                                 [pgs.rails for pgs in player_game_states],
+                                 [tuple(pgs.destinations) for pgs in player_game_states],
+                                 deck)
+        for player_index, pgs in enumerate(player_game_states):
+            ownership = game_map.get_connections_as_bitmask(pgs.connections)
+            compact_game_state._ownership[player_index] = ownership
+            compact_game_state._free_connections &= ~ownership
+        compact_game_state.turn = turn
+        return compact_game_state
+
+    @classmethod
+    def from_referee_game_state(cls, referee_game_state: RefereeGameState) -> 'CompactGameState':
+        """
+        Converts a RefereeGameState into a CompactGameState, including any acquisitions made so far.
+            Parameters:
+                referee_game_state (RefereeGameState): The game state to convert
+            Returns:
+                The equivalent CompactGameState
+        """
+        return cls.from_player_game_states(referee_game_state.game_map, referee_game_state.player_game_states,
+                                           list(referee_game_state.colored_card_deck), referee_game_state.turn)
+
+    def get_player_game_state(self, player_index: int) -> PlayerGameState:
+        """
+        Converts the state of a player into the PlayerGameState handed to players, with the other players'
+        acquisitions in turn order starting after the given player.
+            Parameters:
+                player_index (int): The index of the player
+            Returns:
+                The PlayerGameState of the player
+        """
+        acquisitions = [self.game_map.get_connections_from_bitmask(ownership) for ownership in self._ownership]
+        other_acquisitions = acquisitions[player_index + 1:] + acquisitions[:player_index]
+        hand = {color: self._hands[player_index][color_index] for color_index, color in enumerate(COLORS)}
+        return PlayerGameState(acquisitions[player_index], hand, self._rails[player_index],
+                               set(self._destinations[player_index]), other_acquisitions)
+
+    def get_number_of_players(self) -> int:
+        """Returns the number of players in the game."""
+        return len(self._ownership)
+
+    def get_ownership(self, player_index: int) -> int:
+        """Returns the bitmask of connection ids acquired by the given player."""
+        return self._ownership[player_index]
+
+    def get_free_connections(self) -> int:
+        """Returns the bitmask of connection ids that have not been acquired."""
+        return self._free_connections
+
+    def get_hand(self, player_index: int) -> Tuple[int, ...]:
+        """Returns the given player's card counts, indexed by color slot (see COLORS)."""
+        return tuple(self._hands[player_index])
+
+    def get_rails(self, player_index: int) -> int:
+        """Returns the given player's number of rails."""
+        return self._rails[player_index]
+
+    def get_deck_size(self) -> int:
+        """Returns the number of cards left in the deck."""
+        return len(self._deck)
+
+    def next_turn(self) -> None:
+        """Advances the turn to the next player."""
+        self.turn = (self.turn + 1) % len(self._ownership)
+
+    def get_acquirable_connections(self, player_index: int) -> int:
+        """
+        Determines the connections the given player can legally acquire: free connections the player has
+        enough rails and enough cards of the connection's color for.
+            Parameters:
+                player_index (int): The index of the player
+            Returns:
+                (int) The bitmask of acquirable connection ids
+        """
+        hand = self._hands[player_index]
+        rails = self._rails[player_index]
+        affordable = 0
+        for (color, length), bucket in self._bucket_masks.items():
+            if hand[color] >= length and rails >= length:
+                affordable |= bucket
+        return affordable & self._free_connections
+
+    def is_legal_acquisition(self, player_index: int, connection_id: int) -> bool:
+        """
+        Determines whether the given player can legally acquire the connection with the given id.
+            Parameters:
+                player_index (int): The index of the player
+                connection_id (int): The id of the connection
+            Returns:
+                True if the connection is free and the player can pay for it, False otherwise
+        """
+        if not self._free_connections >> connection_id & 1:
+            return False
+        length = self._connection_lengths[connection_id]
+        return self._rails[player_index] >= length \
+            and self._hands[player_index][self._connection_colors[connection_id]] >= length
+
+    def acquire_connection(self, player_index: int, connection_id: int) -> None:
+        """
+        Acquires the connection with the given id for the given player, paying for it with rails and cards.
+            Parameters:
+                player_index (int): The index of the player
+                connection_id (int): The id of the connection
+            Throws:
+                ValueError: The player cannot legally acquire the connection
+        """
+        if not self.is_legal_acquisition(player_index, connection_id):
+            raise ValueError("The player cannot acquire the given connection")
+        length = self._connection_lengths[connection_id]
+        self._ownership[player_index] |= 1 << connection_id
+        self._free_connections &= ~(1 << connection_id)
+        self._rails[player_index] -= length
+        self._hands[player_index][self._connection_colors[connection_id]] -= length
+
+    def draw_cards(self, player_index: int, number_of_cards: int) -> int:
+        """
+        Draws the given number of cards from the deck into the given player's hand, or as many as possible.
+            Parameters:
+                player_index (int): The index of the player
+                number_of_cards (int): The number of cards to draw
+            Returns:
+                (int) The number of cards drawn
+        """
+        hand = self._hands[player_index]
+        drawn = min(number_of_cards, len(self._deck))
+        for _ in range(drawn):
+            hand[self._deck.pop()] += 1
+        return drawn
+
+    def release_player(self, player_index: int) -> None:
+        """
+        Frees the connections of the given player and discards their resources, e.g. when they are booted.
+        The player keeps enough rails not to trigger the last turn, like a booted player in a Referee.
+            Parameters:
+                player_index (int): The index of the player
+        """
+        self._free_connections |= self._ownership[player_index]
+        self._ownership[player_index] = 0
+        self._hands[player_index] = [0] * len(COLORS)
+        self._rails[player_index] = MIN_RAILS_TO_NOT_TRIGGER_LAST_TURN
+        self._destinations[player_index] = ()
+
+    def is_last_turn(self) -> bool:
+        """Determines if any player has too few rails to continue, which means the game enters its last round."""
+        return any(rails < MIN_RAILS_TO_NOT_TRIGGER_LAST_TURN for rails in self._rails)
+
+    def get_connection_score(self, player_index: int) -> int:
+        """Returns the total length of the connections acquired by the given player."""
+        ownership = self._ownership[player_index]
+        # int.bit_count needs Python 3.10, so the bits are counted through their binary string
+        return sum(length * bin(ownership & mask).count("1") for length, mask in self._length_masks.items())
+
+    def get_city_components(self, player_index: int) -> List[int]:
+        """
+        Groups the cities connected by the given player's connections into bitmasks over city ids, one for each
+        connected group of cities. Cities without any of the player's connections are in none of them.
+            Parameters:
+                player_index (int): The index of the player
+            Returns:
+                (list(int)) The disjoint bitmasks of connected city ids
+        """
+        components: List[int] = []
+        ownership = self._ownership[player_index]
+        connection_id = 0
+        while ownership:
+            if ownership & 1:
+                component = self._connection_city_masks[connection_id]
+                separate_components = []
+                for other_component in components:
+                    if other_component & component:
+                        component |= other_component
+                    else:
+                        separate_components.append(other_component)
+                separate_components.append(component)
+                components = separate_components
+            ownership >>= 1
+            connection_id += 1
+        return components
+
+    def _get_destination_mask(self, destination: Destination) -> int:
+        city1, city2 = destination
+        return (1 << self.game_map.get_city_id(city1)) | (1 << self.game_map.get_city_id(city2))
+
+    def is_destination_complete(self, player_index: int, destination: Destination) -> bool:
+        """
+        Determines whether the cities of the given destination are connected via the given player's connections.
+            Parameters:
+                player_index (int): The index of the player
+                destination (Destination): The destination to check
+            Returns:
+                True if the destination is connected, False otherwise
+        """
+        destination_mask = self._get_destination_mask(destination)
+        return any(component & destination_mask == destination_mask
+                   for component in self.get_city_components(player_index))
+
+    def get_destination_score(self, player_index: int, score_value: int) -> int:
+        """
+        Gets the score of the given player's destinations: score_value for each complete destination and
+        -score_value for each incomplete one.
+        """
+        components = self.get_city_components(player_index)
+        score = 0
+        for destination in self._destinations[player_index]:
+            destination_mask = self._get_destination_mask(destination)
+            is_complete = any(component & destination_mask == destination_mask for component in components)
+            score += score_value if is_complete else -score_value
+        return score
+
+    def get_connections(self, player_index: int) -> List[Connection]:
+        """Returns the connections acquired by the given player, in order of connection id."""
+        ownership = self._ownership[player_index]
+        return [self.game_map.get_connection_by_id(connection_id)
+                for connection_id in range(ownership.bit_length()) if ownership >> connection_id & 1]
@@ -0,0 +1,120 @@
+import sys
+from bisect import bisect_right
+from itertools import combinations
+from random import randrange, sample
+from typing import Dict, Iterable, List, Set
+
+sys.path.append('../../')
+from Trains.Common.map import City, Destination, Map
+
+
+class DestinationSampler:
+    """
+    Draws uniformly random feasible destinations from a map without enumerating every feasible destination.
+    A feasible destination is any pair of cities in the same connected component of the map, so a destination
+    is drawn by picking a component weighted by its number of city pairs and then a random pair within it.
+    Destinations that have been handed out are tracked in a (small) exclusion set and are never drawn again.
+    """
+
+    _components: List[List[City]]
+    _component_ids: Dict[City, int]
+    _cumulative_pair_counts: List[int]
+    _total_pair_count: int
+    _excluded: Set[Destination]
+
+    def __init__(self, game_map: Map) -> None:
+        """
+        Constructor for a DestinationSampler over the feasible destinations of the given map.
+            Parameters:
+                game_map (Map): The map to draw destinations from
+        """
+        if type(game_map) != Map:
+            raise TypeError("DestinationSampler must be given a Map")
+
+        self._components = []
+        self._component_ids = {}
+        self._cumulative_pair_counts = []
+        self._total_pair_count = 0
+        for component_id, component in enumerate(game_map.get_connected_components(game_map.get_all_connections())):
+            self._total_pair_count += len(component) * (len(component) - 1) // 2
+            self._components.append(sorted(component, key=lambda city: city.name))
+            self._cumulative_pair_counts.append(self._total_pair_count)
+            for city in component:
+                self._component_ids[city] = component_id
+        self._excluded = set()
+
+    def count_available(self) -> int:
+        """
+        Counts the feasible destinations that have not been excluded.
+            Returns:
+                (int) The number of destinations that can still be drawn
+        """
+        return self._total_pair_count - len(self._excluded)
+
+    def is_available(self, destination: Destination) -> bool:
+        """Determines whether the given destination is feasible on the map and has not been excluded."""
+        return destination not in self._excluded and self._is_feasible(destination)
+
+    def exclude(self, destinations: Iterable[Destination]) -> None:
+        """
+        Excludes the given destinations from all future draws, e.g. because a player has chosen them.
+        Destinations that are not feasible on the map are ignored.
+            Parameters:
+                destinations (iterable(Destination)): The destinations to exclude
+        """
+        self._excluded.update(
+            destination for destination in destinations if self._is_feasible(destination))
+
+    def sample(self, number_of_destinations: int) -> Set[Destination]:
+        """
+        Draws distinct, uniformly random destinations that have not been excluded. Drawn destinations are not
+        excluded automatically; call `exclude` with the destinations that are actually handed out.
+            Parameters:
+                number_of_destinations (int): The number of destinations to draw
+            Returns:
+                (set(Destination)) The drawn destinations
+            Throws:
+                ValueError: There are fewer available destinations than requested
+        """
+        if number_of_destinations > self.count_available():
+            raise ValueError(
+                f"Cannot draw {number_of_destinations} destinations, only {self.count_available()} are available")
+
+        # When most destinations are unavailable, rejection sampling degrades, but then there are few
+        # enough destinations left that enumerating them is cheap.
+        if 2 * (len(self._excluded) + number_of_destinations) >= self._total_pair_count:
+            return set(sample(list(self.get_available_destinations()), number_of_destinations))
+
+        drawn: Set[Destination] = set()
+        while len(drawn) < number_of_destinations:
+            destination = self._draw_feasible_destination()
+            if destination not in self._excluded:
+                drawn.add(destination)
+        return drawn
+
+    def get_available_destinations(self) -> Set[Destination]:
+        """
+        Enumerates every feasible destination that has not been excluded. This costs memory proportional to the
+        number of feasible destinations and should only be used when the full set is needed.
+            Returns:
+                (set(Destination)) The available destinations
+        """
+        return {Destination(frozenset(pair)) for component in self._components
+                for pair in combinations(component, 2)} - self._excluded
+
+    def _is_feasible(self, destination: Destination) -> bool:
+        """Determines whether both cities of the given destination are in the same connected component."""
+        city1, city2 = destination
+        component_id = self._component_ids.get(city1)
+        return component_id is not None and component_id == self._component_ids.get(city2)
+
+    def _draw_feasible_destination(self) -> Destination:
+        """Draws a uniformly random feasible destination, ignoring exclusions."""
+        pair_index = randrange(self._total_pair_count)
+        component = self._components[bisect_right(self._cumulative_pair_counts, pair_index)]
+
+        first_index = randrange(len(component))
+        second_index = randrange(len(component) - 1)
+        if second_index >= first_index:
+            second_index += 1
+        return Destination(frozenset({component[first_index], component[second_index]}))
@@ -5,7 +5,7 @@ sys.path.append('../../')
 
 from Trains.Admin.referee import Referee
 from Trains.Common.map import Map
-from Trains.Other.Util.constants import DEFAULT_MAP
+from Trains.Other.Util.constants import get_default_map
 from Trains.Other.Util.func_utils import try_call
 from Trains.Other.Util.map_utils import verify_game_map
 from Trains.Player.player_interface import PlayerInterface
@@ -145,7 +145,7 @@ class Manager:
         return self.get_default_map()
 
     def get_default_map(self) -> Map:
-        return DEFAULT_MAP
+        return get_default_map()
 
     def eliminate_losing_players(self, losing_player_rankings: List[List[PlayerInterface]]) -> None:
         """
@@ -1,19 +1,20 @@
 import sys
 from collections import defaultdict, deque
 from random import randint
-from typing import (Any, Callable, DefaultDict, Deque, Dict, List, Optional,
-                    Set, Tuple, TypeVar, Union)
-
-import networkx as nx
+from typing import (Any, Callable, DefaultDict, Deque, Dict, FrozenSet, List,
+                    Optional, Set, Tuple, TypeVar, Union)
 
 sys.path.append('../../')
+from Trains.Admin.destination_sampler import DestinationSampler
 from Trains.Admin.referee_game_state import RefereeGameState
-from Trains.Common.map import Color, Connection, Destination, Map
+from Trains.Common.map import City, Color, Connection, Destination, Map
 from Trains.Common.player_game_state import PlayerGameState
 from Trains.Other.Util.constants import (MIN_RAILS_TO_NOT_TRIGGER_LAST_TURN,
                                          int2color)
 from Trains.Other.Util.func_utils import try_call
 from Trains.Other.Util.map_utils import verify_game_map
+from Trains.Other.Util.route_utils import (
+    get_longest_simple_path_length, get_longest_simple_path_upper_bound)
 from Trains.Player.moves import (AcquireConnectionMove, DrawCardMove,
                                  IPlayerMoveVisitor)
 from Trains.Player.player_interface import PlayerInterface
@@ -88,15 +89,14 @@ class ApplyPlayerMove(IPlayerMoveVisitor[bool]):
             ApplyPlayerMove.CARDS_ON_DRAW)
 
         pgs = self._rgs.player_game_states[self._rgs.turn]
-        player_hand = pgs.colored_cards
+        player_hand = {**pgs.colored_cards}
 
         for card in new_cards:
             if card in player_hand.keys():
                 player_hand[card] += 1
             else:
                 player_hand[card] = 1
-        self._rgs.player_game_states[self._rgs.turn] = PlayerGameState(
-            pgs.connections, player_hand, pgs.rails, pgs.destinations, pgs.other_acquisitions)
+        self._rgs.player_game_states[self._rgs.turn] = pgs.with_cards(player_hand)
 
         self._player.more(new_cards)  # may throw an error
         return len(new_cards) > 0
@@ -109,19 +109,8 @@ class ApplyPlayerMove(IPlayerMoveVisitor[bool]):
             raise Cheating(
                 "Active player is unable to acquire the given connection.")
 
-        connection = move.connection
-        pgs = self._rgs.player_game_states[self._rgs.turn]
-
-        updated_connections = pgs.connections.union([connection])
-        updated_rails = pgs.rails - connection.length
-
-        updated_colored_cards = pgs.colored_cards
-        updated_colored_cards[connection.color] -= connection.length
-
-        updated_pgs = PlayerGameState(updated_connections, updated_colored_cards, updated_rails,
-                                      pgs.destinations, pgs.other_acquisitions)
-
-        self._rgs.player_game_states[self._rgs.turn] = updated_pgs
+        # The move was verified as legal above, so the state can be updated without revalidating it
+        self._rgs.acquire_connection_for_player(self._rgs.turn, move.connection)
         return True
 
 
@@ -148,6 +137,9 @@ class Referee():
     took_last_turn: Set[PlayerInterface]
     ref_game_state: RefereeGameState
     num_of_same_states: int
+    _acquisitions_snapshot: Tuple[FrozenSet[Connection], ...]
+    _snapshot_sources: List[Optional[PlayerGameState]]
+    _published_states: List[Optional[PlayerGameState]]
 
     def __init__(self, game_map: Map, players: List[PlayerInterface], deck: Optional[Deque[Color]] = None) -> None:
         """
@@ -205,13 +197,20 @@ class Referee():
             self.INITIAL_DECK_SIZE = len(deck)
 
         formatted_player_states = self.set_up_players_with_initial_game_states(players, deck, self.INITIAL_RAIL_COUNT,
-                                                                               game_map.get_all_feasible_destinations())
+                                                                               DestinationSampler(game_map))
 
         self.ref_game_state = RefereeGameState(
             game_map, deck, formatted_player_states)
 
+        # Shared, read-only snapshot of every player's acquisitions that all player views are built from,
+        # along with the player game states the snapshot was read from and the last views handed to players.
+        # Player game states are replaced rather than mutated, so identity tells which ones have changed.
+        self._acquisitions_snapshot = tuple(frozenset() for _ in players)
+        self._snapshot_sources = [None] * len(players)
+        self._published_states = [None] * len(players)
+
     def set_up_players_with_initial_game_states(self, players: List[PlayerInterface], deck: Deque[Color], \
-        rails: int, feasible_destinations: Set[Destination]) -> List[PlayerGameState]:
+        rails: int, destination_sampler: DestinationSampler) -> List[PlayerGameState]:
         """
         Creates player game states (PlayerGameState) for each player in a given list of players
         according to the game map and game rule constants (initial rail count, initial hand
@@ -220,14 +219,13 @@ class Referee():
                 players (list(PlayerInterface)): list of players to create player game states for
                 deck (deque): Initial deck of colored cards
                 rails (int): Initial rails given to each player
-                feasible_destinations (set(Destination)): Feasible destinations on the map to be selected by players
+                destination_sampler (DestinationSampler): Sampler over the feasible destinations on the map to be selected by players
             Returns:
                 (list(PlayerGameState)): List of player game states in the turn order
                 player game states in the format required to initialize a referee game state
         """
         formatted_player_states: List[PlayerGameState] = list()
 
-        feasible_destinations_copy = {*feasible_destinations}
         for player_index, player in enumerate(players):
 
             # Give each player their initial hand of colored cards
@@ -243,10 +241,10 @@ class Referee():
             else:
                 # If setup was successful, have player pick destinations.
                 destinations_chosen = self.get_player_destination_choices(
-                    player_index, feasible_destinations_copy)
+                    player_index, destination_sampler)
 
-                # Remove the destinations that this player chose from the set of feasible destinations offered to players
-                feasible_destinations_copy -= destinations_chosen
+                # Exclude the destinations that this player chose from the destinations offered to later players
+                destination_sampler.exclude(destinations_chosen)
 
             # Create player state and append to list
             player_state = self.generate_initial_player_state(
@@ -255,16 +253,16 @@ class Referee():
 
         return formatted_player_states
 
-    def get_player_destination_choices(self, player_index: int, feasible_destinations: Set[Destination]) -> Set[Destination]:
+    def get_player_destination_choices(self, player_index: int, destination_sampler: DestinationSampler) -> Set[Destination]:
         """
-        Given the index of a player and the set of a map's feasible destinations that have not been chosen,
+        Given the index of a player and a sampler over the map's feasible destinations that have not been chosen,
         call the player's pick method, and returns the destinations they've chosen.
         """
         player = self.players[player_index]
 
         # Give each player their initial destinations
         inital_player_feasible_destinations = self.get_destination_selection(
-            feasible_destinations, self.NUM_DESTINATION_OPTIONS)
+            destination_sampler, self.NUM_DESTINATION_OPTIONS)
 
         destinations_not_chosen, _ = try_call(
             player.pick, inital_player_feasible_destinations)
@@ -339,24 +337,16 @@ class Referee():
 
         return hand
 
-    def get_destination_selection(self, feasible_destinations: Set[Destination], number_of_destinations: int) -> Set[Destination]:
+    def get_destination_selection(self, destination_sampler: DestinationSampler, number_of_destinations: int) -> Set[Destination]:
         """
         Gets the subset of feasible destinations that a player will choose their destinations from on setup.  Randomly selects the Destinations.
             Parameters:
-                feasible_destinations (set(Destination)): Set of all feasible destinations on a game map
+                destination_sampler (DestinationSampler): Sampler over the feasible destinations on a game map that have not been chosen
                 number_of_destinations (int): The number of destinations that a player can select from
             Returns:
                 (set(Destination)) The set of destinations that a player will select from
         """
-        destination_options: Set[Destination] = set()
-        destination_list = list(feasible_destinations)
-        for _ in range(number_of_destinations):
-            random_destination = destination_list[randint(
-                0, len(destination_list) - 1)]
-            destination_options.add(random_destination)
-            destination_list.remove(random_destination)
-
-        return destination_options
+        return destination_sampler.sample(number_of_destinations)
 
     def verify_player_destinations(self, destinations_given: Set[Destination], destinations_chosen: Set[Destination]) -> bool:
         """
@@ -402,7 +392,9 @@ class Referee():
         # in RefereeGameState (since banned players are not removed from the data)
         booted_player_game_state = PlayerGameState(
             set(), dict(), MIN_RAILS_TO_NOT_TRIGGER_LAST_TURN, set(), [])
+        released_connections = self.ref_game_state.player_game_states[player_index].connections
         self.ref_game_state.player_game_states[player_index] = booted_player_game_state
+        self.ref_game_state.release_connections(released_connections)
         self.ban_player(player_index, reason)
 
     def try_call_player(self, player_index: int, player_method: Callable[..., T], *args) -> Union[Tuple[T, None], Tuple[None, Exception]]:
@@ -462,13 +454,41 @@ class Referee():
 
     def update_player_states(self) -> None:
         """
-        Updates all playes with the state they should have at a given point
+        Updates all playes with the state they should have at a given point. A player's state is only
+        recomputed if the opponents' acquisitions it was published with are out of date or the player's own
+        state was replaced.
         MUTATES player_game_state of each player
         """
+        self.refresh_acquisitions_snapshot()
         for player_index in range(len(self.players)):
-            if player_index not in self.ban_list:
+            if player_index in self.ban_list:
+                continue
+            published_state = self._published_states[player_index]
+            own_state_replaced = self.ref_game_state.player_game_states[player_index] is not published_state
+            # The snapshot shares its sets with the states made from it, so this comparison is usually decided
+            # by identity
+            if own_state_replaced or published_state.other_acquisitions != self._get_other_acquisitions(player_index):
                 self.update_specific_player_state(player_index)
 
+    def refresh_acquisitions_snapshot(self) -> None:
+        """
+        Brings the shared snapshot of every player's acquisitions up to date, only re-reading the players
+        whose game state has been replaced since the last refresh.
+        """
+        snapshot = list(self._acquisitions_snapshot)
+        snapshot_changed = False
+        for player_index, pgs in enumerate(self.ref_game_state.player_game_states):
+            if pgs is self._snapshot_sources[player_index]:
+                continue
+            self._snapshot_sources[player_index] = pgs
+            connections = pgs.connections
+            if connections != snapshot[player_index]:
+                snapshot[player_index] = connections
+                snapshot_changed = True
+
+        if snapshot_changed:
+            self._acquisitions_snapshot = tuple(snapshot)
+
     def update_specific_player_state(self, specific_player_index: int) -> None:
         """
         Updates the state of each player to reflect what should be visible
@@ -481,6 +501,9 @@ class Referee():
         updated_state = self.generate_updated_state_for_player(
             specific_player_index)
         self.ref_game_state.player_game_states[specific_player_index] = updated_state
+        # The new state has the same acquisitions as the one it replaces, so the snapshot is still current
+        self._snapshot_sources[specific_player_index] = updated_state
+        self._published_states[specific_player_index] = updated_state
 
     def generate_updated_state_for_player(self, player_index: int) -> PlayerGameState:
         """
@@ -491,28 +514,24 @@ class Referee():
             Return:
                 PlayerGameState: A resource representing given players state
         """
-        pgs = self.ref_game_state.player_game_states[player_index]
-        hand = pgs.colored_cards
-        rails = pgs.rails
-        connections = pgs.connections
-        destinations = pgs.destinations
-
-        # Other player's acquisitions
-        other_acquisitions: List[Set[Connection]] = []
-
-        for ind in range(len(self.players)):
-            # Skip own acquisitions
-            if ind == player_index:
-                continue
+        self.refresh_acquisitions_snapshot()
 
-            opp_acquisitions: Set[Connection] = self.ref_game_state.player_game_states[ind].connections
-            other_acquisitions.append(opp_acquisitions)
+        pgs = self.ref_game_state.player_game_states[player_index]
 
-        # rearrange the order of opponent acquisitions so that it is in order of players relative to the current player
-        other_acquisitions = other_acquisitions[player_index:] + \
-            other_acquisitions[:player_index]
+        # Player game states are immutable, so the player's own resources are shared with the new state
+        return pgs.with_other_acquisitions(self._get_other_acquisitions(player_index))
 
-        return PlayerGameState({*connections}, {**hand}, rails, {*destinations}, other_acquisitions)
+    def _get_other_acquisitions(self, player_index: int) -> Tuple[FrozenSet[Connection], ...]:
+        """
+        Gets the other players' acquisitions from the snapshot, in order of players relative to the given player.
+        The acquisitions are shared with the snapshot rather than copied.
+            Parameters:
+                player_index(int): Index of the player to get the other players' acquisitions for
+            Return:
+                tuple(frozenset(Connection)): The other players' acquisitions
+        """
+        snapshot = self._acquisitions_snapshot
+        return snapshot[player_index + 1:] + snapshot[:player_index]
 
     def all_last_turns_taken(self) -> bool:
         """
@@ -526,64 +545,12 @@ class Referee():
         """
         Finds the longest continuous path that each player can create with
         the connections that they possess.
-        SOURCE: https://networkx.org/documentation/stable/reference/algorithms/generated/networkx.algorithms.simple_paths.all_simple_paths.html#networkx.algorithms.simple_paths.all_simple_paths
             Parameters:
                 player (int): The index of the player to find a connection for
             Return:
                 connection_length (int): Length of player's longest connection
         """
-        trains_graph = nx.MultiGraph()
-        # Create graph using the given player's connections
-        player_cities = self.game_map.get_cities_from_connections(
-            self.ref_game_state.player_game_states[player_index].connections)
-        for city in player_cities:
-            trains_graph.add_node(city)
-
-        # TODO: Maybe make this a helper
-        for connection in self.ref_game_state.player_game_states[player_index].connections:
-            city1 = list(connection.cities)[0]
-            city2 = list(connection.cities)[1]
-            weight = connection.length
-            trains_graph.add_edge(city1, city2, weight=weight)
-
-        # Get all simple paths in the graph between all cities connected via some path
-        simple_paths = []
-        for source_city in player_cities:
-            for dest_city in player_cities:
-                simple_paths += nx.all_simple_paths(
-                    trains_graph, source_city, dest_city)
-
-        # Get the weight (length) of the longest path out of all the simple paths
-        max_weight = 0
-        for path in map(nx.utils.pairwise, simple_paths):
-            path_weight = self.max_weight_of_simple_path(
-                trains_graph, list(path))
-            if path_weight > max_weight:
-                max_weight = path_weight
-
-        return max_weight
-
-    def max_weight_of_simple_path(self, graph, path) -> int:
-        """
-        Gets the max weight path from a set of graphs
-        THIS METHOD SHOULD ONLY BE CALLED BY get_longest_path
-        SOURCE: https://networkx.org/documentation/stable/reference/algorithms/generated/networkx.algorithms.simple_paths.all_simple_paths.html#networkx.algorithms.simple_paths.all_simple_paths
-            Parameters:
-                graph (nx.MultiGraph): the graph that paths belong to
-                path (list(edge)): paths to compare | edge is a tuple of two nodes
-            Return:
-                weight (int): max weight of the given path
-        """
-        weight = 0
-        for edge in path:
-            edge_weight_options = []
-            # get_edge_data creates a dictionary of edge attributes (weights) for all edges in the given path
-            for edge_weight_index in graph.get_edge_data(*edge).keys():
-                edge_weight_options.append(graph.get_edge_data(
-                    *edge)[edge_weight_index]['weight'])
-            weight += max(edge_weight_options)
-
-        return weight
+        return get_longest_simple_path_length(self.get_player_route_edges(player_index))
 
     def score_game(self) -> Dict[PlayerInterface, int]:
         """
@@ -613,18 +580,36 @@ class Referee():
         return player_scores
 
     def get_players_with_longest_route(self) -> List[PlayerInterface]:
-        """Get the player(s) with the longest, acyclic route."""
-        max_players, max_length = [], -1
-        for player_index, player in enumerate(self.players):
-            if player_index not in self.ban_list:
-                length = self.find_longest_continuous_path_for_player(
-                    player_index)
-                if length > max_length:
-                    max_players, max_length = [player], length
-                elif length == max_length:
-                    max_players.append(player)
+        """
+        Get the player(s) with the longest, acyclic route. Players are searched in descending order of a cheap
+        upper bound on their longest route, and a player whose bound is below the best route found so far cannot
+        win or tie, so their exact search is skipped.
+        """
+        bounds = {player_index: get_longest_simple_path_upper_bound(self.get_player_route_edges(player_index))
+                  for player_index in range(len(self.players)) if player_index not in self.ban_list}
+
+        max_player_indices, max_length = [], -1
+        for player_index in sorted(bounds, key=lambda index: -bounds[index]):
+            if bounds[player_index] < max_length:
+                break
+            length = get_longest_simple_path_length(self.get_player_route_edges(player_index))
+            if length > max_length:
+                max_player_indices, max_length = [player_index], length
+            elif length == max_length:
+                max_player_indices.append(player_index)
+
+        return [self.players[player_index] for player_index in sorted(max_player_indices)]
 
-        return max_players
+    def get_player_route_edges(self, player_index: int) -> List[Tuple[City, City, int]]:
+        """
+        Gets the connections of the given player as (city, city, length) edges for route searches.
+            Parameters:
+                player_index (int): The index of the player to get the edges of
+            Return:
+                A list of (city, city, length) triples, one per connection
+        """
+        return [(*connection.endpoints, connection.length)
+                for connection in self.ref_game_state.player_game_states[player_index].connections]
 
     def get_connection_score(self, player_game_state: PlayerGameState, score_value: int) -> int:
         """
@@ -651,11 +636,8 @@ class Referee():
                 score (int): score for destinations owned by this player
         """
         score = 0
-        assigned_destinations = player_game_state.destinations
-        reached_destinations = self.ref_game_state.game_map.get_feasible_destinations(
-            player_game_state.connections)
-        for destination in assigned_destinations:
-            if destination in reached_destinations:
+        for destination in player_game_state.destinations:
+            if player_game_state.is_destination_complete(destination):
                 score += score_value
             else:
                 score -= score_value
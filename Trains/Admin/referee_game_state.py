@@ -1,9 +1,9 @@
 import sys
 from collections import deque
-from typing import Deque, List, Set
+from typing import Deque, Iterable, List, Set
 
 sys.path.append('../../')
-from Trains.Common.map import Color, Connection, Map
+from Trains.Common.map import Color, Connection, FreeConnectionIndex, Map
 from Trains.Common.player_game_state import PlayerGameState
 from Trains.Other.Util.constants import MIN_RAILS_TO_NOT_TRIGGER_LAST_TURN
 from Trains.Other.Util.func_utils import flatten_set
@@ -16,6 +16,12 @@ class RefereeGameState:
     determines what connections are available to the currently active player.
     """
     player_game_states: List[PlayerGameState]
+    free_connection_index: FreeConnectionIndex
+
+    @property
+    def free_connections(self) -> Set[Connection]:
+        """The connections that have not been acquired by a player, as tracked by the free connection index."""
+        return self.free_connection_index.get_free_connections()
 
     def __init__(self, game_map: Map, colored_card_deck: Deque[Color], player_game_states: List[PlayerGameState]) -> None:
         """
@@ -48,7 +54,7 @@ class RefereeGameState:
         self.player_game_states = player_game_states
         self.turn = 0
 
-        self.free_connections = self.get_all_unacquired_connections()
+        self.refresh_free_connections()
         self.colored_card_deck = colored_card_deck.copy()
 
     def __eq__(self, other) -> bool:
@@ -65,10 +71,48 @@ class RefereeGameState:
 
     def next_turn(self) -> None:
         """
-        Increments the turn counter and updates the set of unacquired connections.
+        Increments the turn counter. The set of unacquired connections is kept up to date as connections
+        are acquired and released, so it does not need to be recomputed.
         """
         self.turn = (self.turn + 1) % len(self.player_game_states)
-        self.free_connections = self.get_all_unacquired_connections()
+
+    def acquire_connection(self, connection: Connection) -> None:
+        """
+        Marks a connection as acquired so that it is no longer free. Should be called whenever
+        a player acquires a connection.
+            Parameters:
+                connection (Connection): The newly acquired connection
+        """
+        self.free_connection_index.acquire(connection)
+
+    def acquire_connection_for_player(self, player_index: int, connection: Connection) -> None:
+        """
+        Lets a player acquire a connection, paying for it with rails and colored cards, and marks the connection as
+        no longer free. Does not check whether the acquisition is legal.
+            Parameters:
+                player_index (int): The index of the player acquiring the connection
+                connection (Connection): The acquired connection
+        """
+        self.player_game_states[player_index] = self.player_game_states[player_index].with_acquisition(connection)
+        self.acquire_connection(connection)
+
+    def release_connections(self, connections: Iterable[Connection]) -> None:
+        """
+        Marks connections as free again, e.g. when the player holding them is booted.
+            Parameters:
+                connections (iterable(Connection)): The connections that are no longer acquired
+        """
+        for connection in connections:
+            self.free_connection_index.release(connection)
+
+    def refresh_free_connections(self) -> None:
+        """
+        Recomputes the set of unacquired connections from scratch. Only needed if player game states
+        were replaced without acquiring or releasing their connections through this game state.
+        """
+        self.free_connection_index = FreeConnectionIndex(self.game_map)
+        for connection in self.game_map.get_all_connections() - self.get_all_unacquired_connections():
+            self.free_connection_index.acquire(connection)
 
     def get_player_game_state(self) -> PlayerGameState:
         """
@@ -106,7 +150,7 @@ class RefereeGameState:
         conn_color = connection.color
         conn_length = connection.length
 
-        is_free_connection = connection in self.free_connections
+        is_free_connection = self.free_connection_index.is_free(connection)
         has_enough_rails = player_rails >= conn_length
         has_enough_colored_cards = player_cards[conn_color] >= conn_length
 
@@ -136,11 +180,8 @@ class RefereeGameState:
             Returns:
                 Set of acquireable connections
         """
-        acquirable_connections = set()
-        for connection in self.free_connections:
-            if self.verify_legal_connection_for_player(connection, player_game_state):
-                acquirable_connections.add(connection)
-        return acquirable_connections
+        return self.free_connection_index.get_acquirable_connections(player_game_state.rails,
+                                                                     player_game_state.colored_cards)
 
     def get_all_unacquired_connections(self) -> Set[Connection]:
         """
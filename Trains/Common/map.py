@@ -1,14 +1,18 @@
-import functools
 import json
 import sys
 from collections import deque
 from dataclasses import dataclass
 from enum import Enum
+from itertools import combinations
 from math import floor
-from typing import Deque, Dict, FrozenSet, Iterable, List, Set
+from typing import (Any, Deque, Dict, FrozenSet, Generic, Hashable, Iterable,
+                    List, Mapping, Optional, Sequence, Set, Tuple, TypeVar)
 
 sys.path.append('../../')
-from Trains.Other.Util.func_utils import memoize
+from Trains.Other.Util.func_utils import (memoize_method,
+                                          without_memoized_results)
+
+H = TypeVar("H", bound=Hashable)
 
 
 class Color(Enum):
@@ -38,7 +42,9 @@ class Color(Enum):
 @dataclass(frozen=True)
 class City:
     """A city represented by its name and its relative position
-    within the bounding box of a Map."""
+    within the bounding box of a Map.
+    Cities are slotted and cache their hash, since very many of them are created and hashed."""
+    __slots__ = ("name", "x", "y", "_hash")
 
     name: str
     x: float
@@ -47,6 +53,15 @@ class City:
     def __post_init__(self) -> None:
         if not isinstance(self.name, str):
             raise TypeError("City name must be a string")
+        # The dataclass is frozen, so the cached hash has to be set through object
+        object.__setattr__(self, "_hash", hash((self.name, self.x, self.y)))
+
+    def __hash__(self) -> int:
+        return self._hash
+
+    def __reduce__(self) -> Tuple[type, Tuple[str, float, float]]:
+        # A frozen slotted instance cannot be restored attribute by attribute, so it is rebuilt from its fields
+        return City, (self.name, self.x, self.y)
 
     def get_as_json(self) -> str:
         """
@@ -55,12 +70,22 @@ class City:
         return f"[\"{self.name}\", [{self.x}, {self.y}]]"
 
 
+def get_city_order_key(city: City) -> Tuple[str, float, float]:
+    """The key that orders cities by name, then by position."""
+    return (city.name, city.x, city.y)
+
+
 @dataclass(frozen=True)
 class Connection:
     """
     Represents a connection by the cities connected, color, and length
     Cities must be 2 distinct cities
+    Connections are slotted and cache their hash, sort key and ordered endpoints on construction.
     """
+    # The cached values are slots rather than dataclass fields, so they are not part of the constructor,
+    # equality or repr
+    __slots__ = ("cities", "color", "length", "_sort_key", "_endpoints", "_hash")
+
     cities: FrozenSet[City]
     color: Color
     length: int
@@ -90,6 +115,32 @@ class Connection:
         if self.length not in (3, 4, 5):
             raise ValueError("Length must be one of 3, 4, or 5")
 
+        city1, city2 = sorted(self.cities, key=get_city_order_key)
+        # The dataclass is frozen, so the cached values have to be set through object
+        object.__setattr__(self, "_endpoints", (city1, city2))
+        object.__setattr__(self, "_sort_key", (city1.name, city2.name, self.length, self.color.value))
+        object.__setattr__(self, "_hash", hash((self.cities, self.color, self.length)))
+
+    @property
+    def endpoints(self) -> Tuple[City, City]:
+        """The two cities of the connection, ordered by name (then position)."""
+        return self._endpoints
+
+    def __hash__(self) -> int:
+        return self._hash
+
+    def __reduce__(self) -> Tuple[type, Tuple[FrozenSet[City], Color, int]]:
+        return Connection, (self.cities, self.color, self.length)
+
+    @property
+    def sort_key(self) -> Tuple[str, str, int, str]:
+        """
+        The key that orders connections lexicographically: by first city name with tie breakers in the
+        following order: second city name, connection length, and finally color (string).
+        Computed once on construction, since connections are immutable.
+        """
+        return self._sort_key
+
     def __lt__(self, obj: object) -> int:
         """
         Special method for the 'less than' operator when comparing two Connections.
@@ -105,40 +156,26 @@ class Connection:
             raise ValueError(
                 "Cannot compare Connection to something else that is not a Connection.")
 
-        list_self = list(self.cities)
-        if list_self[1].name < list_self[0].name:
-            list_self[0], list_self[1] = list_self[1], list_self[0]
-        list_obj = list(obj.cities)
-        if list_obj[1].name < list_obj[0].name:
-            list_obj[0], list_obj[1] = list_obj[1], list_obj[0]
-
-        if list_self[0].name < list_obj[0].name:
-            return -1
-        elif list_self[0].name == list_obj[0].name and list_self[1].name < list_obj[1].name:
-            return -1
-        elif list_self[0].name == list_obj[0].name and list_self[1].name == list_obj[1].name and self.length < obj.length:
-            return -1
-        elif list_self[0].name == list_obj[0].name and list_self[1].name == list_obj[1].name and \
-                self.length == obj.length and self.color.value < obj.color.value:
-            return -1
-        else:
-            return 1
+        return -1 if self._sort_key < obj._sort_key else 1
 
     def get_as_json(self) -> str:
         """
         Returns the JSON string of Connection dataclass
         Will put alphanumerically first city first in JSON
         """
-        connection_city_names = sorted(city.name for city in self.cities)
-        json_connection = [connection_city_names[0],
-                           connection_city_names[1], self.color.value, self.length]
+        city1, city2 = self._endpoints
+        json_connection = [city1.name, city2.name, self.color.value, self.length]
         return json.dumps(json_connection)
 
 
 class Destination(FrozenSet[City]):
     """
     A Destination is a set of exactly two distinct cities.  Subclasses the frozenset class.
+    Destinations are slotted and cache their sort key and ordered endpoints on construction.
     """
+    __slots__ = ("_sort_key", "_endpoints")
+    _sort_key: Tuple[str, str]
+    _endpoints: Tuple[City, City]
 
     def __init__(self, cities: FrozenSet[City]) -> None:
         """
@@ -155,6 +192,27 @@ class Destination(FrozenSet[City]):
                 if type(city) is not City:
                     raise ValueError("Destinations must contain cities")
 
+        city1, city2 = sorted(cities, key=get_city_order_key)
+        self._endpoints = (city1, city2)
+        self._sort_key = (city1.name, city2.name)
+
+    @property
+    def endpoints(self) -> Tuple[City, City]:
+        """The two cities of the destination, ordered by name (then position)."""
+        return self._endpoints
+
+    def __reduce__(self) -> Tuple[type, Tuple[FrozenSet[City]]]:
+        # frozenset's default reduction passes a list, which the constructor rejects
+        return Destination, (frozenset(self),)
+
+    @property
+    def sort_key(self) -> Tuple[str, str]:
+        """
+        The key that orders destinations lexicographically: by first city name, with the second city name
+        as a tie breaker. Computed once on construction, since destinations are immutable.
+        """
+        return self._sort_key
+
     def __lt__(self, obj: object) -> int:
         """
         Special method for the 'less than' operator when comparing two Destinations.
@@ -170,26 +228,87 @@ class Destination(FrozenSet[City]):
             raise ValueError(
                 "Cannot compare Destination to something else that is not a Destination.")
 
-        list_self = list(self)
-        if list_self[1].name < list_self[0].name:
-            list_self[0], list_self[1] = list_self[1], list_self[0]
-        list_obj: List[City] = list(obj)
-        if list_obj[1].name < list_obj[0].name:
-            list_obj[0], list_obj[1] = list_obj[1], list_obj[0]
-
-        if list_self[0].name < list_obj[0].name:
-            return -1
-        elif list_self[0].name == list_obj[0].name and list_self[1].name < list_obj[1].name:
-            return -1
-        else:
-            return 1
+        return -1 if self._sort_key < obj._sort_key else 1
 
     def get_as_json(self) -> str:
         """
         Returns the JSON string of Destination dataclass
         Will put alphanumerically first city first in JSON
         """
-        return json.dumps(sorted([city.name for city in self]))
+        city1, city2 = self._endpoints
+        return json.dumps([city1.name, city2.name])
+
+
+class DisjointSet(Generic[H]):
+    """
+    A union-find structure over hashable items, used to compute connected components of cities.
+    Uses path halving and union by size, so a series of operations runs in near-linear time.
+    Items are added implicitly the first time they are seen.
+    """
+    _parents: Dict[H, H]
+    _sizes: Dict[H, int]
+
+    def __init__(self, items: Iterable[H] = ()) -> None:
+        self._parents = {}
+        self._sizes = {}
+        for item in items:
+            self.add(item)
+
+    def add(self, item: H) -> None:
+        """Adds the given item as its own singleton set, if it is not already known."""
+        if item not in self._parents:
+            self._parents[item] = item
+            self._sizes[item] = 1
+
+    def find(self, item: H) -> H:
+        """Returns the representative item of the set containing the given item."""
+        self.add(item)
+        parents = self._parents
+        while parents[item] != item:
+            parents[item] = parents[parents[item]]
+            item = parents[item]
+        return item
+
+    def union(self, item1: H, item2: H) -> H:
+        """Merges the sets containing the two given items and returns the representative of the merged set."""
+        root1 = self.find(item1)
+        root2 = self.find(item2)
+        if root1 == root2:
+            return root1
+        if self._sizes[root1] < self._sizes[root2]:
+            root1, root2 = root2, root1
+        self._parents[root2] = root1
+        self._sizes[root1] += self._sizes.pop(root2)
+        return root1
+
+    def copy(self) -> 'DisjointSet[H]':
+        """Returns an independent copy of this union-find."""
+        disjoint_set: DisjointSet[H] = DisjointSet()
+        disjoint_set._parents = {**self._parents}
+        disjoint_set._sizes = {**self._sizes}
+        return disjoint_set
+
+    def connected(self, item1: H, item2: H) -> bool:
+        """Determines whether the two given items are in the same set. Unknown items are only connected to themselves."""
+        if item1 not in self._parents or item2 not in self._parents:
+            return item1 == item2
+        return self.find(item1) == self.find(item2)
+
+    def get_component_ids(self) -> Dict[H, int]:
+        """Returns a mapping from each item to a dense id (0 to number of sets - 1) of the set that contains it."""
+        root_ids: Dict[H, int] = {}
+        component_ids: Dict[H, int] = {}
+        for item in self._parents:
+            root = self.find(item)
+            component_ids[item] = root_ids.setdefault(root, len(root_ids))
+        return component_ids
+
+    def get_components(self) -> List[Set[H]]:
+        """Returns the disjoint sets as a list of sets of items."""
+        components: Dict[H, Set[H]] = {}
+        for item in self._parents:
+            components.setdefault(self.find(item), set()).add(item)
+        return list(components.values())
 
 
 class Map:
@@ -198,12 +317,24 @@ class Map:
     should be held by the Referee and a deep copy of the map should be
     passed to players to prevent tampering. A map also has a width and height,
     which represent its display size.
+    Cities and connections are also assigned dense integer ids (0 to count - 1) in lexicographic order, so
+    that internals can work on ints and bitmasks of connection ids rather than on the objects themselves.
+    A map is immutable, so its hash is computed once on construction and its JSON once on first use.
     """
 
     _cities: Set[City]
     _connections: Set[Connection]
     _width: int
     _height: int
+    _cities_by_id: Tuple[City, ...]
+    _city_ids: Dict[City, int]
+    _connections_by_id: Tuple[Connection, ...]
+    _connection_ids: Dict[Connection, int]
+    _connection_endpoint_ids: Tuple[Tuple[int, int], ...]
+    _connection_ids_by_city_id: Tuple[Tuple[int, ...], ...]
+    _connection_buckets: Dict[Tuple[Color, int], Tuple[Connection, ...]]
+    _hash: int
+    _json: Optional[str]
 
     @property
     def cities(self) -> Set[City]:
@@ -256,6 +387,160 @@ class Map:
         self._connections = {*connections}
         self._width = width
         self._height = height
+        self._assign_ids()
+        self._hash = self._compute_hash()
+        self._json = None
+
+    def _assign_ids(self) -> None:
+        """Assigns the dense integer ids of the cities and connections and builds the id-based indexes."""
+        self._cities_by_id = tuple(sorted(self._cities, key=get_city_order_key))
+        self._city_ids = {city: city_id for city_id, city in enumerate(self._cities_by_id)}
+
+        self._connections_by_id = tuple(sorted(self._connections, key=lambda connection: connection.sort_key))
+        self._connection_ids = {connection: connection_id
+                                for connection_id, connection in enumerate(self._connections_by_id)}
+
+        endpoint_ids: List[Tuple[int, int]] = []
+        incident_connection_ids: List[List[int]] = [[] for _ in self._cities_by_id]
+        for connection_id, connection in enumerate(self._connections_by_id):
+            city_id1, city_id2 = sorted(self._city_ids[city] for city in connection.cities)
+            endpoint_ids.append((city_id1, city_id2))
+            incident_connection_ids[city_id1].append(connection_id)
+            incident_connection_ids[city_id2].append(connection_id)
+        self._connection_endpoint_ids = tuple(endpoint_ids)
+        self._connection_ids_by_city_id = tuple(tuple(ids) for ids in incident_connection_ids)
+
+        buckets: Dict[Tuple[Color, int], List[Connection]] = {}
+        for connection in self._connections_by_id:
+            buckets.setdefault((connection.color, connection.length), []).append(connection)
+        self._connection_buckets = {bucket: tuple(connections) for bucket, connections in buckets.items()}
+
+    def get_number_of_cities(self) -> int:
+        """Returns the number of cities on the map, which is also one more than the largest city id."""
+        return len(self._cities_by_id)
+
+    def get_number_of_connections(self) -> int:
+        """Returns the number of connections on the map, which is also one more than the largest connection id."""
+        return len(self._connections_by_id)
+
+    def get_city_id(self, city: City) -> int:
+        """
+        Returns the id of the given city
+            Parameters:
+                city (City): A city on the map
+            Returns:
+                (int): The id of the city
+            Throws:
+                ValueError: The city is not on the map
+        """
+        city_id = self._city_ids.get(city)
+        if city_id is None:
+            raise ValueError("City is not on the map")
+        return city_id
+
+    def get_city_by_id(self, city_id: int) -> City:
+        """
+        Returns the city with the given id
+            Parameters:
+                city_id (int): The id of a city on the map
+            Returns:
+                (City): The city with the id
+            Throws:
+                ValueError: There is no city with the given id
+        """
+        if not 0 <= city_id < len(self._cities_by_id):
+            raise ValueError("There is no city with the given id")
+        return self._cities_by_id[city_id]
+
+    def get_connections_in_order(self) -> Tuple[Connection, ...]:
+        """
+        Returns the connections on the map in their canonical (lexicographic) order, which is also the order of
+        their ids. The order is computed once, so callers can scan it instead of sorting connections themselves.
+            Returns
+                (tuple(Connection)): All connections on the map, ordered by Connection.sort_key
+        """
+        return self._connections_by_id
+
+    def get_connection_buckets(self) -> Dict[Tuple[Color, int], Tuple[Connection, ...]]:
+        """
+        Returns the connections on the map grouped by (color, length). Whether a player can pay for a connection
+        only depends on its color and length, so a query for affordable connections only has to look at the
+        buckets the player can pay for (at most 4 colors x 3 lengths).
+            Returns
+                (dict((Color, int), tuple(Connection))): The connections of each (color, length), in canonical order
+        """
+        return {**self._connection_buckets}
+
+    def has_connection(self, connection: Connection) -> bool:
+        """Determines whether the given connection is on the map."""
+        return connection in self._connection_ids
+
+    def get_connection_id(self, connection: Connection) -> int:
+        """
+        Returns the id of the given connection, which is also its rank in the canonical (lexicographic) order
+            Parameters:
+                connection (Connection): A connection on the map
+            Returns:
+                (int): The id of the connection
+            Throws:
+                ValueError: The connection is not on the map
+        """
+        connection_id = self._connection_ids.get(connection)
+        if connection_id is None:
+            raise ValueError("Connection is not on the map")
+        return connection_id
+
+    def get_connection_by_id(self, connection_id: int) -> Connection:
+        """
+        Returns the connection with the given id
+            Parameters:
+                connection_id (int): The id of a connection on the map
+            Returns:
+                (Connection): The connection with the id
+            Throws:
+                ValueError: There is no connection with the given id
+        """
+        if not 0 <= connection_id < len(self._connections_by_id):
+            raise ValueError("There is no connection with the given id")
+        return self._connections_by_id[connection_id]
+
+    def get_connection_endpoint_ids(self, connection_id: int) -> Tuple[int, int]:
+        """Returns the ids of the two cities of the connection with the given id, smallest first."""
+        return self._connection_endpoint_ids[connection_id]
+
+    def get_connection_ids_from_city_id(self, city_id: int) -> Tuple[int, ...]:
+        """Returns the ids of the connections that have the city with the given id as an endpoint."""
+        return self._connection_ids_by_city_id[city_id]
+
+    def get_connections_as_bitmask(self, connections: Iterable[Connection]) -> int:
+        """
+        Encodes the given connections as a bitmask where bit i is set if the connection with id i is included.
+            Parameters:
+                connections (iterable(Connection)): Connections on the map
+            Returns:
+                (int): The bitmask of connection ids
+            Throws:
+                ValueError: A connection is not on the map
+        """
+        bitmask = 0
+        for connection in connections:
+            bitmask |= 1 << self.get_connection_id(connection)
+        return bitmask
+
+    def get_connections_from_bitmask(self, bitmask: int) -> Set[Connection]:
+        """
+        Decodes a bitmask of connection ids (see `get_connections_as_bitmask`) into the connections.
+            Parameters:
+                bitmask (int): The bitmask of connection ids
+            Returns:
+                (set(Connection)): The connections whose ids are set in the bitmask
+        """
+        connections: Set[Connection] = set()
+        while bitmask:
+            lowest_bit = bitmask & -bitmask
+            connections.add(self._connections_by_id[lowest_bit.bit_length() - 1])
+            bitmask ^= lowest_bit
+        return connections
 
     def get_city_names(self) -> Set[str]:
         """
@@ -291,6 +576,19 @@ class Map:
         """
         return self.connections
 
+    def get_connections_from_city(self, city: City) -> Set[Connection]:
+        """
+        Returns all the connections on the map that have the given city as an endpoint
+            Parameters:
+                city (City): The city to get the incident connections of
+            Returns:
+                (set(Connection)): The connections incident to the city (empty if the city is not on the map)
+        """
+        city_id = self._city_ids.get(city)
+        if city_id is None:
+            return set()
+        return {self._connections_by_id[connection_id] for connection_id in self._connection_ids_by_city_id[city_id]}
+
     def get_all_feasible_destinations(self) -> Set[Destination]:
         """
         Returns a copy of all feasible destinations that can be made from the map's connections
@@ -299,7 +597,26 @@ class Map:
         """
         return {*self._get_all_feasible_destinations_memoed()}
 
-    @memoize
+    def count_feasible_destinations(self) -> int:
+        """
+        Counts the feasible destinations that can be made from the map's connections without building them.
+        Each connected component of n cities contributes n choose 2 destinations.
+            Returns
+                (int): The number of possible destinations in the map
+        """
+        return sum(size * (size - 1) // 2 for size in self._get_all_component_sizes_memoed())
+
+    @memoize_method()
+    def _get_all_component_sizes_memoed(self) -> List[int]:
+        """
+        Returns the number of cities in each connected component of the map's connections.
+        This is an internal memoized function.
+            Returns
+                (list(int)): The sizes of the map's connected components
+        """
+        return [len(component) for component in self.get_connected_components(self._connections)]
+
+    @memoize_method()
     def _get_all_feasible_destinations_memoed(self) -> Set[Destination]:
         """
         Returns all feasible destinations that can be made from the map's connections
@@ -319,16 +636,42 @@ class Map:
             Returns
                 (set(Destination)): All possible destinations from subset of connections
         """
-        starting_cities = self.get_cities_from_connections(connections)
         destinations: Set[Destination] = set()
-        for city in starting_cities:
-            terminal_cities = self.get_all_terminal_cities_from_city(
-                city, connections)
-            for terminal_city in terminal_cities:
-                destinations.add(Destination(frozenset({city, terminal_city})))
+        for component in self.get_connected_components(connections):
+            for city1, city2 in combinations(component, 2):
+                destinations.add(Destination(frozenset({city1, city2})))
 
         return destinations
 
+    def get_connected_components(self, connections: Set[Connection]) -> List[Set[City]]:
+        """
+        Returns the groups of cities that are connected to each other via some path of the given connections.
+        Only cities that are an endpoint of one of the connections are included.
+            Parameters:
+                connections (set(Connection)): set of connections on map
+            Returns
+                (list(set(City))): The connected components of the cities in the given connections
+        """
+        return self._get_city_disjoint_set(connections).get_components()
+
+    def get_component_ids(self, connections: Set[Connection]) -> Dict[City, int]:
+        """
+        Assigns each city in the given connections the id of its connected component. Two cities share an
+        id exactly when they are connected via some path of the given connections.
+            Parameters:
+                connections (set(Connection)): set of connections on map
+            Returns
+                (dict(City, int)): The component id of each city, ids range from 0 to number of components - 1
+        """
+        return self._get_city_disjoint_set(connections).get_component_ids()
+
+    def _get_city_disjoint_set(self, connections: Iterable[Connection]) -> DisjointSet[City]:
+        """Builds a union-find over the endpoints of the given connections."""
+        city_sets: DisjointSet[City] = DisjointSet()
+        for connection in connections:
+            city_sets.union(*connection.endpoints)
+        return city_sets
+
     def get_all_terminal_cities_from_city(self, city: City, connections: Set[Connection]) -> List[City]:
         """
         Finds the list of cities that can be reached from a given starting city
@@ -339,46 +682,71 @@ class Map:
             Returns:
                 a list of cities (list(City))
         """
-        visit_q: Deque[City] = deque()
-        visit_q.append(city)
-        visited = []
-        all_connection_cities = [
-            connection.cities for connection in connections]
+        if city in self._city_ids and self._connections.issuperset(connections):
+            return self._get_all_terminal_city_ids_from_city_id(
+                self._city_ids[city], self.get_connections_as_bitmask(connections))
+
+        # Connections that are not on the map have no ids, so they are indexed for this search only
+        adjacency = build_adjacency(self.get_cities_from_connections(connections), connections)
+        visit_q: Deque[City] = deque([city])
+        visited = {city}
+        terminal_cities: List[City] = []
 
         while len(visit_q) > 0:
             current_city = visit_q.popleft()
-            visited.append(current_city)
-
-            for connection_cities in all_connection_cities:
-                if current_city in connection_cities:
-                    for neighbor in connection_cities:
-                        if neighbor not in visited:
-                            visit_q.append(neighbor)
+            for connection in adjacency.get(current_city, ()):
+                if connection not in connections:
+                    continue
+                for neighbor in connection.cities:
+                    if neighbor not in visited:
+                        visited.add(neighbor)
+                        terminal_cities.append(neighbor)
+                        visit_q.append(neighbor)
+
+        return terminal_cities
+
+    def _get_all_terminal_city_ids_from_city_id(self, city_id: int, connections_bitmask: int) -> List[City]:
+        """Breadth-first search over city and connection ids, only following connections in the bitmask."""
+        visit_q: Deque[int] = deque([city_id])
+        visited = {city_id}
+        terminal_cities: List[City] = []
 
-        visited.remove(city)
-        return visited
+        while len(visit_q) > 0:
+            current_city_id = visit_q.popleft()
+            for connection_id in self._connection_ids_by_city_id[current_city_id]:
+                if not connections_bitmask >> connection_id & 1:
+                    continue
+                city_id1, city_id2 = self._connection_endpoint_ids[connection_id]
+                neighbor_id = city_id2 if city_id1 == current_city_id else city_id1
+                if neighbor_id not in visited:
+                    visited.add(neighbor_id)
+                    terminal_cities.append(self._cities_by_id[neighbor_id])
+                    visit_q.append(neighbor_id)
+
+        return terminal_cities
 
     def get_as_json(self) -> str:
         """
         Returns the JSON string of Map dataclass
         Will put alphanumerically first city/connection first in JSON
+        The string is built on the first call and shared by every later call, e.g. when a tournament
+        map is sent to each remote player of each game.
         """
+        if self._json is None:
+            self._json = self._build_json()
+        return self._json
+
+    def _build_json(self) -> str:
+        """Builds the JSON string returned by `get_as_json`."""
         city_json = []
-        for city in self.cities:
+        for city in self._cities:
             city_json.append(
                 f"[\"{city.name}\", [{floor(city.x * self.width / 100)}, {floor(city.y * self.height / 100)}]]")
         city_json.sort()
 
         connections_dict: Dict[str, Dict[str, Dict[str, int]]] = dict()
-        connections_list = list(self.connections)
-        connections_list.sort(key=functools.cmp_to_key(Connection.__lt__))
-        for connection in connections_list:
-            connection_cities_json = []
-            for city in connection.cities:
-                connection_cities_json.append(city.name)
-            connection_cities_json.sort()
-            city1 = connection_cities_json[0]
-            city2 = connection_cities_json[1]
+        for connection in self._connections_by_id:
+            city1, city2 = (city.name for city in connection.endpoints)
             if city1 not in connections_dict.keys():
                 connections_dict[city1] = {
                     city2: {connection.color.value: connection.length}}
@@ -392,15 +760,155 @@ class Map:
         return f"{{\"cities\": [{', '.join(city_json)}], \"connections\": {json.dumps(connections_dict)}, \"height\": {self.height}, \"width\": {self.width}}}"
 
     def __eq__(self, obj: object) -> bool:
+        if obj is self:
+            return True
         if isinstance(obj, Map):
-            return (obj.cities, obj.connections, obj.width, obj.height) == (self.cities, self.connections, self.width, self.height)
+            return obj._hash == self._hash \
+                and (obj._cities, obj._connections, obj._width, obj._height) \
+                == (self._cities, self._connections, self._width, self._height)
         return False
 
     def __hash__(self) -> int:
-        cities_hash = sum(hash(city) for city in self.cities)
+        return self._hash
+
+    def _compute_hash(self) -> int:
+        """Computes the hash of the map from its cities, connections and size."""
+        cities_hash = sum(hash(city) for city in self._cities)
         connections_hash = sum(hash(connection)
-                               for connection in self.connections)
-        return hash((cities_hash, connections_hash, self.width, self.height))
+                               for connection in self._connections)
+        return hash((cities_hash, connections_hash, self._width, self._height))
+
+    def __getstate__(self) -> Dict[str, Any]:
+        # String hashes differ between interpreters, so the cached hash is not carried across a pickle,
+        # and memoized results are recomputed on demand rather than copied
+        state = without_memoized_results(self.__dict__)
+        del state["_hash"]
+        return state
+
+    def __setstate__(self, state: Dict[str, Any]) -> None:
+        self.__dict__.update(state)
+        self._hash = self._compute_hash()
+
+
+class FreeConnectionIndex:
+    """
+    The free (unacquired) connections of a map, grouped by (color, length) and kept as one bitmask of connection
+    ids per group (see Map). It is updated as connections are acquired and released, so a query for the connections
+    a player can pay for only looks at the groups the player can afford (at most 4 colors x 3 lengths).
+    The referee updates it with each acquisition. Players, who only see game states, update it with
+    `update_acquisitions`, which applies the changes since the previous game state.
+        Parameters:
+            game_map (Map): The map whose connections are indexed, all of which start out free
+    """
+    game_map: Map
+    _free_masks: Dict[Tuple[Color, int], int]
+    _known_acquisitions: List[FrozenSet[Connection]]
+
+    def __init__(self, game_map: Map) -> None:
+        self.game_map = game_map
+        self._free_masks = {bucket: game_map.get_connections_as_bitmask(connections)
+                            for bucket, connections in game_map.get_connection_buckets().items()}
+        self._known_acquisitions = []
+
+    def acquire(self, connection: Connection) -> None:
+        """Marks the given connection of the map as acquired."""
+        self._free_masks[(connection.color, connection.length)] &= ~(1 << self.game_map.get_connection_id(connection))
+
+    def release(self, connection: Connection) -> None:
+        """Marks the given connection of the map as free again."""
+        self._free_masks[(connection.color, connection.length)] |= 1 << self.game_map.get_connection_id(connection)
+
+    def update_acquisitions(self, acquisitions: Sequence[FrozenSet[Connection]]) -> None:
+        """
+        Brings the index up to date with the given acquisitions of every player, e.g. a player's own connections
+        followed by the other players' acquisitions of a PlayerGameState. Only the differences to the acquisitions
+        of the previous update are applied, and a player's acquisitions that are the same set as in the previous
+        update (game states share unchanged acquisitions) are skipped. An index kept up to date this way should
+        not also be changed with `acquire` and `release`.
+            Parameters:
+                acquisitions (sequence(frozenset(Connection))): The connections acquired by each player
+        """
+        known_acquisitions = self._known_acquisitions
+        number_of_players = max(len(known_acquisitions), len(acquisitions))
+        changes = []
+        for player_index in range(number_of_players):
+            known = known_acquisitions[player_index] if player_index < len(known_acquisitions) else frozenset()
+            acquired = acquisitions[player_index] if player_index < len(acquisitions) else frozenset()
+            if acquired is not known:
+                changes.append((known, acquired))
+
+        # A connection can move between players (e.g. when the same index is used for the game states of
+        # different players), so everything that was released is freed before anything acquired is taken
+        for known, acquired in changes:
+            for connection in known - acquired:
+                self.release(connection)
+        for known, acquired in changes:
+            for connection in acquired - known:
+                self.acquire(connection)
+        self._known_acquisitions = list(acquisitions)
+
+    def is_free(self, connection: Connection) -> bool:
+        """Determines whether the given connection is free. Connections that are not on the map are never free."""
+        if not self.game_map.has_connection(connection):
+            return False
+        return bool(self._free_masks[(connection.color, connection.length)]
+                    >> self.game_map.get_connection_id(connection) & 1)
+
+    def get_free_bitmask(self) -> int:
+        """Returns the bitmask of the ids of all free connections."""
+        free = 0
+        for free_mask in self._free_masks.values():
+            free |= free_mask
+        return free
+
+    def get_free_connections(self) -> Set[Connection]:
+        """Returns all free connections."""
+        return self.game_map.get_connections_from_bitmask(self.get_free_bitmask())
+
+    def get_acquirable_bitmask(self, rails: int, colored_cards: Mapping[Color, int]) -> int:
+        """
+        Determines the free connections a player with the given resources can pay for.
+            Parameters:
+                rails (int): The player's number of rails
+                colored_cards (dict(Color, int)): The player's hand of colored cards
+            Returns:
+                (int) The bitmask of the ids of the acquirable connections
+        """
+        acquirable = 0
+        for (color, length), free_mask in self._free_masks.items():
+            if rails >= length and colored_cards.get(color, 0) >= length:
+                acquirable |= free_mask
+        return acquirable
+
+    def get_acquirable_connections(self, rails: int, colored_cards: Mapping[Color, int]) -> Set[Connection]:
+        """Returns the free connections a player with the given resources can pay for."""
+        return self.game_map.get_connections_from_bitmask(self.get_acquirable_bitmask(rails, colored_cards))
+
+    def get_first_acquirable_connection(self, rails: int, colored_cards: Mapping[Color, int]) -> Optional[Connection]:
+        """
+        Returns the lexicographically first free connection a player with the given resources can pay for, or None
+        if there is none.
+        """
+        acquirable = self.get_acquirable_bitmask(rails, colored_cards)
+        if acquirable == 0:
+            return None
+        return self.game_map.get_connection_by_id((acquirable & -acquirable).bit_length() - 1)
+
+
+def build_adjacency(cities: Iterable[City], connections: Iterable[Connection]) -> Dict[City, Set[Connection]]:
+    """
+    Builds an index from each city to the connections that have it as an endpoint.
+        Parameters:
+            cities (iterable(City)): The cities to index (cities without connections map to an empty set)
+            connections (iterable(Connection)): The connections to index
+        Returns:
+            (dict(City, set(Connection))): The city to incident connections index
+    """
+    adjacency: Dict[City, Set[Connection]] = {city: set() for city in cities}
+    for connection in connections:
+        for city in connection.cities:
+            adjacency.setdefault(city, set()).add(connection)
+    return adjacency
 
 
 def is_out_of_bounds(city: City, width: int, height: int) -> bool:
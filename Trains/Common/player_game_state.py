@@ -1,9 +1,11 @@
 import json
 import sys
-from typing import Any, Dict, List, Set
+from types import MappingProxyType
+from typing import (Any, Dict, FrozenSet, List, Mapping, Optional, Sequence,
+                    Set, Tuple, Union)
 
 sys.path.append('../../')
-from Trains.Common.map import Color, Connection, Destination
+from Trains.Common.map import City, Color, Connection, Destination, DisjointSet
 from Trains.Other.Util.map_utils import (
     get_lexicographic_order_of_connections,
     get_lexicographic_order_of_destinations)
@@ -13,41 +15,46 @@ class PlayerGameState:
     """
     Represents a player game state through the resources available to a player, their
     acquired connections, destinations, and knowledge of other players.
+    A player game state is immutable: its accessors return shared read-only views (frozen sets, a read-only
+    mapping of cards and a tuple of opponents' acquisitions), and updates create a new player game state.
         Parameters:
-            connections (set): Set of a player's connections
+            connections (set or frozenset): Set of a player's connections
             colored_cards (dict): Dictionary of a player's colored cards
             rails (int): The number of rail segments a player has
-            destinations (set): A set of a player's 2 destinations
-            other_acquisitions (list): A list of sets that tracks other players's connections.
+            destinations (set or frozenset): A set of a player's 2 destinations
+            other_acquisitions (list or tuple): A sequence of sets that tracks other players's connections.
     """
-    _connections: Set[Connection]
-    _colored_cards: Dict[Color, int]
+    _connections: FrozenSet[Connection]
+    _colored_cards: Mapping[Color, int]
     _rails: int
-    _destinations: Set[Destination]
-    _other_acquisitions: List[Set[Connection]]
+    _destinations: FrozenSet[Destination]
+    _other_acquisitions: Tuple[FrozenSet[Connection], ...]
+    _network: Optional[DisjointSet[City]]
 
     @property
-    def connections(self) -> Set[Connection]:
-        return {*self._connections}
+    def connections(self) -> FrozenSet[Connection]:
+        return self._connections
 
     @property
-    def colored_cards(self) -> Dict[Color, int]:
-        return {**self._colored_cards}
+    def colored_cards(self) -> Mapping[Color, int]:
+        return self._colored_cards
 
     @property
     def rails(self) -> int:
         return self._rails
 
     @property
-    def destinations(self) -> Set[Destination]:
-        return {*self._destinations}
+    def destinations(self) -> FrozenSet[Destination]:
+        return self._destinations
 
     @property
-    def other_acquisitions(self) -> List[Set[Connection]]:
-        return [{*acquired} for acquired in self._other_acquisitions]
+    def other_acquisitions(self) -> Tuple[FrozenSet[Connection], ...]:
+        return self._other_acquisitions
 
-    def __init__(self, connections: Set[Connection], colored_cards: Dict[Color, int], rails: int, \
-        destinations: Set[Destination], other_acquisitions: List[Set[Connection]]) -> None:
+    def __init__(self, connections: Union[Set[Connection], FrozenSet[Connection]], \
+        colored_cards: Mapping[Color, int], rails: int, \
+        destinations: Union[Set[Destination], FrozenSet[Destination]], \
+        other_acquisitions: Sequence[Union[Set[Connection], FrozenSet[Connection]]]) -> None:
         """
         Checks the validity of the PlayerResources dataclass fields
             Throws:
@@ -60,9 +67,9 @@ class PlayerGameState:
                     - game info must be a dictionary
                     - opponent info must be a list of dictionaries
         """
-        if type(connections) is not set:
+        if type(connections) is not set and type(connections) is not frozenset:
             raise TypeError("Connections must be a set")
-        if type(colored_cards) is not dict:
+        if type(colored_cards) is not dict and type(colored_cards) is not MappingProxyType:
             raise TypeError("Colored cards must be a dictionary")
         else:
             for num in colored_cards.values():
@@ -71,24 +78,121 @@ class PlayerGameState:
                         "The number of cards for a color cannot be negative")
         if rails < 0:
             raise ValueError("Player must have 0 or more rails")
-        if type(destinations) is not set:
+        if type(destinations) is not set and type(destinations) is not frozenset:
             raise TypeError("Destinations must be in a set")
         for destination in list(destinations):
             if type(destination) is not Destination:
                 raise TypeError("Destinations must be of type Destination")
-        if type(other_acquisitions) is not list:
+        if type(other_acquisitions) is not list and type(other_acquisitions) is not tuple:
             raise TypeError("other_acquisitions argument must be a list")
         else:
-            if any(type(item) is not set for item in other_acquisitions):
+            if any(type(item) is not set and type(item) is not frozenset for item in other_acquisitions):
                 raise TypeError(
                     "All entries in the other_acquisitions list must be a set of connections.")
 
-        self._connections = {*connections}
-        self._colored_cards = {**colored_cards}
+        # frozenset returns an existing frozenset as is, so unchanged parts are shared between states rather
+        # than copied. The cards are copied, since a read-only mapping may still be backed by a mutable dict.
+        self._connections = frozenset(connections)
+        self._colored_cards = MappingProxyType({**colored_cards})
         self._rails = rails
-        self._destinations = {*destinations}
-        self._other_acquisitions = [{*acquired}
-                                    for acquired in other_acquisitions]
+        self._destinations = frozenset(destinations)
+        self._other_acquisitions = tuple(frozenset(acquired)
+                                         for acquired in other_acquisitions)
+        # The connectivity of `connections`, built on first use. It is never changed once built, so states with
+        # the same connections share it.
+        self._network = None
+
+    @classmethod
+    def _create_trusted(cls, connections: FrozenSet[Connection], colored_cards: Mapping[Color, int], rails: int,
+                        destinations: FrozenSet[Destination], other_acquisitions: Tuple[FrozenSet[Connection], ...],
+                        network: DisjointSet[City]) -> 'PlayerGameState':
+        """
+        Creates a player game state from parts that are already known to be valid and immutable, skipping the
+        validation and copying done by the constructor. Only for use with parts taken from other player game
+        states (or built from them), never with input from players.
+        The given network must describe exactly the given connections, and must not be changed afterwards.
+        """
+        pgs = cls.__new__(cls)
+        pgs._connections = connections
+        pgs._colored_cards = colored_cards
+        pgs._rails = rails
+        pgs._destinations = destinations
+        pgs._other_acquisitions = other_acquisitions
+        pgs._network = network
+        return pgs
+
+    def with_cards(self, colored_cards: Mapping[Color, int]) -> 'PlayerGameState':
+        """
+        Creates a copy of this player game state with the given hand of colored cards.
+        INTENDED CALLER: Referee
+            Parameters:
+                colored_cards (dict): The new hand of colored cards
+            Returns:
+                The updated PlayerGameState
+        """
+        return PlayerGameState._create_trusted(self._connections, MappingProxyType({**colored_cards}), self._rails,
+                                               self._destinations, self._other_acquisitions, self._get_network())
+
+    def with_acquisition(self, connection: Connection) -> 'PlayerGameState':
+        """
+        Creates a copy of this player game state in which the given connection has been acquired, paying
+        for it with rails and colored cards. Does not check whether the acquisition is legal.
+        INTENDED CALLER: Referee
+            Parameters:
+                connection (Connection): The acquired connection
+            Returns:
+                The updated PlayerGameState
+        """
+        colored_cards = {**self._colored_cards}
+        colored_cards[connection.color] -= connection.length
+
+        # The connectivity is extended with the new connection instead of being recomputed. The earlier network is
+        # shared with other states, so the union is made on a copy of it (which only covers this player's cities).
+        network = self._get_network().copy()
+        network.union(*connection.endpoints)
+        return PlayerGameState._create_trusted(self._connections | {connection}, MappingProxyType(colored_cards),
+                                               self._rails - connection.length, self._destinations,
+                                               self._other_acquisitions, network)
+
+    def with_other_acquisitions(self, other_acquisitions: Tuple[FrozenSet[Connection], ...]) -> 'PlayerGameState':
+        """
+        Creates a copy of this player game state with the given knowledge of other players' acquisitions.
+        INTENDED CALLER: Referee
+            Parameters:
+                other_acquisitions (tuple(frozenset(Connection))): Other players' connections, in turn order
+            Returns:
+                The updated PlayerGameState
+        """
+        return PlayerGameState._create_trusted(self._connections, self._colored_cards, self._rails,
+                                               self._destinations, other_acquisitions, self._get_network())
+
+    def get_network(self) -> DisjointSet[City]:
+        """
+        Gets a copy of the connectivity of this player's acquired connections.
+            Returns:
+                (DisjointSet) A union-find over the cities of the player's connections
+        """
+        return self._get_network().copy()
+
+    def is_destination_complete(self, destination: Destination) -> bool:
+        """
+        Determines whether the cities of the given destination are connected via the player's connections.
+            Parameters:
+                destination (Destination): The destination to check
+            Returns:
+                True if the destination is connected, False otherwise
+        """
+        city1, city2 = destination
+        return self._get_network().connected(city1, city2)
+
+    def _get_network(self) -> DisjointSet[City]:
+        """Gets the connectivity of this player's connections, building it on first use."""
+        if self._network is None:
+            network: DisjointSet[City] = DisjointSet()
+            for connection in self._connections:
+                network.union(*connection.endpoints)
+            self._network = network
+        return self._network
 
     def get_total_cards(self) -> int:
         """
@@ -2,6 +2,7 @@ import sys
 from typing import Deque, List, Optional, Set
 
 sys.path.append("../../../")
+from Trains.Admin.destination_sampler import DestinationSampler
 from Trains.Admin.referee import Referee
 from Trains.Common.map import Color, Destination, Map
 from Trains.Other.Util.map_utils import get_lexicographic_order_of_destinations
@@ -16,18 +17,18 @@ class ConfigurableDestinationReferee(Referee):
     def __init__(self, game_map: Map, players: List[PlayerInterface], deck: Optional[Deque[Color]] = None):
         super().__init__(game_map, players, deck)
 
-    def get_destination_selection(self, feasible_destinations: Set[Destination], number_of_destinations: int) -> Set[Destination]:
+    def get_destination_selection(self, destination_sampler: DestinationSampler, number_of_destinations: int) -> Set[Destination]:
         """
         Gets the subset of feasible destinations that a player will choose their destinations from on setup.
         This subset of destinations consists of the first `number_of_destinations` destinations in the
-        lexicographical ordering of the given feasible destinations.
+        lexicographical ordering of the available feasible destinations.
             Parameters:
-                feasible_destinations (set(Destination)): Set of all feasible destinations on a game map
+                destination_sampler (DestinationSampler): Sampler over the feasible destinations on a game map that have not been chosen
                 number_of_destinations (int): The number of destinations that a player can select from
             Returns:
                 (set(Destination)) The set of destinations that a player will select from
         """
         sorted_destinations = get_lexicographic_order_of_destinations(
-            list(feasible_destinations))
+            list(destination_sampler.get_available_destinations()))
         destination_options = set(sorted_destinations[:number_of_destinations])
         return destination_options
@@ -4,7 +4,7 @@ from typing import Optional
 sys.path.append("../../../")
 from Trains.Common.map import Map
 from Trains.Common.player_game_state import PlayerGameState
-from Trains.Other.Util.constants import DEFAULT_MAP
+from Trains.Other.Util.constants import get_default_map
 from Trains.Player.hold_10 import Hold_10
 from Trains.Player.moves import IPlayerMove
 from Trains.Player.player import StrategicPlayer
@@ -32,7 +32,7 @@ class MockTournamentPlayer(StrategicPlayer):
         """
         super().__init__(name, strategy)
         self._move = move
-        self._start_game_map = start_game_map if start_game_map is not None else DEFAULT_MAP
+        self._start_game_map = start_game_map if start_game_map is not None else get_default_map()
         self._is_winner = None
         self._is_tournament_winner = None
 
@@ -0,0 +1,133 @@
+import sys
+import unittest
+from collections import deque
+
+sys.path.append('../../../')
+
+from Trains.Admin.compact_game_state import CompactGameState
+from Trains.Admin.referee_game_state import RefereeGameState
+from Trains.Common.map import City, Color, Connection, Destination, Map
+from Trains.Common.player_game_state import PlayerGameState
+
+
+class TestCompactGameState(unittest.TestCase):
+    def setUp(self):
+        self.boston = City("Boston", 70, 80)
+        self.new_york = City("New York", 60, 70)
+        self.philadelphia = City("Philadelphia", 90, 10)
+        self.wdc = City("Washington D.C.", 55, 60)
+        # Connection ids follow lexicographic order: connection1 is 0, connection3 is 1, connection2 is 2, connection4 is 3
+        self.connection1 = Connection(frozenset({self.boston, self.new_york}), Color.BLUE, 3)
+        self.connection2 = Connection(frozenset({self.philadelphia, self.new_york}), Color.RED, 4)
+        self.connection3 = Connection(frozenset({self.boston, self.philadelphia}), Color.GREEN, 5)
+        self.connection4 = Connection(frozenset({self.philadelphia, self.wdc}), Color.WHITE, 5)
+        self.game_map = Map({self.boston, self.new_york, self.philadelphia, self.wdc},
+                            {self.connection1, self.connection2, self.connection3, self.connection4})
+
+        self.dest1 = Destination({self.boston, self.philadelphia})
+        self.dest2 = Destination({self.new_york, self.wdc})
+        self.hand1 = {Color.RED: 4, Color.BLUE: 3, Color.GREEN: 0, Color.WHITE: 0}
+        self.hand2 = {Color.RED: 0, Color.BLUE: 0, Color.GREEN: 5, Color.WHITE: 2}
+        self.pgs1 = PlayerGameState({self.connection1}, self.hand1, 10, {self.dest1, self.dest2}, [])
+        self.pgs2 = PlayerGameState(set(), self.hand2, 2, {self.dest1, self.dest2}, [])
+        self.deck = deque([Color.WHITE, Color.RED, Color.GREEN])
+        self.rgs = RefereeGameState(self.game_map, self.deck, [self.pgs1, self.pgs2])
+        self.cgs = CompactGameState.from_referee_game_state(self.rgs)
+
+    def test_from_referee_game_state(self):
+        self.assertEqual(self.cgs.get_number_of_players(), 2)
+        self.assertEqual(self.cgs.get_ownership(0), 0b0001)
+        self.assertEqual(self.cgs.get_ownership(1), 0)
+        self.assertEqual(self.cgs.get_free_connections(), 0b1110)
+        self.assertEqual(self.cgs.get_hand(0), (4, 3, 0, 0))
+        self.assertEqual(self.cgs.get_rails(1), 2)
+        self.assertEqual(self.cgs.get_deck_size(), 3)
+
+    def test_from_player_game_states(self):
+        self.cgs.acquire_connection(0, 2)
+        player_game_states = [self.cgs.get_player_game_state(0), self.cgs.get_player_game_state(1)]
+        cgs = CompactGameState.from_player_game_states(self.game_map, player_game_states, list(self.deck), 1)
+        self.assertEqual(cgs.get_ownership(0), 0b0101)
+        self.assertEqual(cgs.get_free_connections(), 0b1010)
+        self.assertEqual(cgs.get_hand(0), (0, 3, 0, 0))
+        self.assertEqual(cgs.get_rails(0), 6)
+        self.assertEqual(cgs.turn, 1)
+        self.assertEqual(cgs.get_player_game_state(1), player_game_states[1])
+
+    def test_get_player_game_state(self):
+        self.assertEqual(self.cgs.get_player_game_state(0),
+                         PlayerGameState({self.connection1}, self.hand1, 10, {self.dest1, self.dest2}, [set()]))
+        self.assertEqual(self.cgs.get_player_game_state(1),
+                         PlayerGameState(set(), self.hand2, 2, {self.dest1, self.dest2}, [{self.connection1}]))
+
+    def test_is_legal_acquisition(self):
+        self.assertTrue(self.cgs.is_legal_acquisition(0, 2))
+        # Already acquired
+        self.assertFalse(self.cgs.is_legal_acquisition(0, 0))
+        # Not enough cards
+        self.assertFalse(self.cgs.is_legal_acquisition(0, 1))
+        # Not enough rails
+        self.assertFalse(self.cgs.is_legal_acquisition(1, 1))
+
+    def test_get_acquirable_connections(self):
+        self.assertEqual(self.cgs.get_acquirable_connections(0), 0b0100)
+        self.assertEqual(self.cgs.get_acquirable_connections(1), 0)
+        self.assertEqual(self.rgs.get_all_acquirable_connections(self.pgs1), {self.connection2})
+
+    def test_acquire_connection(self):
+        self.cgs.acquire_connection(0, 2)
+        self.assertEqual(self.cgs.get_ownership(0), 0b0101)
+        self.assertEqual(self.cgs.get_free_connections(), 0b1010)
+        self.assertEqual(self.cgs.get_rails(0), 6)
+        self.assertEqual(self.cgs.get_hand(0), (0, 3, 0, 0))
+        self.assertEqual(self.cgs.get_connections(0), [self.connection1, self.connection2])
+
+    def test_acquire_connection_illegal(self):
+        with self.assertRaises(ValueError):
+            self.cgs.acquire_connection(1, 0)
+
+    def test_draw_cards(self):
+        self.assertEqual(self.cgs.draw_cards(1, 2), 2)
+        self.assertEqual(self.cgs.get_hand(1), (1, 0, 6, 2))
+        self.assertEqual(self.cgs.draw_cards(1, 2), 1)
+        self.assertEqual(self.cgs.get_hand(1), (1, 0, 6, 3))
+        self.assertEqual(self.cgs.draw_cards(1, 2), 0)
+
+    def test_release_player(self):
+        self.cgs.release_player(0)
+        self.assertEqual(self.cgs.get_ownership(0), 0)
+        self.assertEqual(self.cgs.get_free_connections(), 0b1111)
+        self.assertEqual(self.cgs.get_hand(0), (0, 0, 0, 0))
+
+    def test_next_turn(self):
+        self.cgs.next_turn()
+        self.assertEqual(self.cgs.turn, 1)
+        self.cgs.next_turn()
+        self.assertEqual(self.cgs.turn, 0)
+
+    def test_is_last_turn(self):
+        self.assertTrue(self.cgs.is_last_turn())
+        self.cgs.release_player(1)
+        self.assertFalse(self.cgs.is_last_turn())
+
+    def test_scoring(self):
+        self.cgs.acquire_connection(0, 2)
+        self.assertEqual(self.cgs.get_connection_score(0), 7)
+        self.assertTrue(self.cgs.is_destination_complete(0, self.dest1))
+        self.assertFalse(self.cgs.is_destination_complete(0, self.dest2))
+        self.assertEqual(self.cgs.get_destination_score(0, 10), 0)
+        self.assertEqual(self.cgs.get_destination_score(1, 10), -20)
+
+    def test_get_city_components(self):
+        self.assertEqual(self.cgs.get_city_components(1), [])
+        self.cgs.acquire_connection(0, 2)
+        # City ids follow lexicographic order: Boston 0, New York 1, Philadelphia 2, Washington D.C. 3
+        self.assertEqual(self.cgs.get_city_components(0), [0b0111])
+        pgs = PlayerGameState({self.connection1, self.connection4}, self.hand1, 10, {self.dest1, self.dest2}, [])
+        cgs = CompactGameState.from_player_game_states(self.game_map, [pgs], [])
+        self.assertEqual(sorted(cgs.get_city_components(0)), [0b0011, 0b1100])
+        self.assertFalse(cgs.is_destination_complete(0, self.dest2))
+
+
+if __name__ == '__main__':
+    unittest.main()
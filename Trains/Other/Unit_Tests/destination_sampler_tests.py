@@ -0,0 +1,82 @@
+import sys
+import unittest
+
+sys.path.append('../../../')
+
+from Trains.Admin.destination_sampler import DestinationSampler
+from Trains.Common.map import City, Color, Connection, Destination, Map
+
+
+class TestDestinationSampler(unittest.TestCase):
+    def setUp(self):
+        self.boston = City("Boston", 70, 80)
+        self.new_york = City("New York", 60, 70)
+        self.philadelphia = City("Philadelphia", 90, 10)
+        self.los_angeles = City("Los Angeles", 0, 10)
+        self.austin = City("Austin", 50, 10)
+        self.boise = City("Boise", 30, 50)
+
+        self.connection1 = Connection(
+            frozenset({self.boston, self.new_york}), Color.BLUE, 3)
+        self.connection2 = Connection(
+            frozenset({self.philadelphia, self.new_york}), Color.RED, 4)
+        self.connection3 = Connection(
+            frozenset({self.austin, self.los_angeles}), Color.GREEN, 5)
+
+        self.cities = {self.boston, self.new_york, self.philadelphia,
+                       self.los_angeles, self.austin, self.boise}
+        self.connections = {self.connection1, self.connection2, self.connection3}
+        self.game_map = Map(self.cities, self.connections)
+        self.feasible_destinations = self.game_map.get_all_feasible_destinations()
+
+    def test_constructor_invalid_map(self):
+        with self.assertRaises(TypeError):
+            DestinationSampler(self.cities)
+
+    def test_count_available(self):
+        sampler = DestinationSampler(self.game_map)
+        self.assertEqual(sampler.count_available(), len(self.feasible_destinations))
+
+    def test_get_available_destinations(self):
+        sampler = DestinationSampler(self.game_map)
+        self.assertEqual(sampler.get_available_destinations(), self.feasible_destinations)
+
+    def test_sample(self):
+        sampler = DestinationSampler(self.game_map)
+        for _ in range(20):
+            destinations = sampler.sample(3)
+            self.assertEqual(len(destinations), 3)
+            self.assertTrue(destinations.issubset(self.feasible_destinations))
+
+    def test_sample_all(self):
+        sampler = DestinationSampler(self.game_map)
+        self.assertEqual(sampler.sample(len(self.feasible_destinations)), self.feasible_destinations)
+
+    def test_sample_too_many(self):
+        sampler = DestinationSampler(self.game_map)
+        with self.assertRaises(ValueError):
+            sampler.sample(len(self.feasible_destinations) + 1)
+
+    def test_exclude(self):
+        sampler = DestinationSampler(self.game_map)
+        excluded = Destination({self.boston, self.new_york})
+        sampler.exclude({excluded})
+        self.assertFalse(sampler.is_available(excluded))
+        self.assertEqual(sampler.count_available(), len(self.feasible_destinations) - 1)
+        for _ in range(20):
+            self.assertNotIn(excluded, sampler.sample(3))
+
+    def test_exclude_infeasible_destination(self):
+        sampler = DestinationSampler(self.game_map)
+        sampler.exclude({Destination({self.boston, self.boise})})
+        self.assertEqual(sampler.count_available(), len(self.feasible_destinations))
+
+    def test_is_available(self):
+        sampler = DestinationSampler(self.game_map)
+        self.assertTrue(sampler.is_available(Destination({self.boston, self.philadelphia})))
+        self.assertFalse(sampler.is_available(Destination({self.boston, self.austin})))
+        self.assertFalse(sampler.is_available(Destination({self.boston, self.boise})))
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,69 @@
+import gc
+import sys
+import unittest
+import weakref
+
+sys.path.append('../../../')
+
+from Trains.Other.Util.func_utils import memoize_method
+
+
+class Squarer:
+    def __init__(self) -> None:
+        self.calls = 0
+
+    @memoize_method(maxsize=2)
+    def square(self, number: int) -> int:
+        self.calls += 1
+        return number * number
+
+
+class TestMemoizeMethod(unittest.TestCase):
+    def test_results_are_cached(self):
+        squarer = Squarer()
+        self.assertEqual(squarer.square(3), 9)
+        self.assertEqual(squarer.square(3), 9)
+        self.assertEqual(squarer.calls, 1)
+        info = Squarer.square.cache_info(squarer)
+        self.assertEqual((info.hits, info.misses, info.maxsize, info.currsize), (1, 1, 2, 1))
+
+    def test_caches_are_per_instance(self):
+        squarer1 = Squarer()
+        squarer2 = Squarer()
+        squarer1.square(3)
+        squarer2.square(3)
+        self.assertEqual((squarer1.calls, squarer2.calls), (1, 1))
+
+    def test_least_recently_used_is_evicted(self):
+        squarer = Squarer()
+        squarer.square(1)
+        squarer.square(2)
+        squarer.square(1)
+        squarer.square(3)
+        self.assertEqual(Squarer.square.cache_info(squarer).currsize, 2)
+        squarer.square(1)
+        self.assertEqual(squarer.calls, 3)
+        squarer.square(2)
+        self.assertEqual(squarer.calls, 4)
+
+    def test_cache_clear(self):
+        squarer = Squarer()
+        squarer.square(3)
+        Squarer.square.cache_clear(squarer)
+        squarer.square(3)
+        self.assertEqual(squarer.calls, 2)
+
+    def test_instance_is_not_kept_alive(self):
+        squarer = Squarer()
+        squarer.square(3)
+        reference = weakref.ref(squarer)
+        del squarer
+        gc.collect()
+        self.assertIsNone(reference())
+
+    def test_invalid_maxsize(self):
+        self.assertRaises(ValueError, memoize_method, 0)
+
+
+if __name__ == '__main__':
+    unittest.main()
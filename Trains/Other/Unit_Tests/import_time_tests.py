@@ -0,0 +1,101 @@
+import json
+import os
+import subprocess
+import sys
+import unittest
+from typing import Any, Dict
+
+sys.path.append('../../../')
+
+# The directory containing the Trains package
+REPOSITORY_ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), '../../../'))
+
+# Modules that are only needed by some uses of the entry points, and so must be imported on first use
+DEFERRED_MODULES = ("asyncio", "importlib.util", "importlib.abc")
+
+REPORT_IMPORTS = """
+import json, sys
+import {module_name}
+from Trains.Other.Util import constants
+built_maps = [name for name, get_map in constants._LAZY_MAPS.items() if get_map.cache_info().currsize > 0]
+print(json.dumps({{"modules": sorted(sys.modules), "built_maps": built_maps}}))
+"""
+
+
+def get_imports(module_name: str) -> Dict[str, Any]:
+    """
+    Imports the given module in a fresh interpreter and reports what the import loaded.
+        Parameters:
+            module_name (str): The module to import
+        Returns:
+            A dictionary with the names of all loaded modules ("modules") and the names of the constant maps
+            that were built ("built_maps")
+    """
+    result = subprocess.run([sys.executable, "-c", REPORT_IMPORTS.format(module_name=module_name)],
+                            cwd=REPOSITORY_ROOT, capture_output=True, text=True, check=True)
+    return json.loads(result.stdout)
+
+
+def get_import_time(module_name: str) -> int:
+    """
+    Imports the given module in a fresh interpreter with `-X importtime` and totals the reported times.
+        Parameters:
+            module_name (str): The module to import
+        Returns:
+            The cumulative import time in microseconds of every module imported at the top level, which covers
+            the module, its parent packages and everything they import
+    """
+    result = subprocess.run([sys.executable, "-X", "importtime", "-c", f"import {module_name}"],
+                            cwd=REPOSITORY_ROOT, capture_output=True, text=True, check=True)
+    total = 0
+    for line in result.stderr.splitlines():
+        # Lines look like "import time: <self> | <cumulative> | <name>", with the name indented by two spaces
+        # per level of nesting. Only the top level is summed, since it already includes the nested imports.
+        if not line.startswith("import time:"):
+            continue
+        _, cumulative, name = line[len("import time:"):].split("|")
+        if cumulative.strip().isdigit() and not name.startswith("  "):
+            total += int(cumulative)
+    return total
+
+
+# Import time budgets in microseconds. They are several times the time measured on a development machine
+# (about 50ms for the referee and the manager and 100ms for the server) so that slow or busy machines pass,
+# while an import that pulls in a large dependency or builds the constant maps again still fails.
+REFEREE_IMPORT_BUDGET = 250000
+MANAGER_IMPORT_BUDGET = 300000
+SERVER_IMPORT_BUDGET = 400000
+
+
+class TestImports(unittest.TestCase):
+    def test_referee_imports(self):
+        imports = get_imports("Trains.Admin.referee")
+        for module_name in DEFERRED_MODULES:
+            self.assertNotIn(module_name, imports["modules"])
+        self.assertEqual(imports["built_maps"], [])
+
+    def test_manager_imports(self):
+        imports = get_imports("Trains.Admin.manager")
+        for module_name in DEFERRED_MODULES:
+            self.assertNotIn(module_name, imports["modules"])
+        self.assertEqual(imports["built_maps"], [])
+
+    def test_server_imports(self):
+        imports = get_imports("Trains.Remote.trains_server")
+        self.assertNotIn("importlib.util", imports["modules"])
+        self.assertEqual(imports["built_maps"], [])
+
+
+class TestImportTime(unittest.TestCase):
+    def test_referee_import_time(self):
+        self.assertLess(get_import_time("Trains.Admin.referee"), REFEREE_IMPORT_BUDGET)
+
+    def test_manager_import_time(self):
+        self.assertLess(get_import_time("Trains.Admin.manager"), MANAGER_IMPORT_BUDGET)
+
+    def test_server_import_time(self):
+        self.assertLess(get_import_time("Trains.Remote.trains_server"), SERVER_IMPORT_BUDGET)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -1,10 +1,16 @@
+import copy
+import gc
+import pickle
 import sys
+import weakref
 
 sys.path.append('../../../')
 
 import unittest
+from functools import cmp_to_key
 
-from Trains.Common.map import City, Color, Connection, Destination, Map
+from Trains.Common.map import (City, Color, Connection, Destination, DisjointSet,
+                               FreeConnectionIndex, Map)
 
 
 class TestColors(unittest.TestCase):
@@ -117,6 +123,12 @@ class TestConnections(unittest.TestCase):
     def test_connection_lt_color(self):
         self.assertEqual(self.connection3 < self.connection2, -1)
 
+    def test_connection_sort_key(self):
+        self.assertEqual(self.connection1.sort_key, ("Boston", "New York", 3, "blue"))
+        connections = [self.connection5, self.connection2, self.connection1, self.connection4, self.connection3]
+        self.assertEqual(sorted(connections, key=lambda connection: connection.sort_key),
+                         sorted(connections, key=cmp_to_key(Connection.__lt__)))
+
 class TestDestination(unittest.TestCase):
     def setUp(self):
         self.boston = City("Boston", 70, 80)
@@ -167,6 +179,9 @@ class TestDestination(unittest.TestCase):
         destination1_copy = Destination(frozenset({self.boston, self.new_york}))
         self.assertEqual(self.destination1 < destination1_copy, 1)
 
+    def test_destination_sort_key(self):
+        self.assertEqual(self.destination1.sort_key, ("Boston", "New York"))
+
 class TestMap(unittest.TestCase):
     def setUp(self):
         self.boston = City("Boston", 70, 80)
@@ -267,6 +282,58 @@ class TestMap(unittest.TestCase):
         test_map = Map(self.cities, set(), 500, 500)
         self.assertEqual(test_map.get_all_connections(), set())
 
+    def test_get_connections_from_city(self):
+        self.assertEqual(self.test_map.get_connections_from_city(self.boston),
+                         {self.connection1, self.connection3})
+
+    def test_get_connections_from_city_not_on_map(self):
+        self.assertEqual(self.test_map.get_connections_from_city(self.austin), set())
+
+    def test_city_ids_in_lexicographic_order(self):
+        self.assertEqual(self.test_map.get_number_of_cities(), 3)
+        self.assertEqual(self.test_map.get_city_id(self.boston), 0)
+        self.assertEqual(self.test_map.get_city_id(self.new_york), 1)
+        self.assertEqual(self.test_map.get_city_id(self.philadelphia), 2)
+        self.assertEqual(self.test_map.get_city_by_id(1), self.new_york)
+
+    def test_connection_ids_in_lexicographic_order(self):
+        self.assertEqual(self.test_map.get_number_of_connections(), 3)
+        self.assertEqual(self.test_map.get_connection_id(self.connection1), 0)
+        self.assertEqual(self.test_map.get_connection_id(self.connection3), 1)
+        self.assertEqual(self.test_map.get_connection_id(self.connection2), 2)
+        self.assertEqual(self.test_map.get_connection_by_id(2), self.connection2)
+
+    def test_get_connections_in_order(self):
+        self.assertEqual(self.test_map.get_connections_in_order(),
+                         (self.connection1, self.connection3, self.connection2))
+
+    def test_get_connection_buckets(self):
+        self.assertEqual(self.test_map.get_connection_buckets(), {
+            (Color.BLUE, 3): (self.connection1,),
+            (Color.GREEN, 4): (self.connection3,),
+            (Color.RED, 3): (self.connection2,)})
+
+    def test_ids_not_on_map(self):
+        with self.assertRaises(ValueError):
+            self.test_map.get_city_id(self.austin)
+        with self.assertRaises(ValueError):
+            self.test_map.get_connection_id(self.connection4)
+        with self.assertRaises(ValueError):
+            self.test_map.get_city_by_id(3)
+        with self.assertRaises(ValueError):
+            self.test_map.get_connection_by_id(-1)
+
+    def test_id_adjacency(self):
+        self.assertEqual(self.test_map.get_connection_endpoint_ids(2), (1, 2))
+        self.assertEqual(self.test_map.get_connection_ids_from_city_id(0), (0, 1))
+        self.assertEqual(self.test_map.get_connection_ids_from_city_id(2), (1, 2))
+
+    def test_connections_bitmask(self):
+        bitmask = self.test_map.get_connections_as_bitmask({self.connection1, self.connection2})
+        self.assertEqual(bitmask, 0b101)
+        self.assertEqual(self.test_map.get_connections_from_bitmask(bitmask), {self.connection1, self.connection2})
+        self.assertEqual(self.test_map.get_connections_from_bitmask(0), set())
+
     def test_get_all_terminal_cities_from_city_direct(self):
         self.assertEqual(set(self.test_map.get_all_terminal_cities_from_city(
             self.boston, self.test_map.connections)), {self.new_york, self.philadelphia})
@@ -311,6 +378,56 @@ class TestMap(unittest.TestCase):
         self.assertEqual(self.test_map.get_feasible_destinations(connections),
                          {dest1, dest2, dest3, dest4, dest5, dest6, dest7})
 
+    def test_get_connected_components(self):
+        connections = {self.connection1, self.connection2, self.connection4}
+        components = self.test_map.get_connected_components(connections)
+        self.assertEqual(len(components), 2)
+        self.assertIn({self.boston, self.new_york, self.philadelphia}, components)
+        self.assertIn({self.austin, self.los_angeles}, components)
+
+    def test_get_component_ids(self):
+        connections = {self.connection1, self.connection4}
+        component_ids = self.test_map.get_component_ids(connections)
+        self.assertEqual(set(component_ids.keys()), {self.boston, self.new_york, self.austin, self.los_angeles})
+        self.assertEqual(component_ids[self.boston], component_ids[self.new_york])
+        self.assertEqual(component_ids[self.austin], component_ids[self.los_angeles])
+        self.assertNotEqual(component_ids[self.boston], component_ids[self.austin])
+        self.assertEqual(set(component_ids.values()), {0, 1})
+
+    def test_count_feasible_destinations(self):
+        cities = {self.boston, self.new_york, self.philadelphia,
+                  self.wdc, self.los_angeles, self.austin}
+        connections = {self.connection1, self.connection2,
+                       self.connection3, self.connection4, self.connection5}
+        test_map = Map(cities, connections)
+        self.assertEqual(test_map.count_feasible_destinations(), 7)
+        self.assertEqual(test_map.count_feasible_destinations(),
+                         len(test_map.get_all_feasible_destinations()))
+
+    def test_count_feasible_destinations_no_connections(self):
+        test_map = Map(self.cities, set())
+        self.assertEqual(test_map.count_feasible_destinations(), 0)
+
+    def test_connection_endpoints(self):
+        connection = Connection(frozenset({self.new_york, self.boston}), Color.RED, 3)
+        self.assertEqual(connection.endpoints, (self.boston, self.new_york))
+
+    def test_destination_endpoints(self):
+        destination = Destination(frozenset({self.new_york, self.boston}))
+        self.assertEqual(destination.endpoints, (self.boston, self.new_york))
+
+    def test_primitives_are_slotted(self):
+        destination = Destination(frozenset({self.new_york, self.boston}))
+        for primitive in (self.boston, self.connection1, destination):
+            self.assertFalse(hasattr(primitive, "__dict__"))
+
+    def test_primitives_copy(self):
+        destination = Destination(frozenset({self.new_york, self.boston}))
+        for primitive in (self.boston, self.connection1, destination):
+            self.assertEqual(copy.deepcopy(primitive), primitive)
+            self.assertEqual(hash(copy.deepcopy(primitive)), hash(primitive))
+            self.assertEqual(pickle.loads(pickle.dumps(primitive)), primitive)
+
     def test_get_map_as_json(self):
         cities = {self.boston, self.new_york}
         connections = {self.connection1}
@@ -320,5 +437,118 @@ class TestMap(unittest.TestCase):
         ), "{\"cities\": [[\"Boston\", [560, 640]], [\"New York\", [480, 560]]], \"connections\": {\"Boston\": {\"New York\": {\"blue\": 3}}}, \"height\": 800, \"width\": 800}")
 
 
+    def test_get_map_as_json_cached(self):
+        test_map = Map({self.boston, self.new_york}, {self.connection1})
+        self.assertIs(test_map.get_as_json(), test_map.get_as_json())
+
+    def test_map_equality_and_hash(self):
+        test_map = Map({self.boston, self.new_york}, {self.connection1})
+        same_map = Map({self.boston, self.new_york}, {self.connection1})
+        other_map = Map({self.boston, self.new_york}, {self.connection1}, 400, 400)
+        self.assertEqual(test_map, same_map)
+        self.assertEqual(hash(test_map), hash(same_map))
+        self.assertNotEqual(test_map, other_map)
+        self.assertEqual(test_map, copy.deepcopy(test_map))
+        self.assertEqual(hash(test_map), hash(copy.deepcopy(test_map)))
+
+
+    def test_map_not_kept_alive_by_memoized_results(self):
+        test_map = Map({self.boston, self.new_york}, {self.connection1})
+        test_map.get_all_feasible_destinations()
+        reference = weakref.ref(test_map)
+        del test_map
+        gc.collect()
+        self.assertIsNone(reference())
+
+
+class TestDisjointSet(unittest.TestCase):
+    def test_union_and_connected(self):
+        disjoint_set = DisjointSet([1, 2, 3, 4])
+        disjoint_set.union(1, 2)
+        disjoint_set.union(3, 4)
+        self.assertTrue(disjoint_set.connected(1, 2))
+        self.assertTrue(disjoint_set.connected(3, 4))
+        self.assertFalse(disjoint_set.connected(2, 3))
+        disjoint_set.union(2, 4)
+        self.assertTrue(disjoint_set.connected(1, 3))
+
+    def test_connected_unknown_items(self):
+        disjoint_set = DisjointSet([1])
+        self.assertTrue(disjoint_set.connected(5, 5))
+        self.assertFalse(disjoint_set.connected(1, 5))
+
+    def test_get_components(self):
+        disjoint_set = DisjointSet([1, 2, 3, 4, 5])
+        disjoint_set.union(1, 2)
+        disjoint_set.union(2, 3)
+        components = disjoint_set.get_components()
+        self.assertEqual(len(components), 3)
+        self.assertIn({1, 2, 3}, components)
+        self.assertIn({4}, components)
+        self.assertIn({5}, components)
+
+    def test_copy_is_independent(self):
+        disjoint_set = DisjointSet([1, 2, 3])
+        disjoint_set.union(1, 2)
+        copied = disjoint_set.copy()
+        copied.union(2, 3)
+        self.assertTrue(copied.connected(1, 3))
+        self.assertFalse(disjoint_set.connected(1, 3))
+        self.assertTrue(disjoint_set.connected(1, 2))
+
+
+class TestFreeConnectionIndex(unittest.TestCase):
+    def setUp(self):
+        self.boston = City("Boston", 70, 80)
+        self.new_york = City("New York", 60, 70)
+        self.philadelphia = City("Philadelphia", 60, 70)
+        # Connection ids follow lexicographic order: connection1 is 0, connection3 is 1, connection2 is 2
+        self.connection1 = Connection(frozenset({self.boston, self.new_york}), Color.BLUE, 3)
+        self.connection2 = Connection(frozenset({self.philadelphia, self.new_york}), Color.BLUE, 3)
+        self.connection3 = Connection(frozenset({self.boston, self.philadelphia}), Color.GREEN, 4)
+        self.test_map = Map({self.boston, self.new_york, self.philadelphia},
+                            {self.connection1, self.connection2, self.connection3})
+        self.index = FreeConnectionIndex(self.test_map)
+        self.cards = {Color.RED: 0, Color.BLUE: 3, Color.GREEN: 4, Color.WHITE: 0}
+
+    def test_acquirable_connections(self):
+        self.assertEqual(self.index.get_acquirable_connections(10, self.cards),
+                         {self.connection1, self.connection2, self.connection3})
+        self.assertEqual(self.index.get_acquirable_connections(3, self.cards), {self.connection1, self.connection2})
+        self.assertEqual(self.index.get_acquirable_connections(10, {Color.BLUE: 2}), set())
+        self.assertEqual(self.index.get_first_acquirable_connection(10, {Color.GREEN: 4}), self.connection3)
+        self.assertIsNone(self.index.get_first_acquirable_connection(2, self.cards))
+
+    def test_acquire_and_release(self):
+        self.index.acquire(self.connection1)
+        self.assertFalse(self.index.is_free(self.connection1))
+        self.assertEqual(self.index.get_first_acquirable_connection(10, self.cards), self.connection3)
+        self.assertEqual(self.index.get_acquirable_bitmask(3, self.cards), 0b100)
+        self.index.release(self.connection1)
+        self.assertTrue(self.index.is_free(self.connection1))
+
+    def test_free_connections(self):
+        self.index.acquire(self.connection3)
+        self.assertEqual(self.index.get_free_bitmask(), 0b101)
+        self.assertEqual(self.index.get_free_connections(), {self.connection1, self.connection2})
+        other_connection = Connection(frozenset({self.boston, self.new_york}), Color.RED, 3)
+        self.assertFalse(self.test_map.has_connection(other_connection))
+        self.assertFalse(self.index.is_free(other_connection))
+
+    def test_update_acquisitions(self):
+        self.index.update_acquisitions([frozenset({self.connection1}), frozenset({self.connection3})])
+        self.assertEqual(self.index.get_acquirable_connections(10, self.cards), {self.connection2})
+        # A booted player's connections are released, and a player that left the game releases them too
+        self.index.update_acquisitions([frozenset({self.connection1, self.connection2}), frozenset()])
+        self.assertEqual(self.index.get_acquirable_connections(10, self.cards), {self.connection3})
+        self.index.update_acquisitions([frozenset({self.connection2})])
+        self.assertEqual(self.index.get_acquirable_connections(10, self.cards), {self.connection1, self.connection3})
+
+    def test_update_acquisitions_from_another_players_view(self):
+        self.index.update_acquisitions([frozenset(), frozenset({self.connection1})])
+        self.index.update_acquisitions([frozenset({self.connection1}), frozenset()])
+        self.assertFalse(self.index.is_free(self.connection1))
+
+
 if __name__ == '__main__':
     unittest.main()
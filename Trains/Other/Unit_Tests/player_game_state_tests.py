@@ -1,3 +1,5 @@
+import gc
+import weakref
 from collections import deque
 import sys
 sys.path.append('../../../')
@@ -40,6 +42,63 @@ class TestPlayerGameState(unittest.TestCase):
         self.assertEqual(test_pr.rails, 10)
         self.assertEqual(test_pr.destinations, {self.dest1, self.dest2})
 
+    def test_constructor_copies_mutable_inputs(self):
+        connections = {self.connection1}
+        cards = {**self.cc1}
+        pgs = PlayerGameState(connections, cards, 10, {self.dest1, self.dest2}, [])
+        connections.add(self.connection2)
+        cards[Color.RED] = 100
+        self.assertEqual(pgs.connections, {self.connection1})
+        self.assertEqual(pgs.colored_cards[Color.RED], 5)
+
+    def test_constructor_shares_immutable_inputs(self):
+        opponent_acquisitions = frozenset({self.connection3})
+        pgs = PlayerGameState(self.pgs1.connections, self.pgs1.colored_cards, 10, self.pgs1.destinations,
+                              (opponent_acquisitions,))
+        self.assertIs(pgs.connections, self.pgs1.connections)
+        self.assertIs(pgs.destinations, self.pgs1.destinations)
+        self.assertIs(pgs.other_acquisitions[0], opponent_acquisitions)
+
+    def test_accessors_are_read_only(self):
+        pgs = PlayerGameState({self.connection1}, self.cc1, 10, {self.dest1, self.dest2}, [{self.connection3}])
+        with self.assertRaises(TypeError):
+            pgs.colored_cards[Color.RED] = 100
+        with self.assertRaises(AttributeError):
+            pgs.connections.add(self.connection2)
+        with self.assertRaises(AttributeError):
+            pgs.destinations.add(self.dest3)
+        with self.assertRaises(AttributeError):
+            pgs.other_acquisitions[0].add(self.connection2)
+        self.assertIs(pgs.connections, pgs.connections)
+        self.assertEqual(pgs.other_acquisitions, ({self.connection3},))
+
+    def test_with_cards(self):
+        cards = {**self.cc1}
+        cards[Color.RED] += 2
+        pgs = self.pgs1.with_cards(cards)
+        self.assertEqual(pgs.colored_cards[Color.RED], 7)
+        self.assertEqual(self.pgs1.colored_cards[Color.RED], 5)
+        self.assertIs(pgs.connections, self.pgs1.connections)
+        self.assertEqual(pgs.rails, self.pgs1.rails)
+
+    def test_with_acquisition(self):
+        pgs = self.pgs1.with_acquisition(self.connection5)
+        self.assertEqual(pgs.connections, {self.connection1, self.connection2, self.connection5})
+        self.assertEqual(pgs.rails, 5)
+        self.assertEqual(pgs.colored_cards[Color.WHITE], 3)
+        self.assertTrue(pgs.is_destination_complete(Destination({self.boston, self.wdc})))
+        # The original state is unchanged
+        self.assertEqual(self.pgs1.connections, {self.connection1, self.connection2})
+        self.assertEqual(self.pgs1.colored_cards[Color.WHITE], 8)
+        self.assertFalse(self.pgs1.is_destination_complete(Destination({self.boston, self.wdc})))
+
+    def test_with_other_acquisitions(self):
+        other_acquisitions = (frozenset({self.connection3}), frozenset())
+        pgs = self.pgs1.with_other_acquisitions(other_acquisitions)
+        self.assertEqual(pgs.other_acquisitions, other_acquisitions)
+        self.assertEqual(pgs, PlayerGameState({self.connection1, self.connection2}, self.cc1, 10,
+                                              {self.dest1, self.dest2}, [{self.connection3}, set()]))
+
     def test_constructor_bad_connections(self):
         with self.assertRaises(TypeError):
             PlayerGameState([self.connection1, self.connection2], self.cc1, 10, {self.dest1, self.dest2}, [])
@@ -81,6 +140,34 @@ class TestPlayerGameState(unittest.TestCase):
         self.assertEqual(self.pgs1.get_as_json(),
             "{\"this\": {\"destination1\": [\"Boston\", \"New York\"], \"destination2\": [\"New York\", \"Philadelphia\"], \"rails\": 10, \"cards\": {\"red\": 5, \"blue\": 6, \"green\": 7, \"white\": 8}, \"acquired\": [[\"Boston\", \"New York\", \"blue\", 3], [\"New York\", \"Philadelphia\", \"red\", 3]]}, \"acquired\": []}")
 
+    def test_is_destination_complete(self):
+        self.assertTrue(self.pgs1.is_destination_complete(self.dest1))
+        self.assertTrue(self.pgs1.is_destination_complete(self.dest3))
+        self.assertFalse(self.pgs2.is_destination_complete(self.dest1))
+
+    def test_is_destination_complete_after_acquisition(self):
+        boston_to_wdc = Destination({self.boston, self.wdc})
+        self.assertFalse(self.pgs1.is_destination_complete(boston_to_wdc))
+        pgs = self.pgs1.with_cards(self.cc1).with_acquisition(self.connection5)
+        self.assertTrue(pgs.is_destination_complete(boston_to_wdc))
+        # The earlier states do not see the acquisition, since the union is made on a copy of their network
+        self.assertFalse(self.pgs1.is_destination_complete(boston_to_wdc))
+        self.assertTrue(pgs.with_other_acquisitions(()).is_destination_complete(boston_to_wdc))
+        self.assertTrue(pgs.is_destination_complete(boston_to_wdc))
+
+    def test_derived_states_do_not_keep_earlier_states(self):
+        pgs = PlayerGameState({self.connection1, self.connection2}, self.cc1, 10, {self.dest1, self.dest2}, [])
+        earlier_state = weakref.ref(pgs)
+        pgs = pgs.with_cards(self.cc1).with_acquisition(self.connection5).with_other_acquisitions(())
+        gc.collect()
+        self.assertIsNone(earlier_state())
+        self.assertTrue(pgs.is_destination_complete(Destination({self.boston, self.wdc})))
+
+    def test_get_network_is_a_copy(self):
+        network = self.pgs1.get_network()
+        network.union(self.philadelphia, self.wdc)
+        self.assertFalse(self.pgs1.is_destination_complete(Destination({self.boston, self.wdc})))
+
     def test_equality(self):
         pr1_copy = PlayerGameState({self.connection1, self.connection2}, self.cc1, 10, {self.dest1, self.dest2}, [])
         self.assertEqual(self.pgs1, pr1_copy)
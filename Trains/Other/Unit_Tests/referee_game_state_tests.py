@@ -193,6 +193,37 @@ class TestRefereeGameState(unittest.TestCase):
         rgs = RefereeGameState(self.game_map, self.deck, [pgs1, pgs2])
         self.assertEqual(rgs.get_all_unacquired_connections(), set())
 
+    def test_acquire_connection(self):
+        self.rgs.acquire_connection(self.connection5)
+        self.assertEqual(self.rgs.free_connections, set())
+        self.rgs.next_turn()
+        self.assertEqual(self.rgs.free_connections, set())
+
+    def test_acquire_connection_for_player(self):
+        self.rgs.acquire_connection_for_player(0, self.connection5)
+        pgs = self.rgs.player_game_states[0]
+        self.assertEqual(pgs.connections, {self.connection1, self.connection2, self.connection5})
+        self.assertEqual(pgs.rails, 5)
+        self.assertEqual(pgs.colored_cards[Color.WHITE], 3)
+        self.assertEqual(self.rgs.free_connections, set())
+        self.assertFalse(self.rgs.verify_legal_connection(self.connection5))
+
+    def test_release_connections(self):
+        self.rgs.release_connections(self.pgs2.connections)
+        self.assertEqual(self.rgs.free_connections, {self.connection3, self.connection4, self.connection5})
+
+    def test_get_all_acquirable_connections_after_release(self):
+        self.rgs.release_connections(self.pgs2.connections)
+        self.assertEqual(self.rgs.get_all_acquirable_connections(self.pgs1),
+                         {self.connection3, self.connection4, self.connection5})
+        self.rgs.acquire_connection(self.connection4)
+        self.assertEqual(self.rgs.get_all_acquirable_connections(self.pgs1), {self.connection3, self.connection5})
+
+    def test_refresh_free_connections(self):
+        self.rgs.player_game_states[1] = PlayerGameState(set(), self.cc2, 4, {self.dest3, self.dest4}, [])
+        self.rgs.refresh_free_connections()
+        self.assertEqual(self.rgs.free_connections, {self.connection3, self.connection4, self.connection5})
+
     def test_get_cards_from_deck(self):
         NUM_CARDS_ON_DRAW = 2
         deck = deque([Color.RED, Color.BLUE, Color.GREEN, Color.WHITE])
@@ -1,11 +1,11 @@
 import sys
 import unittest
 from collections import deque
-from copy import deepcopy
 from typing import Deque, Dict, List
 
 sys.path.append('../../../')
 
+from Trains.Admin.destination_sampler import DestinationSampler
 from Trains.Admin.referee import (ApplyPlayerMove, Cheating,
                                   NotEnoughDestinations, Referee, IsPlayerMoveLegal)
 from Trains.Admin.referee_game_state import RefereeGameState
@@ -179,13 +179,13 @@ class TestReferee(unittest.TestCase):
 
     def test_set_up_players_with_initial_game_states(self):
         formatted_player_states = self.ref.set_up_players_with_initial_game_states(
-            self.players, self.deck, self.INITIAL_RAIL_COUNT, self.feasible_destinations)
+            self.players, self.deck, self.INITIAL_RAIL_COUNT, DestinationSampler(self.game_map))
         player_destinations = set()
 
         for player_state in formatted_player_states:
             self.assertEqual(player_state.connections, set())
             self.assertEqual(player_state.other_acquisitions,
-                             [set(), set(), set()])
+                             (set(), set(), set()))
             self.assertEqual(len(player_state.destinations),
                              self.INITIAL_NUM_DESTINATIONS)
             # Checks that no two players have the same destination
@@ -204,14 +204,14 @@ class TestReferee(unittest.TestCase):
         game_state = self.ref.generate_initial_player_state(initial_hand, initial_rails,
                                                     destinations, len(self.players))
         self.assertEqual(game_state.get_total_cards(), 4)
-        self.assertEqual(game_state.other_acquisitions, [set(), set(), set()])
+        self.assertEqual(game_state.other_acquisitions, (set(), set(), set()))
         self.assertEqual(game_state.destinations, destinations)
         self.assertEqual(game_state.colored_cards, initial_hand)
         self.assertEqual(game_state.rails, initial_rails)
 
     def test_get_destination_selection(self):
         destination_options = self.ref.get_destination_selection(
-            self.feasible_destinations, self.NUM_DESTINATION_OPTIONS)
+            DestinationSampler(self.game_map), self.NUM_DESTINATION_OPTIONS)
         self.assertEqual(len(destination_options),
                          self.NUM_DESTINATION_OPTIONS)
         for destination in destination_options:
@@ -261,7 +261,7 @@ class TestReferee(unittest.TestCase):
         # Should have the minimum number of rails without triggering end game
         self.assertEqual(pgs.rails, MIN_RAILS_TO_NOT_TRIGGER_LAST_TURN)
         # Should have no information on other player acquisitions
-        self.assertEqual(pgs.other_acquisitions, [])
+        self.assertEqual(pgs.other_acquisitions, ())
         # Their connections were freed to the game again
         for connection in banned_player_connections:
             self.assertIn(
@@ -308,7 +308,7 @@ class TestReferee(unittest.TestCase):
         deck = deque([Color.GREEN, Color.RED, Color.RED])
         self.ref.ref_game_state.colored_card_deck = deck
         hand_before_draw = self.ref.ref_game_state.player_game_states[0].colored_cards
-        exp_hand = deepcopy(hand_before_draw)
+        exp_hand = {**hand_before_draw}
         if Color.RED in exp_hand.keys():
             exp_hand[Color.RED] += 2
         else:
@@ -326,7 +326,7 @@ class TestReferee(unittest.TestCase):
         deck = deque([Color.RED])
         self.ref.ref_game_state.colored_card_deck = deck
         hand_before_draw = self.ref.ref_game_state.player_game_states[0].colored_cards
-        exp_hand = deepcopy(hand_before_draw)
+        exp_hand = {**hand_before_draw}
         if Color.RED in exp_hand.keys():
             exp_hand[Color.RED] += 1
         else:
@@ -488,6 +488,22 @@ class TestReferee(unittest.TestCase):
         exp_pgs = PlayerGameState(p0_connections, pgs.colored_cards, pgs.rails, p0_dests, [{self.connection2}, set()])
         self.assertEqual(pgs, exp_pgs)
 
+    def test_generating_a_state_does_not_hide_changes(self):
+        red_deck = deque([Color.RED] * 20)
+        ref = Referee(self.game_map, self.players, red_deck)
+        ref.update_player_states()
+        pgs = ref.ref_game_state.player_game_states[1]
+        ref.ref_game_state.player_game_states[1] = PlayerGameState({self.connection2}, pgs.colored_cards,
+                                                                   pgs.rails, pgs.destinations, [])
+
+        ref.generate_updated_state_for_player(0)
+        ref.update_specific_player_state(1)
+        ref.update_player_states()
+        self.assertEqual(ref.ref_game_state.player_game_states[0].other_acquisitions,
+                         (frozenset({self.connection2}), frozenset()))
+        self.assertEqual(ref.ref_game_state.player_game_states[2].other_acquisitions,
+                         (frozenset(), frozenset({self.connection2})))
+
     def test_update_player_states(self):
         # Create a deck of all red cards to give to the referee
         red_deck = deque([Color.RED] * 20)
@@ -528,6 +544,34 @@ class TestReferee(unittest.TestCase):
         exp_pgs2 = PlayerGameState(p2_connections, exp_hand, exp_rails, p2_dests, [p0_connections, p1_connections])
         self.assertEqual(pgs2, exp_pgs2)
 
+    def test_update_player_states_only_recomputes_changed_states(self):
+        ref = Referee(self.game_map, self.players)
+        ref.update_player_states()
+        pgs0, pgs1, pgs2 = ref.ref_game_state.player_game_states
+
+        # Nothing changed, so every state is kept as is
+        ref.update_player_states()
+        self.assertIs(ref.ref_game_state.player_game_states[0], pgs0)
+        self.assertIs(ref.ref_game_state.player_game_states[1], pgs1)
+        self.assertIs(ref.ref_game_state.player_game_states[2], pgs2)
+
+        # Only player 1's hand changes, so the other players' views are still current
+        hand = {**pgs1.colored_cards}
+        hand[Color.RED] += 2
+        ref.ref_game_state.player_game_states[1] = PlayerGameState(pgs1.connections, hand, pgs1.rails, \
+            pgs1.destinations, pgs1.other_acquisitions)
+        ref.update_player_states()
+        self.assertIs(ref.ref_game_state.player_game_states[0], pgs0)
+        self.assertIs(ref.ref_game_state.player_game_states[2], pgs2)
+        self.assertEqual(ref.ref_game_state.player_game_states[1].colored_cards, hand)
+
+        # Player 1 acquires a connection, so every other player's view changes
+        ref.ref_game_state.player_game_states[1] = PlayerGameState({self.connection1}, hand, pgs1.rails, \
+            pgs1.destinations, pgs1.other_acquisitions)
+        ref.update_player_states()
+        self.assertEqual(ref.ref_game_state.player_game_states[0].other_acquisitions, ({self.connection1}, set()))
+        self.assertEqual(ref.ref_game_state.player_game_states[2].other_acquisitions, (set(), {self.connection1}))
+
     def test_all_last_turns_taken_false(self):
         self.assertFalse(self.ref.all_last_turns_taken())
 
@@ -645,6 +689,25 @@ class TestReferee(unittest.TestCase):
         self.assertEqual(
             self.ref.find_longest_continuous_path_for_player(0), 0)
 
+    def test_players_with_longest_route(self):
+        pgs = self.ref.ref_game_state.player_game_states[0]
+        self.ref.ref_game_state.player_game_states[0] = PlayerGameState({self.connection1, self.connection5}, \
+            pgs.colored_cards, pgs.rails, pgs.destinations, pgs.other_acquisitions)
+        pgs = self.ref.ref_game_state.player_game_states[2]
+        self.ref.ref_game_state.player_game_states[2] = PlayerGameState({self.connection12}, \
+            pgs.colored_cards, pgs.rails, pgs.destinations, pgs.other_acquisitions)
+        self.assertEqual(self.ref.get_players_with_longest_route(), [self.players[0]])
+
+    def test_players_with_longest_route_tie(self):
+        pgs = self.ref.ref_game_state.player_game_states[2]
+        self.ref.ref_game_state.player_game_states[2] = PlayerGameState({self.connection1, self.connection5}, \
+            pgs.colored_cards, pgs.rails, pgs.destinations, pgs.other_acquisitions)
+        pgs = self.ref.ref_game_state.player_game_states[0]
+        # Austin-Los Angeles is not connected to the rest, so this player's longest route is also 7
+        self.ref.ref_game_state.player_game_states[0] = PlayerGameState({self.connection1, self.connection5, self.connection10}, \
+            pgs.colored_cards, pgs.rails, pgs.destinations, pgs.other_acquisitions)
+        self.assertEqual(self.ref.get_players_with_longest_route(), [self.players[0], self.players[2]])
+
     def test_get_active_player_first_turn(self):
         self.assertEqual(self.players[0], self.ref.get_active_player())
 
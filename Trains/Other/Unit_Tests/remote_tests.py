@@ -1,5 +1,6 @@
 import asyncio
 import json
+import struct
 import sys
 from asyncio import AbstractEventLoop
 from asyncio.streams import StreamReader, StreamWriter
@@ -13,12 +14,17 @@ from Trains.Common.player_game_state import PlayerGameState
 from Trains.Other.Mocks.mock_tournament_player import MockTournamentPlayer
 from Trains.Other.Util.constants import DEFAULT_MAP
 from Trains.Other.Util.test_utils import IsDrawCardMove
-from Trains.Player.moves import DrawCardMove
+from Trains.Player.moves import AcquireConnectionMove, DrawCardMove
 from Trains.Player.player import Buy_Now_Player
 from Trains.Player.player_interface import PlayerInterface
 from Trains.Remote.remote_player_invoker import RemotePlayerInvoker
 from Trains.Remote.remote_proxy_player import RemoteProxyPlayer
-from Trains.Remote.tcp_connection import TCPConnection
+from Trains.Remote.json_stream_decoder import (JSONStreamDecoder,
+                                               MessageTooLargeError)
+from Trains.Remote.message_codec import BINARY_CODEC, BinaryCodec, JSONCodec
+from Trains.Remote.tcp_connection import (LENGTH_PREFIXED_FRAMING,
+                                          TCPConnection)
+from Trains.Remote.trains_server import parse_sign_up
 
 
 def create_stream_reader_writer(loop: AbstractEventLoop) -> Tuple[StreamReader, StreamWriter]:
@@ -38,7 +44,7 @@ def create_stream_reader_writer(loop: AbstractEventLoop) -> Tuple[StreamReader,
     async def mock_drain() -> None:
         await asyncio.sleep(0)
 
-    writer = StreamWriter(mock_transport, None, reader, None)
+    writer = StreamWriter(mock_transport, None, reader, loop)
     writer.write = Mock(side_effect=mock_write)
     writer.close = Mock(side_effect=mock_close)
     writer.drain = Mock(side_effect=mock_drain)
@@ -46,7 +52,7 @@ def create_stream_reader_writer(loop: AbstractEventLoop) -> Tuple[StreamReader,
     return reader, writer
 
 
-def create_tcp_connections(loop: Optional[AbstractEventLoop] = None) -> Tuple[TCPConnection, TCPConnection]:
+def create_tcp_connections(loop: Optional[AbstractEventLoop] = None, **limits) -> Tuple[TCPConnection, TCPConnection]:
     if loop is None:
         loop = asyncio.new_event_loop()
     asyncio.set_event_loop(loop)
@@ -54,7 +60,7 @@ def create_tcp_connections(loop: Optional[AbstractEventLoop] = None) -> Tuple[TC
     reader1, writer1 = create_stream_reader_writer(loop)
     reader2, writer2 = create_stream_reader_writer(loop)
 
-    return TCPConnection(reader1, writer2), TCPConnection(reader2, writer1)
+    return TCPConnection(reader1, writer2, **limits), TCPConnection(reader2, writer1, **limits)
 
 
 def create_proxy_player(name: str, tcp: TCPConnection) -> RemoteProxyPlayer:
@@ -82,6 +88,362 @@ class TestTCPConnection(TestCase):
 
         self.loop.run_until_complete(go())
 
+    def test_tcp_read_keeps_leftover_message(self) -> None:
+        async def go():
+            await self.tcp1.write('["first", 1]["second", ')
+            await self.tcp1.write('2]')
+            self.assertEqual(await self.tcp2.read(), ["first", 1])
+            self.assertEqual(await self.tcp2.read(), ["second", 2])
+
+        self.loop.run_until_complete(go())
+
+    def test_tcp_read_rejects_oversize_message(self) -> None:
+        self.tcp1, self.tcp2 = create_tcp_connections(self.loop, max_message_size=20)
+
+        async def go():
+            await self.tcp1.write('["short"]')
+            self.assertEqual(await self.tcp2.read(), ["short"])
+            await self.tcp1.write('["this message is too long"]')
+            with self.assertRaises(MessageTooLargeError):
+                await self.tcp2.read()
+
+        self.loop.run_until_complete(go())
+
+    def test_tcp_read_budget(self) -> None:
+        self.tcp1, self.tcp2 = create_tcp_connections(self.loop, read_budget=16)
+
+        async def go():
+            await self.tcp1.write(' ' * 32 + '[1]')
+            with self.assertRaises(MessageTooLargeError):
+                await self.tcp2.read()
+
+        self.loop.run_until_complete(go())
+
+    def test_length_prefixed_framing(self) -> None:
+        self.tcp1.set_framing(LENGTH_PREFIXED_FRAMING)
+        self.tcp2.set_framing(LENGTH_PREFIXED_FRAMING)
+
+        async def go():
+            await self.tcp1.write('["S\u00e3o Paulo", 1]')
+            await self.tcp1.write('"void"')
+            self.assertEqual(await self.tcp2.read(), ["S\u00e3o Paulo", 1])
+            self.assertEqual(await self.tcp2.read(), "void")
+
+        self.loop.run_until_complete(go())
+
+    def test_length_prefixed_framing_rejects_oversize_message(self) -> None:
+        self.tcp1, self.tcp2 = create_tcp_connections(self.loop, max_message_size=20)
+        self.tcp1.set_framing(LENGTH_PREFIXED_FRAMING)
+        self.tcp2.set_framing(LENGTH_PREFIXED_FRAMING)
+
+        async def go():
+            await self.tcp1.write('["this message is too long"]')
+            with self.assertRaises(MessageTooLargeError):
+                await self.tcp2.read()
+
+        self.loop.run_until_complete(go())
+
+    def test_length_prefixed_read_resumes_after_timeout(self) -> None:
+        self.tcp1.set_framing(LENGTH_PREFIXED_FRAMING)
+        self.tcp2.set_framing(LENGTH_PREFIXED_FRAMING)
+        message = b'["win", [true]]'
+
+        async def go():
+            # Only the length of the message arrives before the read times out
+            self.tcp1._writer.write(struct.pack(">I", len(message)))
+            with self.assertRaises(asyncio.TimeoutError):
+                await self.tcp2.read(timeout=0.01)
+            self.assertRaises(ValueError, self.tcp2.set_framing, "bare")
+            self.tcp1._writer.write(message)
+            await self.tcp1.write('"void"')
+            self.assertEqual(await self.tcp2.read(), ["win", [True]])
+            self.assertEqual(await self.tcp2.read(), "void")
+
+        self.loop.run_until_complete(go())
+
+    def test_set_framing_with_unread_message(self) -> None:
+        async def go():
+            await self.tcp1.write('["first"]["sec')
+            await self.tcp2.read()
+            self.assertRaises(ValueError, self.tcp2.set_framing, LENGTH_PREFIXED_FRAMING)
+
+        self.loop.run_until_complete(go())
+        self.assertRaises(ValueError, self.tcp1.set_framing, "newline")
+
+
+class TestBinaryRemoteProxyPlayer(TestCase):
+    def setUp(self):
+        self.loop = asyncio.new_event_loop()
+        self.tcp1, self.tcp2 = create_tcp_connections(self.loop)
+        for tcp in (self.tcp1, self.tcp2):
+            tcp.set_framing(LENGTH_PREFIXED_FRAMING)
+            tcp.set_codec(BINARY_CODEC)
+        self.rpp = create_proxy_player("Dennis", self.tcp1)
+        self.player = MockTournamentPlayer("Dennis")
+        self.rpi = create_proxy_player_invoker(self.tcp2, self.player)
+        self.cards = {Color.RED: 5, Color.BLUE: 6, Color.GREEN: 7, Color.WHITE: 8}
+        self.connections = sorted(DEFAULT_MAP.get_all_connections(), key=lambda connection: connection.sort_key)
+        self.destinations = sorted(DEFAULT_MAP.get_all_feasible_destinations(),
+                                   key=lambda destination: destination.sort_key)
+
+    def call(self, method, *args):
+        asyncio.ensure_future(self.rpi._try_read_write())
+        return getattr(self.rpp, method)(*args)
+
+    def test_binary_codec_needs_framing(self):
+        tcp1, _ = create_tcp_connections(self.loop)
+        self.assertRaises(ValueError, tcp1.set_codec, BINARY_CODEC)
+        self.assertRaises(ValueError, self.tcp1.set_framing, "bare")
+
+    def test_remote_start(self) -> None:
+        self.assertEqual(self.call("start"), DEFAULT_MAP)
+
+    def test_remote_game(self) -> None:
+        self.call("setup", DEFAULT_MAP, 45, self.cards)
+        self.assertEqual(self.player.game_map, DEFAULT_MAP)
+
+        offered = set(self.destinations[:5])
+        not_chosen = self.call("pick", offered)
+        self.assertEqual(len(not_chosen), 3)
+        self.assertTrue(not_chosen.issubset(offered))
+
+        pgs = PlayerGameState({self.connections[0]}, self.cards, 42, set(self.destinations[:2]),
+                              [{self.connections[1], self.connections[2]}, set()])
+        move = self.call("play", pgs)
+        self.assertIsInstance(move, AcquireConnectionMove)
+        self.assertIn(move.connection, DEFAULT_MAP.get_all_connections())
+
+        self.call("more", [Color.RED, Color.WHITE])
+        self.call("win", True)
+        self.assertTrue(self.player._is_winner)
+        self.call("end", False)
+        self.assertFalse(self.player._is_tournament_winner)
+
+    def test_play_state_round_trip(self) -> None:
+        server_codec = BinaryCodec()
+        client_codec = BinaryCodec()
+        client_codec.decode_call(server_codec.encode_call("setup", (DEFAULT_MAP, 45, self.cards)))
+
+        pgs = PlayerGameState(set(self.connections[:3]), self.cards, 36, set(self.destinations[:2]),
+                              [set(self.connections[5:7]), set(), {self.connections[-1]}])
+        message = server_codec.encode_call("play", (pgs,))
+        self.assertEqual(client_codec.decode_call(message), ("play", (pgs,)))
+        self.assertLess(len(message), len(pgs.get_as_json()) // 4)
+
+    def test_invalid_move(self) -> None:
+        codec = BinaryCodec()
+        codec.encode_call("setup", (DEFAULT_MAP, 45, self.cards))
+        self.assertRaises(ValueError, codec.decode_response, "play", (), b"\x01\xff\xff")
+        self.assertRaises(ValueError, codec.decode_response, "play", (), b"\x02")
+
+
+class TestDeltaPlay(TestCase):
+    def setUp(self):
+        self.cards = {Color.RED: 5, Color.BLUE: 6, Color.GREEN: 7, Color.WHITE: 8}
+        self.connections = sorted(DEFAULT_MAP.get_all_connections(), key=lambda connection: connection.sort_key)
+        self.destinations = set(sorted(DEFAULT_MAP.get_all_feasible_destinations(),
+                                       key=lambda destination: destination.sort_key)[:2])
+        # Four turns of a game, where the second opponent is booted before the third turn
+        self.states = [
+            PlayerGameState(set(), self.cards, 45, self.destinations, [set(), set()]),
+            PlayerGameState({self.connections[0]}, {**self.cards, Color.RED: 2}, 42, self.destinations,
+                            [{self.connections[1]}, {self.connections[2], self.connections[3]}]),
+            PlayerGameState({self.connections[0], self.connections[4]}, {**self.cards, Color.RED: 6}, 39,
+                            self.destinations, [{self.connections[1], self.connections[5]}, set()]),
+            PlayerGameState({self.connections[0], self.connections[4]}, {**self.cards, Color.RED: 6}, 39,
+                            self.destinations, [{self.connections[1], self.connections[5], self.connections[6]},
+                                                set()])]
+
+    def decode_call(self, codec, message):
+        return codec.decode_call(json.loads(message) if type(message) is str else message)
+
+    def play_game(self, server_codec, client_codec):
+        self.decode_call(client_codec, server_codec.encode_call("setup", (DEFAULT_MAP, 45, self.cards)))
+        messages = []
+        for pgs in self.states:
+            message = server_codec.encode_call("play", (pgs,))
+            self.assertEqual(self.decode_call(client_codec, message), ("play", (pgs,)))
+            messages.append(message)
+        return messages
+
+    def test_json_delta_play(self) -> None:
+        messages = self.play_game(JSONCodec(True), JSONCodec(True))
+        full_messages = self.play_game(JSONCodec(), JSONCodec())
+        self.assertEqual(messages[0], full_messages[0])
+        self.assertEqual(json.loads(messages[2])[1][0]["delta"]["cards"], {"red": 6})
+        self.assertLess(len(messages[3]), len(full_messages[3]) // 2)
+
+    def test_json_delta_play_removes_colors(self) -> None:
+        hand_without_white = {color: count for color, count in self.cards.items() if color != Color.WHITE}
+        self.states = [self.states[0],
+                       PlayerGameState(set(), hand_without_white, 45, self.destinations, [set(), set()]),
+                       self.states[0]]
+        messages = self.play_game(JSONCodec(True), JSONCodec(True))
+        self.assertEqual(json.loads(messages[1])[1][0]["delta"]["removed_colors"], ["white"])
+        self.assertEqual(json.loads(messages[2])[1][0]["delta"]["cards"], {"white": 8})
+
+    def test_binary_delta_play(self) -> None:
+        messages = self.play_game(BinaryCodec(True), BinaryCodec(True))
+        full_messages = self.play_game(BinaryCodec(), BinaryCodec())
+        self.assertLess(len(messages[3]), len(full_messages[3]))
+
+    def test_new_game_starts_with_full_state(self) -> None:
+        server_codec, client_codec = JSONCodec(True), JSONCodec(True)
+        self.play_game(server_codec, client_codec)
+        self.play_game(server_codec, client_codec)
+
+    def test_changed_destinations_are_sent_in_full(self) -> None:
+        server_codec, client_codec = BinaryCodec(True), BinaryCodec(True)
+        self.play_game(server_codec, client_codec)
+        destinations = set(sorted(DEFAULT_MAP.get_all_feasible_destinations(),
+                                  key=lambda destination: destination.sort_key)[2:4])
+        pgs = PlayerGameState(set(), self.cards, 45, destinations, [set(), set()])
+        self.assertEqual(client_codec.decode_call(server_codec.encode_call("play", (pgs,))), ("play", (pgs,)))
+
+    def test_delta_without_previous_state(self) -> None:
+        server_codec = JSONCodec(True)
+        self.play_game(server_codec, JSONCodec(True))
+        delta = server_codec.encode_call("play", (self.states[0],))
+        client_codec = JSONCodec(True)
+        self.decode_call(client_codec, JSONCodec().encode_call("setup", (DEFAULT_MAP, 45, self.cards)))
+        self.assertRaises(ValueError, self.decode_call, client_codec, delta)
+
+
+class TestSignUp(TestCase):
+    def setUp(self):
+        self.loop = asyncio.new_event_loop()
+        self.tcp1, self.tcp2 = create_tcp_connections(self.loop)
+        self.rpi = create_proxy_player_invoker(self.tcp2, MockTournamentPlayer("Dennis", DrawCardMove()))
+
+    def test_parse_sign_up(self) -> None:
+        self.assertEqual(parse_sign_up("Dennis"), ("Dennis", {}))
+        self.assertEqual(parse_sign_up(["Dennis", {"framing": "length-prefixed"}]),
+                         ("Dennis", {"framing": "length-prefixed"}))
+        self.assertIsNone(parse_sign_up(["Dennis", {"framing": "newline"}]))
+        self.assertIsNone(parse_sign_up(["Dennis", {"compression": True}]))
+        self.assertEqual(parse_sign_up(["Dennis", {"framing": "length-prefixed", "codec": "binary"}]),
+                         ("Dennis", {"framing": "length-prefixed", "codec": "binary"}))
+        self.assertIsNone(parse_sign_up(["Dennis", {"codec": "binary"}]))
+        self.assertEqual(parse_sign_up(["Dennis", {"delta": True}]), ("Dennis", {"delta": True}))
+        self.assertIsNone(parse_sign_up(["Dennis", {"delta": "yes"}]))
+        self.assertIsNone(parse_sign_up(["Dennis"]))
+        self.assertIsNone(parse_sign_up(42))
+
+    def test_sign_up_with_default_framing(self) -> None:
+        async def go():
+            await self.rpi.sign_up("Dennis")
+            self.assertEqual(await self.tcp1.read(), "Dennis")
+
+        self.loop.run_until_complete(go())
+
+    def test_sign_up_with_length_prefixed_framing(self) -> None:
+        async def server():
+            name, options = parse_sign_up(await self.tcp1.read())
+            await self.tcp1.write(json.dumps(options))
+            self.tcp1.set_framing(options["framing"])
+            self.assertEqual(await self.tcp1.read(), options)
+            return name
+
+        async def go():
+            server_task = asyncio.ensure_future(server())
+            await self.rpi.sign_up("Dennis", LENGTH_PREFIXED_FRAMING)
+            self.assertEqual(await server_task, "Dennis")
+            self.assertEqual(self.tcp2.get_framing(), LENGTH_PREFIXED_FRAMING)
+            await self.tcp1.write('["win", [true]]')
+            self.assertEqual(await self.tcp2.read(), ["win", [True]])
+
+        self.loop.run_until_complete(go())
+
+    def test_sign_up_with_delta_play(self) -> None:
+        async def server():
+            name, options = parse_sign_up(await self.tcp1.read())
+            await self.tcp1.write(json.dumps(options))
+            self.tcp1.set_codec("json", options["delta"])
+            self.assertEqual(await self.tcp1.read(), options)
+            return name
+
+        async def call(method, *args):
+            asyncio.ensure_future(self.rpi._try_read_write())
+            await self.tcp1.write_call(method, *args)
+            return await self.tcp1.read_response(method, *args)
+
+        async def go():
+            server_task = asyncio.ensure_future(server())
+            await self.rpi.sign_up("Dennis", delta_play=True)
+            self.assertEqual(await server_task, "Dennis")
+            cards = {Color.RED: 5, Color.BLUE: 6, Color.GREEN: 7, Color.WHITE: 8}
+            destinations = set(list(DEFAULT_MAP.get_all_feasible_destinations())[:2])
+            await call("setup", DEFAULT_MAP, 45, cards)
+            self.rpi._player.play = Mock(return_value=DrawCardMove())
+            for pgs in (PlayerGameState(set(), cards, 45, destinations, [set()]),
+                        PlayerGameState(set(), {**cards, Color.RED: 9}, 45, destinations, [set()])):
+                self.assertIsInstance(await call("play", pgs), DrawCardMove)
+                self.rpi._player.play.assert_called_with(pgs)
+
+        self.loop.run_until_complete(go())
+
+
+class TestJSONStreamDecoder(TestCase):
+    def setUp(self):
+        self.decoder = JSONStreamDecoder()
+
+    def feed_in_chunks(self, data: bytes, chunk_size: int) -> None:
+        for start in range(0, len(data), chunk_size):
+            self.decoder.feed(data[start:start + chunk_size])
+
+    def test_value_split_across_chunks(self):
+        message = {"cities": [["Boston", [1, 2]]], "note": "a \"quoted\" [bracket} \\"}
+        self.feed_in_chunks(json.dumps(message).encode(), 1)
+        self.assertTrue(self.decoder.has_value())
+        self.assertEqual(self.decoder.pop_value(), message)
+        self.assertFalse(self.decoder.has_value())
+
+    def test_incomplete_value(self):
+        self.decoder.feed(b'["more cards", ')
+        self.assertFalse(self.decoder.has_value())
+        self.assertTrue(self.decoder.has_partial_value())
+
+    def test_utf8_split_across_chunks(self):
+        self.feed_in_chunks(json.dumps("S\u00e3o Paulo \u2192 Z\u00fcrich", ensure_ascii=False).encode(), 1)
+        self.assertEqual(self.decoder.pop_value(), "S\u00e3o Paulo \u2192 Z\u00fcrich")
+
+    def test_several_values(self):
+        self.decoder.feed(b' "void"\n[1, [2]] {"a": null} true 42 ')
+        values = []
+        while self.decoder.has_value():
+            values.append(self.decoder.pop_value())
+        self.assertEqual(values, ["void", [1, [2]], {"a": None}, True, 42])
+
+    def test_scalar_at_end_of_data(self):
+        self.decoder.feed(b"tr")
+        self.assertFalse(self.decoder.has_value())
+        self.decoder.feed(b"ue")
+        self.assertTrue(self.decoder.pop_value())
+
+    def test_invalid_json(self):
+        self.assertRaises(ValueError, self.decoder.feed, b"[1,,2]")
+        self.assertRaises(ValueError, self.decoder.feed, b"]")
+        self.decoder.feed(b"[3]")
+        self.assertEqual(self.decoder.pop_value(), [3])
+
+    def test_max_value_size(self):
+        decoder = JSONStreamDecoder(max_value_size=8)
+        decoder.feed(b'[1, 2]      "123456"')
+        self.assertEqual(decoder.pop_value(), [1, 2])
+        self.assertEqual(decoder.pop_value(), "123456")
+        decoder.feed(b'[1, 2,')
+        self.assertRaises(MessageTooLargeError, decoder.feed, b' 3, 4]')
+
+    def test_max_value_size_rejects_partial_value_early(self):
+        decoder = JSONStreamDecoder(max_value_size=8)
+        self.assertRaises(MessageTooLargeError, decoder.feed, b'["unterminated')
+        self.assertFalse(decoder.has_partial_value())
+
+    def test_large_value(self):
+        message = [["city" + str(index), index] for index in range(50000)]
+        self.feed_in_chunks(json.dumps(message).encode(), 8192)
+        self.assertEqual(self.decoder.pop_value(), message)
+
 
 class TestRemoteProxyPlayer(TestCase):
     def setUp(self):
@@ -0,0 +1,42 @@
+import sys
+import unittest
+
+sys.path.append('../../../')
+
+from Trains.Other.Util.route_utils import (
+    get_longest_simple_path_length, get_longest_simple_path_upper_bound)
+
+
+class TestLongestSimplePath(unittest.TestCase):
+    def test_no_edges(self):
+        self.assertEqual(get_longest_simple_path_length([]), 0)
+
+    def test_single_edge(self):
+        self.assertEqual(get_longest_simple_path_length([("a", "b", 4)]), 4)
+
+    def test_parallel_edges_use_heaviest(self):
+        self.assertEqual(get_longest_simple_path_length([("a", "b", 3), ("b", "a", 5), ("b", "c", 4)]), 9)
+
+    def test_cycle_does_not_revisit_vertex(self):
+        edges = [("a", "b", 3), ("b", "c", 4), ("c", "a", 5)]
+        self.assertEqual(get_longest_simple_path_length(edges), 9)
+
+    def test_branching_takes_heaviest_branches(self):
+        edges = [("hub", "a", 3), ("hub", "b", 5), ("hub", "c", 4), ("c", "d", 3)]
+        self.assertEqual(get_longest_simple_path_length(edges), 12)
+
+    def test_disconnected_components(self):
+        edges = [("a", "b", 3), ("c", "d", 4), ("d", "e", 5)]
+        self.assertEqual(get_longest_simple_path_length(edges), 9)
+
+    def test_upper_bound(self):
+        edges = [("a", "b", 3), ("b", "a", 5), ("b", "c", 4), ("c", "a", 2), ("d", "e", 10)]
+        self.assertEqual(get_longest_simple_path_upper_bound(edges), 11)
+        self.assertGreaterEqual(get_longest_simple_path_upper_bound(edges), get_longest_simple_path_length(edges))
+
+    def test_upper_bound_no_edges(self):
+        self.assertEqual(get_longest_simple_path_upper_bound([]), 0)
+
+
+if __name__ == '__main__':
+    unittest.main()
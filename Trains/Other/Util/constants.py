@@ -1,4 +1,5 @@
 import sys
+from functools import lru_cache
 
 sys.path.append('../../')
 from Trains.Common.map import City, Color, Connection, Map
@@ -60,7 +61,12 @@ connections = {connection1, connection2, connection3, connection4, connection5,
 width = 800
 height = 800
 
-DEFAULT_MAP = Map(cities, connections, height, width)
+
+@lru_cache(maxsize=None)
+def get_default_map() -> Map:
+    """Gets the default map, which is built on first use and shared afterwards."""
+    return Map(cities, connections, height, width)
+
 
 # Invalid Small Map
 small_connection1 = Connection(
@@ -72,7 +78,13 @@ small_connection3 = Connection(
 
 small_cities = {austin, boston, philadelphia, new_york}
 small_connections = {small_connection1, small_connection2, small_connection3}
-INVALID_SMALL_MAP = Map(small_cities, small_connections, height, width)
+
+
+@lru_cache(maxsize=None)
+def get_invalid_small_map() -> Map:
+    """Gets a map with too few feasible destinations for a game, which is built on first use and shared afterwards."""
+    return Map(small_cities, small_connections, height, width)
+
 
 # Valid map with several connections, but only one of them is "red"
 connection5_blue = Connection(
@@ -84,5 +96,24 @@ connection14_green = Connection(
 
 one_red_connection_map_connections = {connection1, connection2, connection3, connection4, connection5_blue, connection6, connection7,
                                       connection8, connection9, connection10, connection11, connection12_white, connection13, connection14_green, connection15}
-ONE_RED_CONNECTION_MAP = Map(
-    cities, one_red_connection_map_connections, width, height)
+
+
+@lru_cache(maxsize=None)
+def get_one_red_connection_map() -> Map:
+    """Gets a map with exactly one red connection, which is built on first use and shared afterwards."""
+    return Map(cities, one_red_connection_map_connections, width, height)
+
+
+# The maps are built lazily so that importing this module stays cheap for short-lived processes
+_LAZY_MAPS = {
+    "DEFAULT_MAP": get_default_map,
+    "INVALID_SMALL_MAP": get_invalid_small_map,
+    "ONE_RED_CONNECTION_MAP": get_one_red_connection_map
+}
+
+
+def __getattr__(name: str) -> Map:
+    """Resolves the constant map names to their lazily built maps."""
+    if name in _LAZY_MAPS:
+        return _LAZY_MAPS[name]()
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
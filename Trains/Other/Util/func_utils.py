@@ -1,13 +1,14 @@
 import sys
-from asyncio import wait_for
-from functools import lru_cache
-from importlib.abc import Loader
-from importlib.util import module_from_spec, spec_from_file_location
-from typing import (Any, Awaitable, Callable, Iterable, List, Optional, Set,
-                    Tuple, TypeVar, Union)
+from collections import OrderedDict
+from functools import wraps
+from typing import (Any, Awaitable, Callable, Dict, Hashable, Iterable, List,
+                    NamedTuple, Optional, Set, Tuple, TypeVar, Union)
 
 T = TypeVar("T")
 
+MEMO_ATTRIBUTE_PREFIX = "_memoized_"
+"""The prefix of the instance attributes that hold the caches of methods decorated with memoize_method"""
+
 
 def try_call(callable: Callable[..., T], *args) -> Union[Tuple[T, None], Tuple[None, Exception]]:
     """
@@ -35,6 +36,8 @@ async def try_call_async(async_callable: Callable[..., Awaitable[T]], *args, tim
         Returns:
             A tuple of the result or an Exception
     """
+    # asyncio is only needed by the remote components, so it is not imported for local games
+    from asyncio import wait_for
     try:
         result = await wait_for(async_callable(*args), timeout=timeout)
         return result, None
@@ -42,18 +45,94 @@ async def try_call_async(async_callable: Callable[..., Awaitable[T]], *args, tim
         return None, err
 
 
-def memoize(func: Callable):
-    """Decorate a function with this annotation to memoize (cache) arguments without bound.
+class CacheInfo(NamedTuple):
+    """Statistics of a memoized method's cache for one instance."""
+    hits: int
+    misses: int
+    maxsize: Optional[int]
+    currsize: int
+
+
+class _MethodCache:
+    """The least recently used cache of one memoized method for one instance."""
 
-    Note: all arguments in a decorated function must be hashable."""
-    @lru_cache(maxsize=None)
-    def func_wrapper(*args, **kwargs):
-        return func(*args, **kwargs)
-    return func_wrapper
+    def __init__(self, maxsize: Optional[int]) -> None:
+        self.maxsize = maxsize
+        self.entries: 'OrderedDict[Hashable, Any]' = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+
+
+def memoize_method(maxsize: Optional[int] = None) -> Callable[[Callable[..., T]], Callable[..., T]]:
+    """
+    Decorate a method with this annotation to memoize (cache) its results per instance. The cache is stored
+    on the instance itself, so it is released together with the instance and lookups do not hash the
+    instance. Use `functools.lru_cache` for free functions.
+    The decorated method gains `cache_info(instance)` and `cache_clear(instance)`.
+        Parameters:
+            maxsize (int or None): The number of results kept per instance, evicting the least recently used
+                                   result first, or None to keep every result
+        Returns:
+            The decorator
+        Throws:
+            ValueError: The maximum size must be None or at least 1
+
+    Note: all arguments of a decorated method (other than self) must be hashable, and the instance must
+    have a __dict__.
+    """
+    if maxsize is not None and maxsize < 1:
+        raise ValueError("The maximum size of a memoized method's cache must be at least 1")
+
+    def decorator(method: Callable[..., T]) -> Callable[..., T]:
+        cache_name = MEMO_ATTRIBUTE_PREFIX + method.__name__
+
+        def get_cache(instance: Any) -> _MethodCache:
+            cache = instance.__dict__.get(cache_name)
+            if cache is None:
+                cache = _MethodCache(maxsize)
+                instance.__dict__[cache_name] = cache
+            return cache
+
+        @wraps(method)
+        def method_wrapper(self, *args, **kwargs):
+            cache = get_cache(self)
+            key = args if len(kwargs) == 0 else (args, tuple(sorted(kwargs.items())))
+            entries = cache.entries
+            if key in entries:
+                cache.hits += 1
+                entries.move_to_end(key)
+                return entries[key]
+            cache.misses += 1
+            result = method(self, *args, **kwargs)
+            entries[key] = result
+            if cache.maxsize is not None and len(entries) > cache.maxsize:
+                entries.popitem(last=False)
+            return result
+
+        def cache_info(instance: Any) -> CacheInfo:
+            cache = get_cache(instance)
+            return CacheInfo(cache.hits, cache.misses, cache.maxsize, len(cache.entries))
+
+        def cache_clear(instance: Any) -> None:
+            instance.__dict__.pop(cache_name, None)
+
+        method_wrapper.cache_info = cache_info  # type: ignore
+        method_wrapper.cache_clear = cache_clear  # type: ignore
+        return method_wrapper
+    return decorator
+
+
+def without_memoized_results(state: Dict[str, Any]) -> Dict[str, Any]:
+    """Returns a copy of an instance's __dict__ without the caches of its memoized methods, e.g. for pickling."""
+    return {name: value for name, value in state.items() if not name.startswith(MEMO_ATTRIBUTE_PREFIX)}
 
 
 def load_class_from_file(file_path: str) -> type:
     """Loads and returns a single class defined in a file at the given path."""
+    # The import machinery is only needed when loading strategies from files, so it is imported on use
+    from importlib.abc import Loader
+    from importlib.util import module_from_spec, spec_from_file_location
+
     new_module_name = ""  # new module name of imported strategy
 
     # creates a ModuleSpec which contains all the import-related
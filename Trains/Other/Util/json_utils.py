@@ -283,14 +283,9 @@ def convert_data_connection_to_acquired(data_connection: Connection) -> str:
     """
     Converts a Connection to a JSONAcquired, which is string reprsentation of Connection that looks like: [Name, Name, Color, Length].
     """
-    city1, city2 = list(data_connection.cities)
-
-    if city1.name < city2.name:
-        name1 = city1.name
-        name2 = city2.name
-    else:
-        name1 = city2.name
-        name2 = city1.name
+    city1, city2 = data_connection.endpoints
+    name1 = city1.name
+    name2 = city2.name
 
     color = data_connection.color.value
     length = data_connection.length
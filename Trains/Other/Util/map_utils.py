@@ -1,5 +1,4 @@
 import sys
-from functools import cmp_to_key
 from typing import List
 
 sys.path.append('../../')
@@ -18,7 +17,7 @@ def verify_game_map(game_map: Map, num_players: int, num_destination_options: in
         Returns:
             True if the map can be used with the given number of players. False Otherwise.
     """
-    return len(game_map.get_all_feasible_destinations()) \
+    return game_map.count_feasible_destinations() \
         >= num_destination_options + (num_destinations_per_player * (num_players - 1))
 
 
@@ -31,8 +30,8 @@ def get_lexicographic_order_of_destinations(destinations: List[Destination]) ->
         Returns:
             The lexicographically sorted list of given destinations
     """
-    # Uses the special method __lt__ (less than) written in the Destination dataclass to sort
-    destinations.sort(key=cmp_to_key(Destination.__lt__))
+    # Uses the sort key cached on each Destination, which orders them the same way as its __lt__
+    destinations.sort(key=lambda destination: destination.sort_key)
     return destinations
 
 
@@ -47,6 +46,6 @@ def get_lexicographic_order_of_connections(connections: List[Connection]) -> Lis
         Returns:
             The lexicographically sorted list of given connections
     """
-    # Uses the special method __lt__ (less than) written in the Connection dataclass to sort
-    connections.sort(key=cmp_to_key(Connection.__lt__))
+    # Uses the sort key cached on each Connection, which orders them the same way as its __lt__
+    connections.sort(key=lambda connection: connection.sort_key)
     return connections
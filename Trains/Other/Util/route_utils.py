@@ -0,0 +1,111 @@
+from typing import Dict, Hashable, Iterable, List, Tuple, TypeVar
+
+H = TypeVar("H", bound=Hashable)
+
+
+def get_longest_simple_path_length(edges: Iterable[Tuple[H, H, int]]) -> int:
+    """
+    Finds the weight of the heaviest simple path (a path that visits no vertex twice) in an undirected
+    multigraph. Parallel edges are collapsed to the heaviest of them, since a simple path uses at most one.
+        Parameters:
+            edges (iterable(tuple(vertex, vertex, int))): The edges of the graph as (end, end, weight) triples
+        Returns:
+            (int) The weight of the heaviest simple path, or 0 if the graph has no edges
+    """
+    adjacency = _build_weighted_adjacency(edges)
+    longest = 0
+    for component in _get_components(adjacency):
+        longest = max(longest, _get_longest_simple_path_length_in_component(adjacency, component))
+    return longest
+
+
+def get_longest_simple_path_upper_bound(edges: Iterable[Tuple[H, H, int]]) -> int:
+    """
+    Cheaply bounds the weight of the heaviest simple path in an undirected multigraph from above. A simple path
+    lies within one connected component and uses at most the heaviest of any parallel edges, so the bound is
+    the largest total weight of a component with parallel edges collapsed.
+        Parameters:
+            edges (iterable(tuple(vertex, vertex, int))): The edges of the graph as (end, end, weight) triples
+        Returns:
+            (int) An upper bound on the result of `get_longest_simple_path_length` for the same edges
+    """
+    adjacency = _build_weighted_adjacency(edges)
+    bound = 0
+    for component in _get_components(adjacency):
+        # Every edge is counted from both of its ends
+        component_weight = sum(sum(adjacency[vertex].values()) for vertex in component) // 2
+        bound = max(bound, component_weight)
+    return bound
+
+
+def _build_weighted_adjacency(edges: Iterable[Tuple[H, H, int]]) -> Dict[H, Dict[H, int]]:
+    """Builds a map from each vertex to its neighbors and the heaviest edge weight to each of them."""
+    adjacency: Dict[H, Dict[H, int]] = {}
+    for vertex1, vertex2, weight in edges:
+        if vertex1 == vertex2:
+            continue
+        for start, end in ((vertex1, vertex2), (vertex2, vertex1)):
+            neighbors = adjacency.setdefault(start, {})
+            neighbors[end] = max(weight, neighbors.get(end, weight))
+    return adjacency
+
+
+def _get_components(adjacency: Dict[H, Dict[H, int]]) -> List[List[H]]:
+    """Splits the vertices of the given graph into its connected components."""
+    components: List[List[H]] = []
+    seen = set()
+    for root in adjacency:
+        if root in seen:
+            continue
+        seen.add(root)
+        component = [root]
+        for vertex in component:
+            for neighbor in adjacency[vertex]:
+                if neighbor not in seen:
+                    seen.add(neighbor)
+                    component.append(neighbor)
+        components.append(component)
+    return components
+
+
+def _get_longest_simple_path_length_in_component(adjacency: Dict[H, Dict[H, int]], component: List[H]) -> int:
+    """
+    Finds the weight of the heaviest simple path within one connected component using a depth-first search
+    from every vertex. Vertices are numbered so the visited set of a path is a bitmask, which allows:
+      - memoized pruning: two partial paths ending at the same vertex with the same visited set have the same
+        extensions, so a path is abandoned if one at least as heavy has already been explored.
+      - bound pruning: every further edge enters a new vertex, so the remaining gain is at most the sum of the
+        heaviest edge incident to each unvisited vertex. A path is abandoned if that cannot beat the best.
+    """
+    index = {vertex: i for i, vertex in enumerate(component)}
+    neighbors: List[List[Tuple[int, int]]] = [
+        sorted(((index[neighbor], weight) for neighbor, weight in adjacency[vertex].items()),
+               key=lambda neighbor: -neighbor[1])
+        for vertex in component]
+    heaviest_incident = [neighbor_weights[0][1] for neighbor_weights in neighbors]
+
+    longest = 0
+    best_prefixes: Dict[Tuple[int, int], int] = {}
+
+    def search(vertex: int, visited: int, prefix: int, remaining_bound: int) -> None:
+        nonlocal longest
+        if prefix > longest:
+            longest = prefix
+        for neighbor, weight in neighbors[vertex]:
+            bit = 1 << neighbor
+            if visited & bit:
+                continue
+            next_prefix = prefix + weight
+            next_bound = remaining_bound - heaviest_incident[neighbor]
+            if next_prefix + next_bound <= longest:
+                continue
+            key = (neighbor, visited | bit)
+            if best_prefixes.get(key, -1) >= next_prefix:
+                continue
+            best_prefixes[key] = next_prefix
+            search(neighbor, visited | bit, next_prefix, next_bound)
+
+    total_bound = sum(heaviest_incident)
+    for start in range(len(component)):
+        search(start, 1 << start, 0, total_bound - heaviest_incident[start])
+    return longest
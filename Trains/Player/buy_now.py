@@ -1,13 +1,10 @@
 import sys
-from typing import Iterable, List, Optional, Set, TypeVar
+from typing import List, Optional
 
 sys.path.append('../../')
 
-from Trains.Common.map import Connection, Destination, Map
+from Trains.Common.map import Connection, Destination, FreeConnectionIndex, Map
 from Trains.Common.player_game_state import PlayerGameState
-from Trains.Other.Util.func_utils import flatten_set
-from Trains.Other.Util.gs_utils import can_acquire_connection
-from Trains.Other.Util.map_utils import get_lexicographic_order_of_connections
 from Trains.Player.moves import (AcquireConnectionMove, DrawCardMove,
                                  IPlayerMove)
 from Trains.Player.strategy import AbstractPlayerStrategy
@@ -18,7 +15,14 @@ class Buy_Now(AbstractPlayerStrategy):
     Represents the following strategy:
     - Always attempt to acquire a connection first.
     - If there are no acquireable connections, then draw cards.
+    The free connections are indexed by (color, length) across turns, and the index is only updated with the
+    acquisitions that changed since the previous turn.
     """
+    _free_connection_index: Optional[FreeConnectionIndex]
+
+    def __init__(self) -> None:
+        self._free_connection_index = None
+
     def _sort_destinations(self, destinations: List[Destination]) -> List[Destination]:
         """Sorts destinations in reverse lexicographical order."""
         sorted_dests = super()._sort_destinations(destinations)
@@ -29,22 +33,17 @@ class Buy_Now(AbstractPlayerStrategy):
         """
         Buy_Now player strategy for selecting the connection to acquire when attempting to make a connection on their turn.
         Selects the first connection from the lexicographically sorted list of given connections (unacquired connections)
-        that the player has the necessary resources to acquire.
+        that the player has the necessary resources to acquire. Only the (color, length) buckets of free connections
+        the player can pay for are looked at, and connection ids follow lexicographic order, so no sorting is needed.
             Parameters:
                 resources (PlayerGameState): the resources the player implementing this strategy has
             Returns:
                 Connection to acquire if possible, None otherwise
         """
-
-        all_acquired_connections = flatten_set([*pgs.other_acquisitions, pgs.connections])
-        unacquired_connections: Set[Connection] = game_map.connections - all_acquired_connections
-        sorted_connections = get_lexicographic_order_of_connections(
-            list(unacquired_connections))
-
-        for connection in sorted_connections:
-            if can_acquire_connection(pgs, connection):
-                return connection
-        return None
+        if self._free_connection_index is None or self._free_connection_index.game_map is not game_map:
+            self._free_connection_index = FreeConnectionIndex(game_map)
+        self._free_connection_index.update_acquisitions([pgs.connections, *pgs.other_acquisitions])
+        return self._free_connection_index.get_first_acquirable_connection(pgs.rails, pgs.colored_cards)
 
     def get_player_move(self, pgs: PlayerGameState, game_map: Map) -> IPlayerMove:
         """
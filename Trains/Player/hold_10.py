@@ -16,6 +16,12 @@ class Hold_10(AbstractPlayerStrategy):
     - If the player has more than 10 cards, attempt to acquire a connection.
     - - The logic for attempting to acquire a connection is the same as the BuyNow strategy
     """
+    _buy_now: Buy_Now
+
+    def __init__(self) -> None:
+        # Kept across turns, so that its index of free connections is only updated with each turn's changes
+        self._buy_now = Buy_Now()
+
     def get_player_move(self, pgs: PlayerGameState, game_map: Map) -> IPlayerMove:
         """
         Polls the Hold_10 player strategy for a move.  The logic here follows the strategy described
@@ -30,4 +36,4 @@ class Hold_10(AbstractPlayerStrategy):
             return DrawCardMove()
 
         # Otherwise attempt to acquire a connection
-        return Buy_Now().get_player_move(pgs, game_map)
+        return self._buy_now.get_player_move(pgs, game_map)
@@ -5,7 +5,7 @@ sys.path.append('../../')
 
 from Trains.Common.map import Map, Color, Destination
 from Trains.Common.player_game_state import PlayerGameState
-from Trains.Other.Util.constants import DEFAULT_MAP
+from Trains.Other.Util.constants import get_default_map
 from Trains.Player.buy_now import Buy_Now
 from Trains.Player.hold_10 import Hold_10
 from Trains.Player.player_interface import PlayerInterface
@@ -97,7 +97,7 @@ class StrategicPlayer(PlayerInterface):
         pass
 
     def start(self) -> Map:
-        return DEFAULT_MAP
+        return get_default_map()
 
     def more(self, cards: List[Color]) -> None:
         pass
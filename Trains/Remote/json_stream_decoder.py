@@ -0,0 +1,210 @@
+import codecs
+import json
+import re
+from collections import deque
+from typing import Deque, List, Optional, Union
+
+JSONValue = Union[int, float, str, list, bool, None, dict]
+
+# Characters that matter while scanning each part of a JSON text (JSON only allows these 4 whitespace characters)
+_VALUE_START = re.compile(r'[^ \t\n\r]')
+_CONTAINER_SPECIAL = re.compile(r'[\[\]{}"]')
+_STRING_SPECIAL = re.compile(r'["\\]')
+_SCALAR_END = re.compile(r'[ \t\n\r\[\]{}",:]')
+
+
+class MessageTooLargeError(ValueError):
+    """Raised when a message exceeds the size allowed for it."""
+
+
+class JSONStreamDecoder:
+    """
+    Splits a stream of bytes into the JSON values it contains, for reading messages from a TCP stream.
+    Bytes are fed in chunks as they arrive; the decoder scans each new character once to find where the
+    current value ends (tracking brackets, strings and escapes), and only then decodes that value, so reading
+    a message of N bytes takes O(N) time no matter how it is split into chunks. Text after a complete value is
+    kept for the next value, and UTF-8 characters split across chunks are decoded once complete.
+
+    A value that is not an array, object or string (e.g. a number) ends at the next whitespace or structural
+    character, or at the end of the bytes fed so far if it already decodes on its own.
+
+    The size of a value can be capped, so that a sender cannot make the decoder buffer arbitrarily large
+    values: as soon as the characters of the current value exceed the cap, it is discarded and an error
+    is raised. Each character takes at least one byte, so a cap of N allows every message of up to N bytes.
+    After an error the rest of the stream cannot be decoded reliably.
+        Parameters:
+            max_value_size (int or None): The maximum number of characters of a value, or None for no cap
+    """
+    _utf8_decoder: codecs.IncrementalDecoder
+    _json_decoder: json.JSONDecoder
+    _max_value_size: Optional[int]
+    _values: Deque[JSONValue]
+    _pending: List[str]
+    _pending_size: int
+    _in_value: bool
+    _depth: int
+    _in_string: bool
+    _in_scalar: bool
+    _escape_pending: bool
+
+    def __init__(self, max_value_size: Optional[int] = None) -> None:
+        """
+        Constructor for a decoder at the start of a stream.
+            Throws:
+                ValueError: The maximum value size must be None or positive
+        """
+        if max_value_size is not None and max_value_size < 1:
+            raise ValueError("The maximum value size must be positive")
+        self._utf8_decoder = codecs.getincrementaldecoder("utf-8")()
+        self._json_decoder = json.JSONDecoder()
+        self._max_value_size = max_value_size
+        self._values = deque()
+        self._reset_value()
+
+    def _reset_value(self) -> None:
+        """Resets the scanning state for the next value."""
+        self._pending = []
+        self._pending_size = 0
+        self._in_value = False
+        self._depth = 0
+        self._in_string = False
+        self._in_scalar = False
+        self._escape_pending = False
+
+    def has_value(self) -> bool:
+        """Determines whether a complete value has been decoded and not yet taken."""
+        return len(self._values) > 0
+
+    def pop_value(self) -> JSONValue:
+        """
+        Takes the oldest complete value.
+            Returns:
+                The decoded JSON value
+            Throws:
+                IndexError: No complete value has been decoded
+        """
+        return self._values.popleft()
+
+    def has_partial_value(self) -> bool:
+        """Determines whether part of a value has been fed without the value being complete yet."""
+        return self._in_value
+
+    def feed(self, data: bytes) -> None:
+        """
+        Feeds the next bytes of the stream, decoding every value they complete.
+            Parameters:
+                data (bytes): The next bytes of the stream
+            Throws:
+                ValueError: The bytes are not valid UTF-8, or a complete value is not valid JSON
+                MessageTooLargeError: A value exceeds the maximum value size
+        """
+        text = self._utf8_decoder.decode(data)
+        if len(text) == 0:
+            return
+
+        segment_start: Optional[int] = 0 if self._in_value else None
+        position = 0
+        while position < len(text):
+            if self._escape_pending:
+                self._escape_pending = False
+                position += 1
+            elif self._in_string:
+                match = _STRING_SPECIAL.search(text, position)
+                if match is None:
+                    position = len(text)
+                elif match.group() == "\\":
+                    self._escape_pending = True
+                    position = match.end()
+                else:
+                    self._in_string = False
+                    position = match.end()
+                    if self._depth == 0:
+                        self._complete_value(text, segment_start, position)
+                        segment_start = None
+            elif self._in_scalar:
+                match = _SCALAR_END.search(text, position)
+                if match is None:
+                    position = len(text)
+                else:
+                    position = match.start()
+                    self._complete_value(text, segment_start, position)
+                    segment_start = None
+            elif self._depth > 0:
+                match = _CONTAINER_SPECIAL.search(text, position)
+                if match is None:
+                    position = len(text)
+                    continue
+                position = match.end()
+                character = match.group()
+                if character == '"':
+                    self._in_string = True
+                elif character in "[{":
+                    self._depth += 1
+                else:
+                    self._depth -= 1
+                    if self._depth == 0:
+                        self._complete_value(text, segment_start, position)
+                        segment_start = None
+            else:
+                match = _VALUE_START.search(text, position)
+                if match is None:
+                    position = len(text)
+                    continue
+                position = match.start()
+                segment_start = position
+                self._in_value = True
+                character = text[position]
+                if character in "[{":
+                    self._depth = 1
+                    position += 1
+                elif character == '"':
+                    self._in_string = True
+                    position += 1
+                elif character in "]},:":
+                    self._fail(character)
+                else:
+                    self._in_scalar = True
+
+        if segment_start is not None and segment_start < len(text):
+            self._pending.append(text[segment_start:])
+            self._pending_size += len(text) - segment_start
+            self._check_size(self._pending_size)
+        if self._in_scalar:
+            self._try_complete_scalar()
+
+    def _complete_value(self, text: str, segment_start: Optional[int], end: int) -> None:
+        """Decodes the value that ends at the given position of the given text and resets for the next value."""
+        start = 0 if segment_start is None else segment_start
+        self._check_size(self._pending_size + end - start)
+        value_text = "".join(self._pending) + text[start:end]
+        self._reset_value()
+        self._values.append(self._decode(value_text))
+
+    def _try_complete_scalar(self) -> None:
+        """Completes a scalar value that reaches the end of the fed bytes, if it already decodes on its own."""
+        value_text = "".join(self._pending)
+        try:
+            value = self._decode(value_text)
+        except ValueError:
+            self._pending = [value_text]
+            return
+        self._reset_value()
+        self._values.append(value)
+
+    def _check_size(self, size: int) -> None:
+        """Discards the current value if the given size of it exceeds the maximum value size."""
+        if self._max_value_size is not None and size > self._max_value_size:
+            self._reset_value()
+            raise MessageTooLargeError(f"Message exceeds {self._max_value_size} characters")
+
+    def _decode(self, value_text: str) -> JSONValue:
+        """Decodes the text of exactly one JSON value."""
+        value, end = self._json_decoder.raw_decode(value_text)
+        if end != len(value_text):
+            raise json.JSONDecodeError("Extra data", value_text, end)
+        return value
+
+    def _fail(self, character: str) -> None:
+        """Discards the current value and reports an unexpected character."""
+        self._reset_value()
+        raise json.JSONDecodeError(f"Unexpected {character!r}", character, 0)
@@ -0,0 +1,588 @@
+import json
+import struct
+import sys
+from abc import ABCMeta, abstractmethod
+from typing import (Any, Dict, FrozenSet, Iterable, List, Optional, Set,
+                    Tuple, Type, Union)
+
+sys.path.append('../../')
+from Trains.Common.map import Color, Connection, Destination, Map
+from Trains.Common.player_game_state import PlayerGameState
+from Trains.Other.Util.json_utils import (
+    convert_dict_hand_to_json_hand,
+    convert_json_colored_cards_list_to_colored_cards_dict,
+    convert_data_connection_to_acquired, convert_json_connection_to_data,
+    convert_json_destinations_to_data, convert_json_map_to_data_map,
+    convert_json_this_player_to_data)
+from Trains.Player.moves import (AcquireConnectionMove, DrawCardMove,
+                                 IPlayerMoveVisitor)
+from Trains.Remote.json_stream_decoder import JSONValue
+
+Message = Union[str, bytes]
+"""A message as written to a connection: JSON text, or the bytes of a binary message"""
+
+METHODS: Tuple[str, ...] = ("start", "setup", "pick", "play", "more", "win", "end")
+"""The methods a RemoteProxyPlayer calls on a RemotePlayerInvoker"""
+
+JSON_CODEC = "json"
+"""Messages are JSON as described by the remote protocol (the default)"""
+BINARY_CODEC = "binary"
+"""Messages are compact binary, referring to cities and connections by their ids in the map of the game"""
+
+AcquisitionChanges = Tuple[List[FrozenSet[Connection]], List[FrozenSet[Connection]]]
+"""The connections acquired and the connections released by a player and by each other player, in that order"""
+
+
+def format_message(name: str, *args: str) -> str:
+    msg = f'["{name}", [{", ".join(args)}]]'
+    return msg
+
+
+def join_json_strs(iterable: Iterable[str]) -> str:
+    msg = f"[{', '.join(iterable)}]"
+    return msg
+
+
+class MessageCodec(metaclass=ABCMeta):
+    """
+    Converts the calls a RemoteProxyPlayer makes and the responses a RemotePlayerInvoker returns to and from
+    messages. The arguments of each method and its response are:
+        - start (bool) -> Map
+        - setup (Map, int, dict(Color, int)) -> None
+        - pick (set(Destination)) -> set(Destination)
+        - play (PlayerGameState) -> IPlayerMove
+        - more (list(Color)) -> None
+        - win (bool) -> None
+        - end (bool) -> None
+    A codec is created for each connection and remembers the map of the current game from the setup call.
+
+    With delta play enabled (on both ends), only the first play call of a game carries the player's full
+    game state; later ones carry what changed since the player's previous turn (rails, changed card counts
+    and the connections acquired and released by each player), and the invoker's codec rebuilds the state
+    from the previous one. A state whose destinations or number of players changed is sent in full.
+        Parameters:
+            delta_play (bool): Whether play calls are delta encoded
+    """
+
+    binary: bool = False
+    """Whether the messages are bytes (which need length-prefixed framing) rather than JSON"""
+
+    _game_map: Optional[Map]
+    _delta_play: bool
+    _last_play_state: Optional[PlayerGameState]
+
+    def __init__(self, delta_play: bool = False) -> None:
+        self._game_map = None
+        self._delta_play = delta_play
+        self._last_play_state = None
+
+    @abstractmethod
+    def encode_call(self, method: str, args: Tuple[Any, ...]) -> Message:
+        """Encodes a call of the given method with the given arguments."""
+        raise NotImplementedError
+
+    @abstractmethod
+    def decode_call(self, message: Union[JSONValue, bytes]) -> Tuple[str, Tuple[Any, ...]]:
+        """
+        Decodes a call into its method and arguments.
+            Throws:
+                ValueError: The message is not a valid call
+                RuntimeError: The call needs the map of the game before the game was set up
+        """
+        raise NotImplementedError
+
+    @abstractmethod
+    def encode_response(self, method: str, response: Any) -> Message:
+        """Encodes the response to a call of the given method."""
+        raise NotImplementedError
+
+    @abstractmethod
+    def decode_response(self, method: str, args: Tuple[Any, ...], message: Union[JSONValue, bytes]) -> Any:
+        """
+        Decodes the response to a call of the given method with the given arguments.
+            Throws:
+                ValueError: The message is not a valid response to the call
+                RuntimeError: The message is not the expected acknowledgement of the call
+        """
+        raise NotImplementedError
+
+    def _get_game_map(self) -> Map:
+        if self._game_map is None:
+            raise RuntimeError("Map is currently unknown")
+        return self._game_map
+
+    def _set_game_map(self, game_map: Map) -> None:
+        """Starts a new game on the given map, which the play states of an earlier game do not apply to."""
+        self._game_map = game_map
+        self._last_play_state = None
+
+    def _get_acquisition_changes(self, pgs: PlayerGameState) -> Optional[AcquisitionChanges]:
+        """
+        Records the given play state as sent, and determines how it can be sent.
+            Returns:
+                The changes to the acquisitions since the previous play state, or None if the state has to be
+                sent in full
+        """
+        last_pgs = self._last_play_state
+        if self._delta_play:
+            self._last_play_state = pgs
+        if last_pgs is None or last_pgs.destinations != pgs.destinations \
+                or len(last_pgs.other_acquisitions) != len(pgs.other_acquisitions):
+            return None
+
+        before = (last_pgs.connections, *last_pgs.other_acquisitions)
+        after = (pgs.connections, *pgs.other_acquisitions)
+        return [connections - previous for previous, connections in zip(before, after)], \
+            [previous - connections for previous, connections in zip(before, after)]
+
+    def _get_card_changes(self, pgs: PlayerGameState) -> Tuple[Dict[Color, int], List[Color]]:
+        """
+        Compares the cards of the given play state to those of the previous play state.
+            Returns:
+                The card counts that differ from the previous play state, and the colors that the previous play
+                state had a count of and the given one has not
+        """
+        last_cards = self._last_play_state.colored_cards if self._last_play_state is not None else {}
+        cards = pgs.colored_cards
+        return {color: count for color, count in cards.items() if last_cards.get(color) != count}, \
+            [color for color in last_cards if color not in cards]
+
+    def _record_play_state(self, pgs: PlayerGameState) -> PlayerGameState:
+        """Records the given received play state as the base of the next delta, if delta play is enabled."""
+        if self._delta_play:
+            self._last_play_state = pgs
+        return pgs
+
+    def _apply_play_changes(self, rails: int, changed_cards: Dict[Color, int], removed_colors: Iterable[Color],
+                            changes: AcquisitionChanges) -> PlayerGameState:
+        """
+        Rebuilds a play state from the previous one and the changes since. The counts of the removed colors are
+        dropped from the hand, rather than set to 0.
+            Throws:
+                ValueError: There is no previous play state, or the changes do not apply to it
+        """
+        last_pgs = self._last_play_state
+        if not self._delta_play or last_pgs is None:
+            raise ValueError("A play state delta needs a previous play state")
+        acquired, released = changes
+        before = (last_pgs.connections, *last_pgs.other_acquisitions)
+        if not len(acquired) == len(released) == len(before):
+            raise ValueError("A play state delta must have changes for every player")
+        if any(not removed.issubset(previous) for removed, previous in zip(released, before)):
+            raise ValueError("A play state delta cannot release connections that were not acquired")
+
+        acquisitions = [(previous - removed) | added for previous, added, removed in zip(before, acquired, released)]
+        cards = {**last_pgs.colored_cards, **changed_cards}
+        for color in removed_colors:
+            cards.pop(color, None)
+        pgs = PlayerGameState(acquisitions[0], cards, rails, last_pgs.destinations, acquisitions[1:])
+        return self._record_play_state(pgs)
+
+
+class PlayerMoveToJSONSerializer(IPlayerMoveVisitor[JSONValue]):
+    """An PlayerMove to JSON serializer."""
+
+    def visitDrawCards(self, _: DrawCardMove) -> JSONValue:
+        return "more cards"
+
+    def visitAcquireConnection(self, move: AcquireConnectionMove) -> JSONValue:
+        return json.loads(convert_data_connection_to_acquired(move.connection))
+
+
+class JSONCodec(MessageCodec):
+    """
+    The JSON messages of the remote protocol.
+    A delta encoded play state is {"delta": {"rails": Natural, "cards": {Color: Natural}, "removed_colors": [Color],
+    "acquired": [[Acquired]], "released": [[Acquired]]}}, where "cards" has the changed counts only,
+    "removed_colors" the colors that are no longer in the hand at all, and "acquired" and "released" hold the
+    changed connections of the player and then of each other player.
+    """
+
+    def encode_call(self, method: str, args: Tuple[Any, ...]) -> Message:
+        if method == "setup":
+            game_map, rails, cards = args
+            self._set_game_map(game_map)
+            return format_message(
+                "setup", game_map.get_as_json(), json.dumps(rails), convert_dict_hand_to_json_hand(cards))
+        if method == "pick":
+            destinations, = args
+            return format_message(
+                "pick", join_json_strs(destination.get_as_json() for destination in destinations))
+        if method == "play":
+            active_game_state, = args
+            changed_cards, removed_colors = self._get_card_changes(active_game_state)
+            changes = self._get_acquisition_changes(active_game_state)
+            if changes is None:
+                return format_message("play", active_game_state.get_as_json())
+            acquired, released = changes
+            delta = {
+                "rails": active_game_state.rails,
+                "cards": {color.value: count for color, count in changed_cards.items()},
+                "removed_colors": [color.value for color in removed_colors],
+                "acquired": [[json.loads(convert_data_connection_to_acquired(connection))
+                              for connection in connections] for connections in acquired],
+                "released": [[json.loads(convert_data_connection_to_acquired(connection))
+                              for connection in connections] for connections in released]}
+            return format_message("play", json.dumps({"delta": delta}))
+        if method == "more":
+            cards, = args
+            return format_message("more", json.dumps([card.value for card in cards]))
+        if method in ("start", "win", "end"):
+            flag, = args
+            return format_message(method, json.dumps(flag))
+        raise ValueError(f"Unexpected method: {method}")
+
+    def decode_call(self, message: Union[JSONValue, bytes]) -> Tuple[str, Tuple[Any, ...]]:
+        method, args = self.parse_json_player_call(message)
+
+        if method == "start":
+            return method, (True,)
+
+        if method == "setup":
+            json_map, rails, json_player_hand = args
+            if type(json_map) is not dict:
+                raise ValueError("Given JSON map type is invalid")
+            if type(rails) is not int:
+                raise ValueError("Given JSON map type is invalid")
+            if type(json_player_hand) is not list:
+                raise ValueError("Given JSON map type is invalid")
+
+            cards = convert_json_colored_cards_list_to_colored_cards_dict(
+                json_player_hand)
+            game_map = convert_json_map_to_data_map(json_map)
+            self._set_game_map(game_map)
+            return method, (game_map, rails, cards)
+
+        if method == "pick":
+            json_destinations, = args
+            if type(json_destinations) is not list:
+                raise ValueError(
+                    "Given JSON destinations list type is invalid")
+
+            all_destinations = self._get_game_map().get_all_feasible_destinations()
+            destinations = {convert_json_destinations_to_data(
+                destination, all_destinations) for destination in json_destinations}
+            return method, (destinations,)
+
+        if method == "play":
+            json_pgs, = args
+            if type(json_pgs) is not dict:
+                raise ValueError(
+                    "Given JSON player game state type is invalid")
+
+            if "delta" in json_pgs:
+                return method, (self._decode_play_delta(json_pgs["delta"]),)
+            return method, (self._record_play_state(convert_json_this_player_to_data(json_pgs, self._get_game_map())),)
+
+        if method == "more":
+            json_card_list, = args
+            if type(json_card_list) is not list:
+                raise ValueError("Given JSON card list type is invalid")
+
+            cards_list: List[Color] = [Color(color)
+                                       for color in json_card_list]
+            return method, (cards_list,)
+
+        if method in ("win", "end"):
+            result, = args
+            if type(result) is not bool:
+                raise ValueError(f"Given JSON {method} result type is invalid")
+            return method, (result,)
+
+        raise ValueError(f"Unexpected method: {method}")
+
+    def _decode_play_delta(self, json_delta: JSONValue) -> PlayerGameState:
+        """Rebuilds a play state from a JSON play state delta."""
+        if type(json_delta) is not dict:
+            raise ValueError("Given JSON play state delta type is invalid")
+        rails = json_delta.get("rails")
+        json_cards = json_delta.get("cards")
+        json_acquired = json_delta.get("acquired")
+        json_released = json_delta.get("released")
+        json_removed_colors = json_delta.get("removed_colors")
+        if type(rails) is not int or type(json_cards) is not dict or type(json_removed_colors) is not list \
+                or type(json_acquired) is not list or type(json_released) is not list:
+            raise ValueError("Given JSON play state delta type is invalid")
+
+        game_map = self._get_game_map()
+        changed_cards = {Color(color): count for color, count in json_cards.items()}
+        removed_colors = [Color(color) for color in json_removed_colors]
+        acquired, released = ([frozenset(convert_json_connection_to_data(json_connection, game_map)
+                                         for json_connection in json_connections)
+                               for json_connections in json_changes]
+                              for json_changes in (json_acquired, json_released))
+        return self._apply_play_changes(rails, changed_cards, removed_colors, (acquired, released))
+
+    def parse_json_player_call(self, json_request: Union[JSONValue, bytes]) -> Tuple[str, List[Any]]:
+        if type(json_request) is not list:
+            raise ValueError("JSON request must be a list.")
+        if len(json_request) != 2:
+            raise ValueError("JSON request must contain two arguments")
+        if type(json_request[0]) is not str and type(json_request[1]) is not list:
+            raise ValueError("JSON request contains invalid argument types")
+
+        return json_request[0], json_request[1]
+
+    def encode_response(self, method: str, response: Any) -> Message:
+        if method == "start":
+            return response.get_as_json()
+        if method == "pick":
+            return f'[{", ".join(destination.get_as_json() for destination in response)}]'
+        if method == "play":
+            return json.dumps(response.accepts(PlayerMoveToJSONSerializer()))
+        return json.dumps("void")
+
+    def decode_response(self, method: str, args: Tuple[Any, ...], message: Union[JSONValue, bytes]) -> Any:
+        if method == "start":
+            if type(message) is not dict:
+                raise RuntimeError  # TODO: find better error to use
+            return convert_json_map_to_data_map(message)
+
+        if method == "pick":
+            if type(message) is not list:
+                raise RuntimeError  # TODO: find better error to use
+            destinations, = args
+            return {convert_json_destinations_to_data(
+                destination, destinations) for destination in message}
+
+        if method == "play":
+            if message == "more cards":
+                return DrawCardMove()
+            elif type(message) is list:
+                return AcquireConnectionMove(convert_json_connection_to_data(message, self._get_game_map()))
+            else:
+                raise ValueError("Bad PlayerMove json")
+
+        if message != "void":
+            raise RuntimeError("Method call did not return void")
+        return None
+
+
+_COLORS: Tuple[Color, ...] = tuple(Color)
+_COLOR_INDICES: Dict[Color, int] = {color: index for index, color in enumerate(_COLORS)}
+_METHOD_CODES: Dict[str, int] = {method: code for code, method in enumerate(METHODS)}
+
+_FLAG = struct.Struct("<B")
+_HAND = struct.Struct(f"<{len(_COLORS)}H")
+_SETUP = struct.Struct(f"<H{len(_COLORS)}H")
+_PLAYER_STATE = struct.Struct(f"<H{len(_COLORS)}H4HB")
+_DESTINATION = struct.Struct("<2H")
+_CONNECTION_ID = struct.Struct("<H")
+_PLAY_DELTA = struct.Struct(f"<BH{len(_COLORS)}HH")
+_CONNECTION_CHANGE = struct.Struct("<BH")
+
+_FULL_PLAY_STATE = 0
+_PLAY_STATE_DELTA = 1
+
+_DRAW_CARDS = 0
+_ACQUIRE_CONNECTION = 1
+
+
+class PlayerMoveToBinarySerializer(IPlayerMoveVisitor[bytes]):
+    """A PlayerMove to binary serializer, referring to connections by their ids in the given map."""
+
+    _game_map: Map
+
+    def __init__(self, game_map: Map) -> None:
+        self._game_map = game_map
+
+    def visitDrawCards(self, _: DrawCardMove) -> bytes:
+        return _FLAG.pack(_DRAW_CARDS)
+
+    def visitAcquireConnection(self, move: AcquireConnectionMove) -> bytes:
+        return _FLAG.pack(_ACQUIRE_CONNECTION) + _CONNECTION_ID.pack(self._game_map.get_connection_id(move.connection))
+
+
+class BinaryCodec(MessageCodec):
+    """
+    Compact binary messages. A call is a 1 byte method code (the index of the method in METHODS) followed by
+    its arguments; a response is only its value. All integers are little-endian, and once the game is set up,
+    cities and connections are referred to by their ids in its map (see Map):
+        - flag (start, win, end): 1 byte
+        - setup: rails, then the hand as a card count per color (in the order of Color), each 2 bytes,
+          followed by the map as UTF-8 encoded JSON
+        - destinations (pick and its response): 2 city ids of 2 bytes per destination
+        - play: rails, the hand and the city ids of the 2 destinations, each 2 bytes, the number of other
+          players (1 byte), then a bitmask of connection ids for the player and for each other player, each
+          of (number of connections + 7) // 8 bytes
+        - play with delta play enabled: 0 followed by the full state as above, or 1 followed by rails and
+          the hand (each 2 bytes), the number of changed connections (2 bytes), and for each of them the
+          index of the player in the state (0 for the player, 1 for the first other player, 1 byte) and the
+          connection id (2 bytes). A changed connection is acquired if the player did not have it, and
+          released otherwise.
+        - more: the color index of each card, 1 byte each
+        - a move (play response): 0 to draw cards, or 1 followed by the 2 byte id of the acquired connection
+        - a map (start response): the map as UTF-8 encoded JSON
+        - no value (other responses): no bytes
+    """
+
+    binary = True
+
+    def encode_call(self, method: str, args: Tuple[Any, ...]) -> Message:
+        code = _FLAG.pack(_METHOD_CODES[method])
+        if method == "setup":
+            game_map, rails, cards = args
+            self._set_game_map(game_map)
+            return code + _SETUP.pack(rails, *self._pack_hand(cards)) + game_map.get_as_json().encode()
+        if method == "pick":
+            destinations, = args
+            return code + self._pack_destinations(destinations)
+        if method == "play":
+            if not self._delta_play:
+                return code + self._pack_player_game_state(args[0])
+            return code + self._pack_play_delta(args[0])
+        if method == "more":
+            cards, = args
+            return code + bytes(_COLOR_INDICES[card] for card in cards)
+        flag, = args
+        return code + _FLAG.pack(flag)
+
+    def decode_call(self, message: Union[JSONValue, bytes]) -> Tuple[str, Tuple[Any, ...]]:
+        if type(message) is not bytes or len(message) == 0 or message[0] >= len(METHODS):
+            raise ValueError("Invalid binary call")
+        method = METHODS[message[0]]
+        payload = memoryview(message)[1:]
+        try:
+            if method == "setup":
+                rails, *counts = _SETUP.unpack_from(payload)
+                game_map = convert_json_map_to_data_map(json.loads(bytes(payload[_SETUP.size:])))
+                self._set_game_map(game_map)
+                return method, (game_map, rails, self._unpack_hand(counts))
+            if method == "pick":
+                return method, (self._unpack_destinations(payload),)
+            if method == "play":
+                if not self._delta_play:
+                    return method, (self._unpack_player_game_state(payload),)
+                return method, (self._unpack_play_delta(payload),)
+            if method == "more":
+                return method, ([_COLORS[index] for index in payload],)
+            flag, = _FLAG.unpack(payload)
+            return method, (bool(flag),)
+        except (struct.error, IndexError) as err:
+            raise ValueError("Invalid binary call") from err
+
+    def encode_response(self, method: str, response: Any) -> Message:
+        if method == "start":
+            return response.get_as_json().encode()
+        if method == "pick":
+            return self._pack_destinations(response)
+        if method == "play":
+            return response.accepts(PlayerMoveToBinarySerializer(self._get_game_map()))
+        return b""
+
+    def decode_response(self, method: str, args: Tuple[Any, ...], message: Union[JSONValue, bytes]) -> Any:
+        if type(message) is not bytes:
+            raise ValueError("Invalid binary response")
+        try:
+            if method == "start":
+                return convert_json_map_to_data_map(json.loads(message))
+            if method == "pick":
+                offered_destinations, = args
+                destinations = self._unpack_destinations(message)
+                if not destinations.issubset(offered_destinations):
+                    raise ValueError("Returned destinations were not offered")
+                return destinations
+            if method == "play":
+                if message == _FLAG.pack(_DRAW_CARDS):
+                    return DrawCardMove()
+                if len(message) == _FLAG.size + _CONNECTION_ID.size and message[0] == _ACQUIRE_CONNECTION:
+                    connection_id, = _CONNECTION_ID.unpack_from(message, _FLAG.size)
+                    return AcquireConnectionMove(self._get_game_map().get_connection_by_id(connection_id))
+                raise ValueError("Bad PlayerMove")
+        except (struct.error, IndexError) as err:
+            raise ValueError("Invalid binary response") from err
+        if message != b"":
+            raise RuntimeError("Method call did not return void")
+        return None
+
+    def _pack_hand(self, cards: Dict[Color, int]) -> Tuple[int, ...]:
+        return tuple(cards.get(color, 0) for color in _COLORS)
+
+    def _unpack_hand(self, counts: Iterable[int]) -> Dict[Color, int]:
+        return dict(zip(_COLORS, counts))
+
+    def _pack_destinations(self, destinations: Iterable[Destination]) -> bytes:
+        game_map = self._get_game_map()
+        return b"".join(_DESTINATION.pack(*(game_map.get_city_id(city) for city in destination.endpoints))
+                        for destination in destinations)
+
+    def _unpack_destinations(self, payload: Union[bytes, memoryview]) -> Set[Destination]:
+        if len(payload) % _DESTINATION.size != 0:
+            raise ValueError("Invalid destinations")
+        game_map = self._get_game_map()
+        return {Destination(frozenset({game_map.get_city_by_id(city_id1), game_map.get_city_by_id(city_id2)}))
+                for city_id1, city_id2 in _DESTINATION.iter_unpack(payload)}
+
+    def _get_bitmask_size(self) -> int:
+        return (self._get_game_map().get_number_of_connections() + 7) // 8
+
+    def _pack_player_game_state(self, pgs: PlayerGameState) -> bytes:
+        game_map = self._get_game_map()
+        destination_ids = (game_map.get_city_id(city) for destination in sorted(pgs.destinations, key=lambda destination: destination.sort_key)
+                           for city in destination.endpoints)
+        bitmask_size = self._get_bitmask_size()
+        acquisitions = (pgs.connections, *pgs.other_acquisitions)
+        return _PLAYER_STATE.pack(pgs.rails, *self._pack_hand(pgs.colored_cards), *destination_ids,
+                                  len(pgs.other_acquisitions)) \
+            + b"".join(game_map.get_connections_as_bitmask(connections).to_bytes(bitmask_size, "little")
+                       for connections in acquisitions)
+
+    def _pack_play_delta(self, pgs: PlayerGameState) -> bytes:
+        changes = self._get_acquisition_changes(pgs)
+        if changes is None:
+            return _FLAG.pack(_FULL_PLAY_STATE) + self._pack_player_game_state(pgs)
+
+        game_map = self._get_game_map()
+        connection_changes = [(player_index, game_map.get_connection_id(connection))
+                              for player_index, connections in enumerate(zip(*changes))
+                              for connection in connections[0] | connections[1]]
+        return _PLAY_DELTA.pack(_PLAY_STATE_DELTA, pgs.rails, *self._pack_hand(pgs.colored_cards),
+                                len(connection_changes)) \
+            + b"".join(_CONNECTION_CHANGE.pack(*change) for change in connection_changes)
+
+    def _unpack_play_delta(self, payload: Union[bytes, memoryview]) -> PlayerGameState:
+        kind, = _FLAG.unpack_from(payload)
+        if kind == _FULL_PLAY_STATE:
+            return self._record_play_state(self._unpack_player_game_state(payload[_FLAG.size:]))
+        if kind != _PLAY_STATE_DELTA or self._last_play_state is None:
+            raise ValueError("Invalid play state delta")
+
+        _, rails, *fields = _PLAY_DELTA.unpack_from(payload)
+        counts = fields[:len(_COLORS)]
+        number_of_changes = fields[len(_COLORS)]
+        if len(payload) != _PLAY_DELTA.size + _CONNECTION_CHANGE.size * number_of_changes:
+            raise ValueError("Invalid play state delta")
+
+        game_map = self._get_game_map()
+        last_pgs = self._last_play_state
+        before = (last_pgs.connections, *last_pgs.other_acquisitions)
+        acquired: List[Set[Connection]] = [set() for _ in before]
+        released: List[Set[Connection]] = [set() for _ in before]
+        for player_index, connection_id in _CONNECTION_CHANGE.iter_unpack(payload[_PLAY_DELTA.size:]):
+            connection = game_map.get_connection_by_id(connection_id)
+            (released if connection in before[player_index] else acquired)[player_index].add(connection)
+        # The hand is sent whole, so no color is removed from it
+        return self._apply_play_changes(rails, self._unpack_hand(counts), (),
+                                        ([frozenset(added) for added in acquired],
+                                         [frozenset(removed) for removed in released]))
+
+    def _unpack_player_game_state(self, payload: Union[bytes, memoryview]) -> PlayerGameState:
+        game_map = self._get_game_map()
+        rails, *fields = _PLAYER_STATE.unpack_from(payload)
+        counts = fields[:len(_COLORS)]
+        city_id1, city_id2, city_id3, city_id4, number_of_opponents = fields[len(_COLORS):]
+        bitmask_size = self._get_bitmask_size()
+        if len(payload) != _PLAYER_STATE.size + bitmask_size * (number_of_opponents + 1):
+            raise ValueError("Invalid player game state")
+
+        acquisitions = [game_map.get_connections_from_bitmask(int.from_bytes(payload[start:start + bitmask_size],
+                                                                              "little"))
+                        for start in range(_PLAYER_STATE.size, len(payload), bitmask_size)] \
+            if bitmask_size > 0 else [set() for _ in range(number_of_opponents + 1)]
+        destinations = {Destination(frozenset({game_map.get_city_by_id(city_id1), game_map.get_city_by_id(city_id2)})),
+                        Destination(frozenset({game_map.get_city_by_id(city_id3), game_map.get_city_by_id(city_id4)}))}
+        return PlayerGameState(acquisitions[0], self._unpack_hand(counts), rails, destinations, acquisitions[1:])
+
+
+CODECS: Dict[str, Type[MessageCodec]] = {JSON_CODEC: JSONCodec, BINARY_CODEC: BinaryCodec}
+"""The codecs a connection supports, by name"""
@@ -1,32 +1,12 @@
 import json
 import sys
-from typing import Any, List, Optional, Tuple
+from typing import Any, Dict, Optional
 
 sys.path.append('../../')
-from Trains.Common.map import Color, Map
 from Trains.Other.Util.func_utils import try_call_async
-from Trains.Other.Util.json_utils import (
-    convert_json_colored_cards_list_to_colored_cards_dict,
-    convert_json_destinations_to_data, convert_json_map_to_data_map,
-    convert_json_this_player_to_data)
-from Trains.Player.moves import (AcquireConnectionMove, DrawCardMove,
-                                 IPlayerMoveVisitor)
 from Trains.Player.player_interface import PlayerInterface
-from Trains.Remote.tcp_connection import JSONValue, TCPConnection
-
-
-class PlayerMoveToJSONSerializer(IPlayerMoveVisitor[JSONValue]):
-    """An PlayerMove to JSON serializer."""
-
-    def visitDrawCards(self, _: DrawCardMove) -> JSONValue:
-        return "more cards"
-
-    def visitAcquireConnection(self, move: AcquireConnectionMove) -> JSONValue:
-        connection = move.connection
-        city1, city2 = sorted(city.name for city in connection.cities)
-        json_connection = [city1, city2,
-                           connection.color.value, connection.length]
-        return json_connection
+from Trains.Remote.message_codec import JSON_CODEC
+from Trains.Remote.tcp_connection import BARE_FRAMING, TCPConnection
 
 
 class RemotePlayerInvoker:
@@ -34,106 +14,78 @@ class RemotePlayerInvoker:
 
     _client: TCPConnection
     _player: PlayerInterface
-    _game_map: Optional[Map]
 
     def __init__(self, client: TCPConnection, player: PlayerInterface) -> None:
         self._client = client
         self._player = player
-        self._game_map = None
+
+    async def sign_up(self, name: str, framing: str = BARE_FRAMING, codec: str = JSON_CODEC,
+                      delta_play: bool = False, timeout: Optional[int] = None) -> None:
+        """
+        Signs up with a TrainsServer under the given name. A framing, codec or delta play other than the
+        default is requested at sign-up, and the connection switches to them once the server accepts them. The
+        switch is acknowledged by sending the accepted options back in the new framing.
+            Parameters:
+                name (str): The name to sign up with
+                framing (str): The framing of later messages (one of FRAMINGS in tcp_connection)
+                codec (str): The codec of later messages (one of CODECS in message_codec); binary codecs need
+                             length-prefixed framing
+                delta_play (bool): Whether play calls carry only what changed since the player's previous turn,
+                                   with the game state rebuilt by this invoker's codec
+                timeout (int): The number of seconds to wait for the server to accept the requested options
+            Throws:
+                ValueError: The server did not accept the requested options
+        """
+        options: Dict[str, Any] = {}
+        if framing != BARE_FRAMING:
+            options["framing"] = framing
+        if codec != JSON_CODEC:
+            options["codec"] = codec
+        if delta_play:
+            options["delta"] = True
+        if len(options) == 0:
+            await self._client.write(json.dumps(name))
+            return
+
+        await self._client.write(json.dumps([name, options]))
+        accepted_options = await self._client.read(timeout=timeout)
+        if accepted_options != options:
+            raise ValueError("The server did not accept the requested options")
+        self._client.set_framing(framing)
+        self._client.set_codec(codec, delta_play)
+        # The server only sends messages in the new framing once the switch is acknowledged in it
+        await self._client.write(json.dumps(options))
 
     async def start_and_wait_until_closed(self) -> None:
         while not self._client.is_closed():
             await try_call_async(self._try_read_write, timeout=2)
 
     async def _try_read_write(self):
-        json_request = await self._client.read()
-        method, args = self.parse_json_player_call(json_request)
-        json_response_str = self._get_matched_json_response(
-            method, *args)
-        await self._client.write(json_response_str)
+        method, args = await self._client.read_call()
+        response = self._call_player(method, *args)
+        await self._client.write_response(method, response)
 
-    def _get_matched_json_response(self, method: str, *args: JSONValue) -> str:
+    def _call_player(self, method: str, *args: Any) -> Any:
+        """Calls the given method of the player with the decoded arguments of a call and returns its result."""
         if method == "start":
-            game_map = self._player.start()
-            return game_map.get_as_json()
-
+            return self._player.start()
         if method == "setup":
-            json_map, rails, json_player_hand = args
-            if type(json_map) is not dict:
-                raise ValueError("Given JSON map type is invalid")
-            if type(rails) is not int:
-                raise ValueError("Given JSON map type is invalid")
-            if type(json_player_hand) is not list:
-                raise ValueError("Given JSON map type is invalid")
-
-            cards = convert_json_colored_cards_list_to_colored_cards_dict(
-                json_player_hand)
-            game_map = convert_json_map_to_data_map(json_map)
-            self._game_map = game_map
-            self._player.setup(game_map, rails, cards)
-            return json.dumps("void")
-
+            game_map, rails, cards = args
+            return self._player.setup(game_map, rails, cards)
         if method == "pick":
-            json_destinations, = args
-            if type(json_destinations) is not list:
-                raise ValueError(
-                    "Given JSON destinations list type is invalid")
-            if self._game_map is None:
-                raise RuntimeError("Map is currently unknown")
-
-            all_destinations = self._game_map.get_all_feasible_destinations()
-            destinations = {convert_json_destinations_to_data(
-                destination, all_destinations) for destination in json_destinations}
-
-            destinations_not_chosen = self._player.pick(destinations)
-            return f'[{", ".join(destination.get_as_json() for destination in destinations_not_chosen)}]'
-
+            destinations, = args
+            return self._player.pick(destinations)
         if method == "play":
-            json_pgs, = args
-            if type(json_pgs) is not dict:
-                raise ValueError(
-                    "Given JSON player game state type is invalid")
-            if self._game_map is None:
-                raise RuntimeError("Map is currently unknown")
-
-            pgs = convert_json_this_player_to_data(json_pgs, self._game_map)
-            player_move = self._player.play(pgs)
-            return json.dumps(player_move.accepts(PlayerMoveToJSONSerializer()))
-
+            pgs, = args
+            return self._player.play(pgs)
         if method == "more":
-            json_card_list, = args
-            if type(json_card_list) is not list:
-                raise ValueError("Given JSON card list type is invalid")
-
-            cards_list: List[Color] = [Color(color)
-                                       for color in json_card_list]
-            self._player.more(cards_list)
-            return json.dumps("void")
-
+            cards, = args
+            return self._player.more(cards)
         if method == "win":
             result, = args
-            if type(result) is not bool:
-                raise ValueError("Given JSON win result type is invalid")
-
-            self._player.win(result)
-            return json.dumps("void")
-
+            return self._player.win(result)
         if method == "end":
             result, = args
-            if type(result) is not bool:
-                raise ValueError("Given JSON end result type is invalid")
-
-            self._player.end(result)
-            return json.dumps("void")
+            return self._player.end(result)
 
         raise ValueError(f"Unexpected method: {method}")
-
-    def parse_json_player_call(self, json_request: JSONValue) -> Tuple[str, List[Any]]:
-        if type(json_request) is not list:
-            raise ValueError("JSON request must be a list.")
-        if len(json_request) != 2:
-            raise ValueError("JSON request must contain two arguments")
-        if type(json_request[0]) is not str and type(json_request[1]) is not list:
-            raise ValueError("JSON request contains invalid argument types")
-
-        return json_request[0], json_request[1]
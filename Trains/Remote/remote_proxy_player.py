@@ -1,6 +1,5 @@
-import json
 import sys
-from typing import Dict, Iterable, List, Optional, Set
+from typing import Any, Dict, List, Optional, Set
 
 sys.path.append('../../')
 
@@ -8,24 +7,9 @@ from asyncio import AbstractEventLoop, get_event_loop
 
 from Trains.Common.map import Color, Destination, Map
 from Trains.Common.player_game_state import PlayerGameState
-from Trains.Other.Util.json_utils import (JSONDestination,
-                                          convert_dict_hand_to_json_hand,
-                                          convert_json_connection_to_data,
-                                          convert_json_destinations_to_data,
-                                          convert_json_map_to_data_map)
-from Trains.Player.moves import AcquireConnectionMove, DrawCardMove, IPlayerMove
+from Trains.Player.moves import IPlayerMove
 from Trains.Player.player_interface import PlayerInterface
-from Trains.Remote.tcp_connection import JSONValue, TCPConnection
-
-
-def format_message(name: str, *args: str) -> str:
-    msg = f'["{name}", [{", ".join(args)}]]'
-    return msg
-
-
-def join_json_strs(iterable: Iterable[str]) -> str:
-    msg = f"[{', '.join(iterable)}]"
-    return msg
+from Trains.Remote.tcp_connection import TCPConnection
 
 
 class RemoteProxyPlayer(PlayerInterface):
@@ -57,15 +41,7 @@ class RemoteProxyPlayer(PlayerInterface):
                 - cards (dict): The hand of cards the player starts with.
         """
         self._game_map = game_map # cache
-
-        msg = format_message(
-            "setup", game_map.get_as_json(), json.dumps(rails), convert_dict_hand_to_json_hand(cards))
-        self._loop.run_until_complete(self._client.write(msg, timeout=RemoteProxyPlayer.GAME_ACTION_TIMEOUT))
-
-        json_response = self._loop.run_until_complete(
-            self._client.read(timeout=RemoteProxyPlayer.GAME_ACTION_TIMEOUT))
-
-        if json_response != "void": raise RuntimeError("Method call did not return void")
+        self._call("setup", game_map, rails, cards)
 
     def play(self, active_game_state: PlayerGameState) -> IPlayerMove:
         """
@@ -78,21 +54,7 @@ class RemoteProxyPlayer(PlayerInterface):
         if self._game_map is None:
             raise RuntimeError("Player is not setup yet.")
 
-        msg = format_message(
-            "play", active_game_state.get_as_json())
-        self._loop.run_until_complete(self._client.write(msg, timeout=RemoteProxyPlayer.GAME_ACTION_TIMEOUT))
-
-        json_response = self._loop.run_until_complete(
-            self._client.read(timeout=RemoteProxyPlayer.GAME_ACTION_TIMEOUT))
-        return self._parse_player_move(json_response, self._game_map)
-
-    def _parse_player_move(self, json_value: JSONValue, game_map: Map) -> IPlayerMove:
-        if json_value == "more cards":
-            return DrawCardMove()
-        elif type(json_value) is list:
-            return AcquireConnectionMove(convert_json_connection_to_data(json_value, game_map))
-        else:
-            raise ValueError("Bad PlayerMove json")
+        return self._call("play", active_game_state)
 
     def pick(self, destinations: Set[Destination]) -> Set[Destination]:
         """
@@ -103,18 +65,7 @@ class RemoteProxyPlayer(PlayerInterface):
             Return:
                 A set(Destination) containing the three destinations the player did not pick.
         """
-        msg = format_message(
-            "pick", join_json_strs(destination.get_as_json() for destination in destinations))
-        self._loop.run_until_complete(self._client.write(msg, timeout=RemoteProxyPlayer.GAME_ACTION_TIMEOUT))
-
-        json_response = self._loop.run_until_complete(
-            self._client.read(timeout=RemoteProxyPlayer.GAME_ACTION_TIMEOUT))
-        if type(json_response) is not list:
-            raise RuntimeError  # TODO: find better error to use
-
-        destinations_not_chosen = {convert_json_destinations_to_data(
-            destination, destinations) for destination in json_response}
-        return destinations_not_chosen
+        return self._call("pick", destinations)
 
     def more(self, cards: List[Color]) -> None:
         """
@@ -122,15 +73,7 @@ class RemoteProxyPlayer(PlayerInterface):
             Parameters:
                 cards (list(Color)): cards being handed to player
         """
-        json_cards = json.dumps([card.value for card in cards])
-        msg = format_message(
-            "more", json_cards)
-        self._loop.run_until_complete(self._client.write(msg, timeout=RemoteProxyPlayer.GAME_ACTION_TIMEOUT))
-
-        json_response = self._loop.run_until_complete(
-            self._client.read(timeout=RemoteProxyPlayer.GAME_ACTION_TIMEOUT))
-
-        if json_response != "void": raise RuntimeError("Method call did not return void")
+        self._call("more", cards)
 
     def win(self, winner: bool) -> None:
         """
@@ -139,14 +82,7 @@ class RemoteProxyPlayer(PlayerInterface):
             Parameters:
                 winner (bool): True if this player won the game, False otherwise
         """
-        msg = format_message(
-            "win", json.dumps(winner))
-        self._loop.run_until_complete(self._client.write(msg, timeout=RemoteProxyPlayer.GAME_ACTION_TIMEOUT))
-
-        json_response = self._loop.run_until_complete(
-            self._client.read(timeout=RemoteProxyPlayer.GAME_ACTION_TIMEOUT))
-
-        if json_response != "void": raise RuntimeError("Method call did not return void")
+        self._call("win", winner)
 
     def start(self) -> Map:
         """
@@ -156,17 +92,7 @@ class RemoteProxyPlayer(PlayerInterface):
             Returns:
                 The player's game map (Map) suggestion
         """
-        msg = format_message(
-            "start", json.dumps(True))
-        self._loop.run_until_complete(self._client.write(msg, timeout=RemoteProxyPlayer.GAME_ACTION_TIMEOUT))
-
-        json_response = self._loop.run_until_complete(
-            self._client.read(timeout=RemoteProxyPlayer.GAME_ACTION_TIMEOUT))
-        if type(json_response) is not dict:
-            raise RuntimeError  # TODO: find better error to use
-
-        game_map = convert_json_map_to_data_map(json_response)
-        return game_map
+        return self._call("start", True)
 
 
     def end(self, winner: bool) -> None:
@@ -177,14 +103,22 @@ class RemoteProxyPlayer(PlayerInterface):
             Parameters:
                 winner (bool): True if the player won the tournament, False otherwise
         """
-        msg = format_message(
-            "end", json.dumps(winner))
-        self._loop.run_until_complete(self._client.write(msg, timeout=RemoteProxyPlayer.GAME_ACTION_TIMEOUT))
+        self._call("end", winner)
 
-        json_response = self._loop.run_until_complete(
-            self._client.read(timeout=RemoteProxyPlayer.GAME_ACTION_TIMEOUT))
-
-        if json_response != "void": raise RuntimeError("Method call did not return void")
+    def _call(self, method: str, *args: Any) -> Any:
+        """
+        Calls the given method of the remote player and waits for its response, both converted by the
+        client connection's codec.
+            Parameters:
+                method (str): The name of the method
+                *args: The arguments of the method
+            Returns:
+                The decoded response of the remote player
+        """
+        self._loop.run_until_complete(
+            self._client.write_call(method, *args, timeout=RemoteProxyPlayer.GAME_ACTION_TIMEOUT))
+        return self._loop.run_until_complete(
+            self._client.read_response(method, *args, timeout=RemoteProxyPlayer.GAME_ACTION_TIMEOUT))
 
     def get_name(self) -> str:
         """
@@ -1,52 +1,251 @@
 import json
+import struct
 import sys
-from asyncio import wait_for
+from asyncio import IncompleteReadError, wait_for
 from asyncio.streams import StreamReader, StreamWriter
-from typing import Optional, Union
+from typing import Any, Optional, Tuple
 
 sys.path.append('../../')
 from Trains.Other.Util.func_utils import try_call_async
+from Trains.Remote.json_stream_decoder import (JSONStreamDecoder, JSONValue,
+                                               MessageTooLargeError)
+from Trains.Remote.message_codec import (CODECS, JSON_CODEC, Message,
+                                         MessageCodec)
 
-JSONValue = Union[int, float, str, list, bool, None, dict]
+DEFAULT_MAX_MESSAGE_SIZE = 1 << 20
+"""The default maximum size of a message read from a connection, in characters (at most its size in bytes)"""
+DEFAULT_READ_BUDGET = 2 << 20
+"""The default maximum number of bytes read from a connection while waiting for one message"""
+
+BARE_FRAMING = "bare"
+"""Messages are concatenated JSON values, found by scanning for where each value ends (the default)"""
+LENGTH_PREFIXED_FRAMING = "length-prefixed"
+"""Each message is its UTF-8 encoded JSON preceded by its length in bytes as a 4 byte big-endian integer"""
+FRAMINGS: Tuple[str, ...] = (BARE_FRAMING, LENGTH_PREFIXED_FRAMING)
+"""The framings a connection supports"""
+
+_LENGTH_PREFIX = struct.Struct(">I")
 
 
 class TCPConnection:
+    """
+    A connection that exchanges JSON messages over a TCP stream. Messages are bare JSON by default, and the
+    two ends may agree (e.g. at sign-up) to switch to length-prefixed framing, which lets the reader read
+    exactly the bytes of a message and parse them once.
+    The calls and responses of remote players are converted to and from messages by the connection's codec
+    (see message_codec), JSON by default; binary codecs need length-prefixed framing.
+    """
     BYTES_TO_READ = 8192
 
     _reader: StreamReader
     _writer: StreamWriter
+    _decoder: JSONStreamDecoder
+    _max_message_size: Optional[int]
+    _read_budget: Optional[int]
+    _framing: str
+    _pending_message_size: Optional[int]
+    _codec_name: str
+    _codec: MessageCodec
 
-    def __init__(self, reader: StreamReader, writer: StreamWriter) -> None:
+    def __init__(self, reader: StreamReader, writer: StreamWriter,
+                 max_message_size: Optional[int] = DEFAULT_MAX_MESSAGE_SIZE,
+                 read_budget: Optional[int] = DEFAULT_READ_BUDGET) -> None:
+        """
+        Constructor for a connection over the given streams. The limits bound the memory and time a peer can
+        make a read use; a read that exceeds them fails, which gets a remote player booted.
+            Parameters:
+                reader (StreamReader): The stream to read messages from
+                writer (StreamWriter): The stream to write messages to
+                max_message_size (int or None): The maximum size of one message (see DEFAULT_MAX_MESSAGE_SIZE),
+                                                or None for no limit
+                read_budget (int or None): The maximum number of bytes read while waiting for one message
+                                           (including whitespace and the start of the next message), or None
+                                           for no limit
+            Throws:
+                ValueError: The limits must be None or positive
+        """
+        if read_budget is not None and read_budget < 1:
+            raise ValueError("The read budget must be positive")
         self._reader = reader
         self._writer = writer
+        self._decoder = JSONStreamDecoder(max_message_size)
+        self._max_message_size = max_message_size
+        self._read_budget = read_budget
+        self._framing = BARE_FRAMING
+        self._pending_message_size = None
+        self._codec_name = JSON_CODEC
+        self._codec = CODECS[JSON_CODEC]()
+
+    def get_framing(self) -> str:
+        """Returns the framing of the messages on this connection (one of FRAMINGS)."""
+        return self._framing
+
+    def set_framing(self, framing: str) -> None:
+        """
+        Switches the framing of the messages on this connection, for both reading and writing. Both ends
+        must switch between the same two messages, so no bytes of a later message may have been read yet.
+            Parameters:
+                framing (str): One of FRAMINGS
+            Throws:
+                ValueError:
+                    - The framing is not supported
+                    - Bytes of a later message have already been read
+        """
+        if framing not in FRAMINGS:
+            raise ValueError(f"Unsupported framing: {framing}")
+        if self._decoder.has_value() or self._decoder.has_partial_value() or self._pending_message_size is not None:
+            raise ValueError("Cannot switch framing with unread messages")
+        if framing != LENGTH_PREFIXED_FRAMING and self._codec.binary:
+            raise ValueError("A binary codec needs length-prefixed framing")
+        self._framing = framing
+
+    def get_codec(self) -> str:
+        """Returns the name of the codec of the calls and responses on this connection (one of CODECS)."""
+        return self._codec_name
+
+    def set_codec(self, codec_name: str, delta_play: bool = False) -> None:
+        """
+        Switches the codec of the calls and responses on this connection to a new instance of the given codec.
+            Parameters:
+                codec_name (str): One of CODECS
+                delta_play (bool): Whether play calls carry only what changed since the player's previous turn
+            Throws:
+                ValueError:
+                    - The codec is not supported
+                    - The codec is binary and the framing is not length-prefixed
+        """
+        if codec_name not in CODECS:
+            raise ValueError(f"Unsupported codec: {codec_name}")
+        codec = CODECS[codec_name](delta_play)
+        if codec.binary and self._framing != LENGTH_PREFIXED_FRAMING:
+            raise ValueError("A binary codec needs length-prefixed framing")
+        self._codec_name = codec_name
+        self._codec = codec
+
+    async def write_call(self, method: str, *args: Any, timeout: Optional[int] = None) -> None:
+        """Encodes a call of the given method of a remote player with the codec and writes it."""
+        await self._write_message(self._codec.encode_call(method, args), timeout)
+
+    async def read_call(self, timeout: Optional[int] = None) -> Tuple[str, Tuple[Any, ...]]:
+        """Reads a call of a method of a remote player and decodes it into its method and arguments."""
+        return self._codec.decode_call(await self._read_message(timeout))
+
+    async def write_response(self, method: str, response: Any, timeout: Optional[int] = None) -> None:
+        """Encodes the response to a call of the given method with the codec and writes it."""
+        await self._write_message(self._codec.encode_response(method, response), timeout)
+
+    async def read_response(self, method: str, *args: Any, timeout: Optional[int] = None) -> Any:
+        """Reads the response to a call of the given method with the given arguments and decodes it."""
+        return self._codec.decode_response(method, args, await self._read_message(timeout))
+
+    async def _write_message(self, message: Message, timeout: Optional[int]) -> None:
+        if type(message) is bytes:
+            await self.write_bytes(message, timeout=timeout)
+        else:
+            await self.write(message, timeout=timeout)
+
+    async def _read_message(self, timeout: Optional[int]) -> Any:
+        if self._codec.binary:
+            return await self.read_bytes(timeout=timeout)
+        return await self.read(timeout=timeout)
 
     async def read(self, timeout: Optional[int] = None) -> JSONValue:
+        """
+        Reads the next JSON value from the connection. Bytes read past the end of the value are kept for
+        the next read.
+            Parameters:
+                timeout (int): The number of seconds to wait for a complete value, or None to wait indefinitely
+            Returns:
+                The JSON value
+            Throws:
+                ConnectionError: The connection was closed before a complete value was read
+                ValueError: The connection sent bytes that are not valid UTF-8 encoded JSON
+                MessageTooLargeError: The message exceeds the maximum message size, or the read budget was
+                                      used up before a complete message was read
+        """
         async def read_helper() -> JSONValue:
-            read_so_far = ""
-            is_json = False
-            result = None
-            while not is_json:
+            bytes_read = 0
+            while not self._decoder.has_value():
                 if self.is_closed():
                     raise ConnectionError("Connection error")
 
-                data_bytes = await self._reader.read(TCPConnection.BYTES_TO_READ)
-                read_so_far += data_bytes.decode()
-                try:
-                    result = json.loads(read_so_far)
-                    is_json = True
-                except:
-                    continue
-            return result
+                bytes_to_read = TCPConnection.BYTES_TO_READ
+                if self._read_budget is not None:
+                    if bytes_read >= self._read_budget:
+                        raise MessageTooLargeError(f"No message within {self._read_budget} bytes")
+                    bytes_to_read = min(bytes_to_read, self._read_budget - bytes_read)
+
+                data_bytes = await self._reader.read(bytes_to_read)
+                bytes_read += len(data_bytes)
+                self._decoder.feed(data_bytes)
+            return self._decoder.pop_value()
 
+        if self._framing == LENGTH_PREFIXED_FRAMING:
+            return json.loads(await self.read_bytes(timeout=timeout))
         return await wait_for(read_helper(), timeout=timeout)
 
+    async def read_bytes(self, timeout: Optional[int] = None) -> bytes:
+        """
+        Reads the bytes of the next message, which needs length-prefixed framing. A read that times out (or is
+        otherwise cancelled) after the length of the message was read keeps the length, so the next read
+        continues with the bytes of the same message.
+            Parameters:
+                timeout (int): The number of seconds to wait for the message, or None to wait indefinitely
+            Returns:
+                The bytes of the message
+            Throws:
+                ConnectionError: The connection was closed before the message was read
+                ValueError: The framing is not length-prefixed
+                MessageTooLargeError: The message exceeds the maximum message size or the read budget
+        """
+        if self._framing != LENGTH_PREFIXED_FRAMING:
+            raise ValueError("Reading bytes needs length-prefixed framing")
+
+        async def read_frame() -> bytes:
+            if self.is_closed():
+                raise ConnectionError("Connection error")
+            try:
+                # readexactly only takes bytes from the stream once all of them have arrived, so a cancelled
+                # read loses nothing as long as the length is kept across reads
+                if self._pending_message_size is None:
+                    message_size, = _LENGTH_PREFIX.unpack(await self._reader.readexactly(_LENGTH_PREFIX.size))
+                    for limit in (self._max_message_size, self._read_budget):
+                        if limit is not None and message_size > limit:
+                            raise MessageTooLargeError(f"Message of {message_size} bytes exceeds {limit} bytes")
+                    self._pending_message_size = message_size
+                message = await self._reader.readexactly(self._pending_message_size)
+                self._pending_message_size = None
+                return message
+            except IncompleteReadError:
+                raise ConnectionError("Connection error")
+
+        return await wait_for(read_frame(), timeout=timeout)
+
     async def write(self, string: str, timeout: Optional[int] = None) -> None:
+        if self._framing == LENGTH_PREFIXED_FRAMING:
+            return await self.write_bytes(string.encode(), timeout=timeout)
         if self.is_closed():
             raise ConnectionError("Connection error")
 
         self._writer.write(string.encode())
         return await wait_for(self._writer.drain(), timeout=timeout)
 
+    async def write_bytes(self, message: bytes, timeout: Optional[int] = None) -> None:
+        """
+        Writes the given bytes as one message, which needs length-prefixed framing.
+            Throws:
+                ConnectionError: The connection is closed
+                ValueError: The framing is not length-prefixed
+        """
+        if self._framing != LENGTH_PREFIXED_FRAMING:
+            raise ValueError("Writing bytes needs length-prefixed framing")
+        if self.is_closed():
+            raise ConnectionError("Connection error")
+
+        self._writer.write(_LENGTH_PREFIX.pack(len(message)))
+        self._writer.write(message)
+        return await wait_for(self._writer.drain(), timeout=timeout)
+
     def is_closed(self) -> bool:
         return self._reader.at_eof() or self._writer.transport.is_closing()
 
@@ -1,13 +1,19 @@
+import json
 import sys
 from asyncio import gather, get_event_loop, start_server
 from asyncio.events import AbstractEventLoop, AbstractServer
 from asyncio.streams import StreamReader, StreamWriter
-from typing import Dict, List, Optional
+from typing import Any, Dict, List, Optional, Tuple
 
 sys.path.append('../')
-from Trains.Other.Util.func_utils import try_call_async
+from Trains.Other.Util.func_utils import try_call, try_call_async
+from Trains.Remote.message_codec import CODECS, JSON_CODEC
 from Trains.Remote.remote_proxy_player import RemoteProxyPlayer
-from Trains.Remote.tcp_connection import TCPConnection
+from Trains.Remote.tcp_connection import (BARE_FRAMING,
+                                          DEFAULT_MAX_MESSAGE_SIZE,
+                                          DEFAULT_READ_BUDGET, FRAMINGS,
+                                          LENGTH_PREFIXED_FRAMING, JSONValue,
+                                          TCPConnection)
 
 DEFAULT_MAX_NUM_CLIENTS = 50
 """The maximum number of clients permitted to sign up"""
@@ -17,20 +23,62 @@ def _is_ascii(string: str) -> bool:
     return all(0 <= ord(char) < 128 for char in string)
 
 
+def parse_sign_up(message: JSONValue) -> Optional[Tuple[str, Dict[str, Any]]]:
+    """
+    Parses the message a client signs up with: either its name, or its name and the protocol options it
+    requests as [name, options], e.g. ["Dennis", {"framing": "length-prefixed", "codec": "binary"}]. Plain
+    names keep the default protocol, so older clients are unaffected. Binary codecs need length-prefixed framing.
+    The server replies with the accepted options, and the client acknowledges them by sending them back in the
+    new framing.
+    With {"delta": true}, play calls after the first of a game carry only what changed since the player's
+    previous turn (see MessageCodec).
+        Parameters:
+            message (JSONValue): The sign-up message
+        Returns:
+            The name and requested options, or None if the message is malformed or requests an unsupported option
+    """
+    if type(message) is str:
+        return message, {}
+    if type(message) is not list or len(message) != 2:
+        return None
+    name, options = message
+    if type(name) is not str or type(options) is not dict:
+        return None
+    for option, value in options.items():
+        if option == "framing" and value in FRAMINGS:
+            continue
+        if option == "codec" and value in CODECS:
+            continue
+        if option == "delta" and type(value) is bool:
+            continue
+        return None
+    if CODECS[options.get("codec", JSON_CODEC)].binary \
+            and options.get("framing", BARE_FRAMING) != LENGTH_PREFIXED_FRAMING:
+        return None
+    return name, options
+
+
 class TrainsServer:
     """A server for asynchronously establishing TCP connections with remote Trains players, but
     whose external interface is synchronous."""
 
     _port: int
     _max_clients: int
+    _max_message_size: Optional[int]
+    _read_budget: Optional[int]
     _rpps: Dict[str, RemoteProxyPlayer]
     _server: Optional[AbstractServer]
     _loop: AbstractEventLoop
     _accept_new_connections: bool
 
-    def __init__(self, port: int, max_clients: int = DEFAULT_MAX_NUM_CLIENTS) -> None:
+    def __init__(self, port: int, max_clients: int = DEFAULT_MAX_NUM_CLIENTS,
+                 max_message_size: Optional[int] = DEFAULT_MAX_MESSAGE_SIZE,
+                 read_budget: Optional[int] = DEFAULT_READ_BUDGET) -> None:
         self._port = port
         self._max_clients = max_clients
+        # Limits on what each client can make the server read (see TCPConnection)
+        self._max_message_size = max_message_size
+        self._read_budget = read_budget
         self._rpps = {}
         self._server = None
         self._loop = get_event_loop()
@@ -58,16 +106,34 @@ class TrainsServer:
             """Handler for a new client connection to the server."""
             # Waiting period to receive a name after a connection is established
             NAME_TIMEOUT = 3
-            tcp = TCPConnection(reader, writer)
+            tcp = TCPConnection(reader, writer, self._max_message_size, self._read_budget)
 
             if not self._accept_new_connections:
                 return await tcp.close()
 
-            name, _ = await try_call_async(tcp.read, timeout=NAME_TIMEOUT)
+            sign_up, _ = await try_call_async(tcp.read, timeout=NAME_TIMEOUT)
+            parsed_sign_up = parse_sign_up(sign_up)
+            if parsed_sign_up is None:
+                return await tcp.close()
+            name, options = parsed_sign_up
 
-            if type(name) is not str or len(name) < 1 or len(name) > 50 or not _is_ascii(name):
+            if len(name) < 1 or len(name) > 50 or not _is_ascii(name):
                 return await tcp.close()
 
+            if len(options) > 0:
+                # The client is told which options were accepted before both ends switch to them. The client
+                # acknowledges the switch with the options in the new framing, so no message in the new
+                # framing is sent before the client has finished reading in the old one.
+                _, write_error = await try_call_async(tcp.write, json.dumps(options), timeout=NAME_TIMEOUT)
+                _, framing_error = try_call(tcp.set_framing, options.get("framing", BARE_FRAMING))
+                _, codec_error = try_call(tcp.set_codec, options.get("codec", JSON_CODEC),
+                                          options.get("delta", False))
+                if write_error is not None or framing_error is not None or codec_error is not None:
+                    return await tcp.close()
+                acknowledgement, _ = await try_call_async(tcp.read, timeout=NAME_TIMEOUT)
+                if acknowledgement != options:
+                    return await tcp.close()
+
             unique_name = self._get_unique_name(name)
             player = RemoteProxyPlayer(unique_name, tcp)
             self._rpps[unique_name] = player